@@ -0,0 +1,334 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from fecha_utils import procesar_fecha, derivar_plazos
+from indice_utils import a_dia, construir_indice_plazos, consultar_plazos, indice_vigente
+from cache_utils import obtener_de_cache
+from data_utils import cargar_registros
+from validaciones_utils import validar_reglas_negocio
+
+# Hitos con alertas de vencimiento, en el orden en que se listan para cada registro.
+# Cada hito compara una columna de fecha programada con una de fecha real; las
+# descripciones son plantillas donde '{}' se reemplaza por el número de días.
+HITOS_ALERTAS = [
+    {
+        'tipo': 'Acuerdo de compromiso',
+        'programada': 'Entrega acuerdo de compromiso',
+        'real': 'Fecha de entrega de información',
+        'vencido': 'Entrega de acuerdo vencida hace {} días sin fecha de entrega de información',
+        'proximo': None,
+        'retraso': None
+    },
+    {
+        'tipo': 'Entrega de información',
+        'programada': 'Entrega acuerdo de compromiso',
+        'real': 'Fecha de entrega de información',
+        'vencido': 'Entrega de información vencida hace {} días',
+        'proximo': None,
+        'retraso': 'Entrega de información con {} días hábiles de retraso'
+    },
+    {
+        'tipo': 'Análisis y cronograma',
+        'programada': 'Plazo de cronograma',
+        'real': 'Análisis y cronograma',
+        'vencido': 'Plazo de cronograma vencido hace {} días sin fecha real',
+        'proximo': 'Plazo de cronograma vence en {} días hábiles',
+        'retraso': 'Análisis realizado con {} días hábiles de retraso'
+    },
+    {
+        'tipo': 'Estándares',
+        'programada': 'Estándares (fecha programada)',
+        'real': 'Estándares',
+        'vencido': 'Plazo de estándares vencido hace {} días sin fecha real',
+        'proximo': 'Plazo de estándares vence en {} días hábiles',
+        'retraso': 'Estándares completados con {} días hábiles de retraso'
+    },
+    {
+        'tipo': 'Publicación',
+        'programada': 'Fecha de publicación programada',
+        'real': 'Publicación',
+        'vencido': 'Plazo de publicación vencido hace {} días sin fecha real',
+        'proximo': 'Plazo de publicación vence en {} días hábiles',
+        'retraso': 'Publicación realizada con {} días hábiles de retraso'
+    },
+    {
+        'tipo': 'Cierre',
+        'programada': 'Plazo de oficio de cierre',
+        'real': 'Fecha de oficio de cierre',
+        'vencido': 'Plazo de oficio de cierre vencido hace {} días sin fecha real',
+        'proximo': 'Plazo de oficio de cierre vence en {} días hábiles',
+        'retraso': 'Oficio de cierre realizado con {} días hábiles de retraso'
+    }
+]
+
+# Días hábiles (incluyendo el día de hoy) dentro de los que un plazo está próximo a vencer
+DIAS_HABILES_PROXIMO_VENCIMIENTO = 5
+
+ESTADOS_ALERTA = ['Vencido', 'Próximo a vencer', 'Completado con retraso']
+
+# Posición de cada estado en el listado de alertas (vencidos primero)
+ORDEN_ESTADOS_ALERTA = {estado: posicion for posicion, estado in enumerate(ESTADOS_ALERTA)}
+
+# Alertas por página en el listado
+TAMANO_PAGINA_ALERTAS = 50
+
+COLUMNAS_ALERTAS = ['Cod', 'Entidad', 'Nivel Información', 'Funcionario', 'Tipo Alerta',
+                    'Fecha Programada', 'Fecha Real', 'Días Rezago', 'Estado', 'Descripción']
+
+
+def contar_dias_semana(inicio, fin):
+    """Cuenta los días de lunes a viernes entre dos arreglos de fechas, ambos extremos incluidos."""
+    return np.busday_count(inicio, fin + np.timedelta64(1, 'D'), weekmask='1111100')
+
+
+def generar_alertas(registros_df, fecha_corte=None, indice_plazos=None):
+    """
+    Genera el DataFrame de alertas de vencimiento de todos los registros.
+
+    Para cada hito de HITOS_ALERTAS se consultan en el índice de vencimientos los
+    plazos vencidos y los próximos a vencer (búsqueda binaria por rango de fechas) y
+    los completados con retraso; los días hábiles se cuentan con np.busday_count y las
+    alertas de todos los hitos se concatenan en el orden registro por registro.
+
+    Args:
+        registros_df: DataFrame de registros
+        fecha_corte: Fecha de referencia (por defecto, hoy)
+        indice_plazos: Índice de vencimientos de registros_df (se construye si no se indica)
+
+    Returns:
+        DataFrame: Alertas con las columnas de COLUMNAS_ALERTAS
+    """
+    hoy = a_dia(datetime.now() if fecha_corte is None else fecha_corte)
+    if not indice_vigente(indice_plazos, registros_df):
+        indice_plazos = construir_indice_plazos(
+            registros_df, {hito['programada']: hito['real'] for hito in HITOS_ALERTAS})
+
+    # Primer día fuera de la ventana de próximo vencimiento (contando hoy si es hábil)
+    fin_proximo = np.busday_offset(hoy, DIAS_HABILES_PROXIMO_VENCIMIENTO, roll='forward', weekmask='1111100')
+
+    # Piezas de cada (hito, estado): posiciones de los registros, días y fechas de la alerta
+    piezas = []
+    for orden, hito in enumerate(HITOS_ALERTAS):
+        filas, programadas, reales = consultar_plazos(indice_plazos, hito['programada'], hasta=hoy, completados=False)
+        piezas.append((orden, 'Vencido', hito['vencido'], filas, (hoy - programadas).astype(int),
+                       programadas, reales))
+
+        if hito['proximo']:
+            filas, programadas, reales = consultar_plazos(indice_plazos, hito['programada'], desde=hoy,
+                                                          hasta=fin_proximo, completados=False)
+            dias_restantes = contar_dias_semana(np.full(len(filas), hoy), programadas)
+            piezas.append((orden, 'Próximo a vencer', hito['proximo'], filas, -dias_restantes,
+                           programadas, reales))
+
+        if hito['retraso']:
+            filas, programadas, reales = consultar_plazos(indice_plazos, hito['programada'], completados=True)
+            retraso = reales > programadas
+            piezas.append((orden, 'Completado con retraso', hito['retraso'], filas[retraso],
+                           contar_dias_semana(programadas[retraso], reales[retraso]),
+                           programadas[retraso], reales[retraso]))
+
+    piezas = [pieza for pieza in piezas if len(pieza[3])]
+    if not piezas:
+        return pd.DataFrame(columns=COLUMNAS_ALERTAS)
+
+    posiciones = np.concatenate([pieza[3] for pieza in piezas])
+    ordenes = np.concatenate([np.full(len(pieza[3]), pieza[0]) for pieza in piezas])
+    numero_pieza = np.repeat(np.arange(len(piezas)), [len(pieza[3]) for pieza in piezas])
+    dias = np.concatenate([pieza[4] for pieza in piezas]).astype('int64')
+    programadas = np.concatenate([pieza[5] for pieza in piezas])
+    reales = np.concatenate([pieza[6] for pieza in piezas])
+
+    # Mismo orden que el recorrido registro por registro: posición del registro y luego hito
+    orden_final = np.lexsort((ordenes, posiciones))
+    posiciones, numero_pieza, dias = posiciones[orden_final], numero_pieza[orden_final], dias[orden_final]
+    programadas, reales = programadas[orden_final], reales[orden_final]
+
+    def por_pieza(valores):
+        return np.array(valores, dtype=object)[numero_pieza]
+
+    def columna_registro(columna):
+        if columna not in registros_df.columns:
+            return np.full(len(posiciones), '', dtype=object)
+        return registros_df[columna].to_numpy(dtype=object)[posiciones]
+
+    def fechas_texto(fechas):
+        # Formatear cada fecha distinta una sola vez
+        fechas_unicas, inverso = np.unique(fechas, return_inverse=True)
+        textos = pd.DatetimeIndex(fechas_unicas).strftime('%d/%m/%Y').fillna('').to_numpy(dtype=object)
+        return textos[inverso.ravel()]
+
+    hitos = [HITOS_ALERTAS[pieza[0]] for pieza in piezas]
+    plantillas = [pieza[2].split('{}') for pieza in piezas]
+    descripcion = (pd.Series(por_pieza([antes for antes, _ in plantillas]))
+                   + pd.Series(np.abs(dias).astype(str), dtype=object)
+                   + pd.Series(por_pieza([despues for _, despues in plantillas])))
+
+    return pd.DataFrame({
+        'Cod': columna_registro('Cod'),
+        'Entidad': columna_registro('Entidad'),
+        'Nivel Información': columna_registro('Nivel Información '),
+        'Funcionario': columna_registro('Funcionario'),
+        'Tipo Alerta': por_pieza([hito['tipo'] for hito in hitos]),
+        'Fecha Programada': fechas_texto(programadas),
+        'Fecha Real': fechas_texto(reales),
+        'Días Rezago': dias,
+        'Estado': por_pieza([pieza[1] for pieza in piezas]),
+        'Descripción': descripcion.to_numpy(dtype=object)
+    })
+
+
+def clave_orden_alertas(df_alertas):
+    """
+    Posición de cada alerta en el listado ordenado: por estado (vencidos primero), luego
+    por días de rezago de mayor a menor y, en caso de empate, en el orden original.
+    """
+    estados = df_alertas['Estado'].map(ORDEN_ESTADOS_ALERTA).to_numpy(dtype='int64')
+    orden = np.lexsort((-df_alertas['Días Rezago'].to_numpy(dtype='int64'), estados))
+    clave = np.empty(len(orden), dtype='int64')
+    clave[orden] = np.arange(len(orden))
+    return clave
+
+
+def seleccionar_pagina(claves, pagina, tamano_pagina=TAMANO_PAGINA_ALERTAS):
+    """
+    Posiciones, en orden, de las alertas de una página (empezando en 0) según su clave.
+    Solo se ordenan las alertas hasta el final de la página, con una selección parcial.
+    """
+    inicio = pagina * tamano_pagina
+    fin = min(inicio + tamano_pagina, len(claves))
+    if inicio >= fin:
+        return np.array([], dtype=int)
+
+    if fin < len(claves):
+        primeras = np.argpartition(claves, fin - 1)[:fin]
+    else:
+        primeras = np.arange(len(claves))
+    return primeras[np.argsort(claves[primeras])][inicio:fin]
+
+
+def resumir_alertas(df_alertas):
+    """
+    Agregados de las alertas: cantidad por estado, tabla de alertas por tipo y estado
+    (con una columna por cada estado de ESTADOS_ALERTA) y clave de orden del listado.
+    """
+    por_estado = df_alertas['Estado'].value_counts().reindex(ESTADOS_ALERTA, fill_value=0)
+    por_tipo = (df_alertas.groupby(['Tipo Alerta', 'Estado']).size().unstack(fill_value=0)
+                .reindex(columns=ESTADOS_ALERTA, fill_value=0))
+    return {'por_estado': por_estado, 'por_tipo': por_tipo, 'clave_orden': clave_orden_alertas(df_alertas)}
+
+
+def obtener_alertas(registros_df, fecha_corte=None, indice_plazos=None, version_datos=None):
+    """
+    Retorna las alertas y sus agregados, reutilizando el resultado en caché mientras
+    no cambien la versión de los datos ni el día de corte.
+
+    Args:
+        registros_df: DataFrame de registros
+        fecha_corte: Fecha de referencia (por defecto, hoy)
+        indice_plazos: Índice de vencimientos de registros_df
+        version_datos: Versión del contenido de los registros (sin versión no se usa la caché)
+
+    Returns:
+        tuple: (df_alertas, resumen) - resumen según resumir_alertas
+    """
+    dia_corte = a_dia(datetime.now() if fecha_corte is None else fecha_corte)
+
+    def calcular():
+        df_alertas = generar_alertas(registros_df, dia_corte, indice_plazos)
+        return df_alertas, resumir_alertas(df_alertas)
+
+    if version_datos is None:
+        return calcular()
+    return obtener_de_cache(('alertas', version_datos, dia_corte), calcular)
+
+
+def preparar_registros(registros_df):
+    """
+    Deja los registros como los ve el tablero antes de calcular alertas: plazos
+    derivados de sus fechas de origen y reglas de negocio aplicadas (sin guardar).
+    """
+    derivar_plazos(registros_df)
+    return validar_reglas_negocio(registros_df)
+
+
+def alertas_desde_archivo(ruta_registros='registros.csv', fecha_corte=None):
+    """
+    Calcula las alertas de un archivo de registros con la misma ruta de carga del
+    tablero (snapshot columnar y fechas tipadas).
+
+    Returns:
+        DataFrame: Alertas con las columnas de COLUMNAS_ALERTAS
+    """
+    registros_df, _ = cargar_registros(ruta_registros)
+    for columna in ['Cod', 'Entidad']:
+        if columna not in registros_df.columns:
+            registros_df[columna] = ''
+    return generar_alertas(preparar_registros(registros_df), fecha_corte)
+
+
+def _guardar_excel(df_alertas, ruta):
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        df_alertas.to_excel(writer, sheet_name='Alertas', index=False)
+
+
+# Escritores de alertas por extensión del archivo de salida
+FORMATOS_SALIDA = {
+    '.csv': lambda df_alertas, ruta: df_alertas.to_csv(ruta, index=False, sep=';'),
+    '.xlsx': _guardar_excel,
+    '.parquet': lambda df_alertas, ruta: df_alertas.to_parquet(ruta, index=False)
+}
+
+
+def guardar_alertas(df_alertas, ruta_salida):
+    """Guarda las alertas en CSV, Excel o Parquet según la extensión de la ruta."""
+    extension = os.path.splitext(ruta_salida)[1].lower()
+    if extension not in FORMATOS_SALIDA:
+        raise ValueError(f"Formato de salida no soportado: '{extension}'. "
+                         f"Use uno de: {', '.join(FORMATOS_SALIDA)}")
+    FORMATOS_SALIDA[extension](df_alertas, ruta_salida)
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos para generar las alertas sin Streamlit."""
+    parser = argparse.ArgumentParser(
+        description='Genera las alertas de vencimiento de registros.csv sin iniciar el tablero.')
+    parser.add_argument('--registros', default='registros.csv',
+                        help='Archivo CSV de registros (por defecto: registros.csv)')
+    parser.add_argument('--fecha', default=None,
+                        help='Fecha de corte DD/MM/AAAA o AAAA-MM-DD (por defecto: hoy)')
+    parser.add_argument('--salida', nargs='+', default=['alertas_vencimientos.csv'],
+                        help='Archivos de salida (.csv, .xlsx o .parquet)')
+    args = parser.parse_args(argv)
+
+    fecha_corte = None
+    if args.fecha:
+        fecha_corte = procesar_fecha(args.fecha)
+        if fecha_corte is None:
+            parser.error(f"Fecha de corte no válida: {args.fecha}")
+
+    if not os.path.exists(args.registros):
+        parser.error(f"El archivo {args.registros} no existe.")
+
+    for ruta_salida in args.salida:
+        if os.path.splitext(ruta_salida)[1].lower() not in FORMATOS_SALIDA:
+            parser.error(f"Formato de salida no soportado: {ruta_salida}. "
+                         f"Use uno de: {', '.join(FORMATOS_SALIDA)}")
+
+    df_alertas = alertas_desde_archivo(args.registros, fecha_corte)
+    for ruta_salida in args.salida:
+        guardar_alertas(df_alertas, ruta_salida)
+
+    resumen = df_alertas['Estado'].value_counts()
+    fecha_texto = (fecha_corte or datetime.now()).strftime('%d/%m/%Y')
+    print(f"Alertas al {fecha_texto}: {len(df_alertas)}")
+    for estado, cantidad in resumen.items():
+        print(f"  {estado}: {cantidad}")
+    print(f"Archivos generados: {', '.join(args.salida)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import os
+import uuid
+import hashlib
+import sqlite3
+from contextlib import closing
+import pandas as pd
+
+# Almacenamiento de registros en SQLite: una fila de la tabla por registro, con la
+# posición del registro como clave primaria y un índice por Cod. Los valores se guardan
+# como texto, igual que en registros.csv.
+TABLA_REGISTROS = 'registros'
+COLUMNA_POSICION = '_posicion'
+
+# Tabla con la versión de los datos: el hash del contenido tras reemplazar la tabla
+# completa, o un identificador nuevo tras actualizar registros
+TABLA_VERSION = '_version'
+
+
+def ruta_sqlite(ruta_csv):
+    """Devuelve la ruta de la base SQLite que acompaña a un archivo de registros CSV."""
+    return f"{os.path.splitext(ruta_csv)[0]}.db"
+
+
+def _conectar(ruta):
+    return closing(sqlite3.connect(ruta, timeout=30))
+
+
+def _identificador(nombre):
+    """Nombre de columna entre comillas dobles, escapando las comillas internas."""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+def _filas(df):
+    """Valores de un DataFrame como listas de texto, con None en las celdas vacías."""
+    valores = df.astype(object)
+    return valores.where(valores.notna(), None).values.tolist()
+
+
+def hash_contenido(df):
+    """Hash de las columnas y los valores de un DataFrame."""
+    sha = hashlib.sha256('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    sha.update(pd.util.hash_pandas_object(df.astype(object), index=False).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def _renovar_version(conexion, version=None):
+    conexion.execute(f"DELETE FROM {TABLA_VERSION}")
+    conexion.execute(f"INSERT INTO {TABLA_VERSION} (version) VALUES (?)", (version or uuid.uuid4().hex,))
+
+
+def columnas_sqlite(ruta):
+    """Columnas de la tabla de registros (sin la posición), o None si no existe."""
+    if not os.path.exists(ruta):
+        return None
+
+    with _conectar(ruta) as conexion:
+        info = conexion.execute(f"PRAGMA table_info({TABLA_REGISTROS})").fetchall()
+
+    columnas = [columna[1] for columna in info if columna[1] != COLUMNA_POSICION]
+    return columnas or None
+
+
+def version_sqlite(ruta):
+    """Versión de los datos guardados en la base, o None si no existe."""
+    if not os.path.exists(ruta):
+        return None
+
+    try:
+        with _conectar(ruta) as conexion:
+            fila = conexion.execute(f"SELECT version FROM {TABLA_VERSION}").fetchone()
+    except sqlite3.OperationalError:
+        return None
+
+    return fila[0] if fila else None
+
+
+def leer_registros_sqlite(ruta):
+    """Lee la tabla de registros en el orden de sus posiciones."""
+    with _conectar(ruta) as conexion:
+        df = pd.read_sql_query(f"SELECT * FROM {TABLA_REGISTROS} ORDER BY {COLUMNA_POSICION}", conexion)
+
+    return df.drop(columns=COLUMNA_POSICION)
+
+
+def escribir_registros_sqlite(ruta, df):
+    """
+    Reemplaza la tabla de registros con el contenido de df en una sola transacción:
+    los registros se insertan en una tabla auxiliar que luego toma el lugar de la
+    anterior. Si algo falla, la base conserva los datos y la versión anteriores.
+
+    Returns:
+        str: Nueva versión de los datos
+    """
+    columnas = ', '.join(f"{_identificador(columna)} TEXT" for columna in df.columns)
+    marcadores = ', '.join('?' * (len(df.columns) + 1))
+    tabla_nueva = f"{TABLA_REGISTROS}_nueva"
+
+    with _conectar(ruta) as conexion, conexion:
+        # sqlite3 no abre la transacción antes de las sentencias DDL: se abre aquí
+        conexion.execute("BEGIN IMMEDIATE")
+        conexion.execute(f"DROP TABLE IF EXISTS {tabla_nueva}")
+        conexion.execute(f"CREATE TABLE {tabla_nueva} ({COLUMNA_POSICION} INTEGER PRIMARY KEY, {columnas})")
+        conexion.executemany(f"INSERT INTO {tabla_nueva} VALUES ({marcadores})",
+                             ([posicion] + fila for posicion, fila in enumerate(_filas(df))))
+        conexion.execute(f"DROP TABLE IF EXISTS {TABLA_REGISTROS}")
+        conexion.execute(f"ALTER TABLE {tabla_nueva} RENAME TO {TABLA_REGISTROS}")
+        if 'Cod' in df.columns:
+            conexion.execute(f"CREATE INDEX idx_{TABLA_REGISTROS}_cod ON {TABLA_REGISTROS} (\"Cod\")")
+
+        conexion.execute(f"CREATE TABLE IF NOT EXISTS {TABLA_VERSION} (version TEXT)")
+        _renovar_version(conexion, hash_contenido(df))
+
+    return version_sqlite(ruta)
+
+
+def actualizar_registros_sqlite(ruta, df, posiciones, total_registros):
+    """
+    Actualiza registros existentes con sentencias UPDATE por posición, en una sola
+    transacción. No hace cambios si la tabla no tiene las columnas de df o el mismo
+    número de registros que el DataFrame completo.
+
+    Args:
+        ruta: Ruta de la base SQLite
+        df: DataFrame con los registros a actualizar (valores ya validados)
+        posiciones: Posición de cada registro de df en el DataFrame completo
+        total_registros: Número de registros del DataFrame completo
+
+    Returns:
+        str: Nueva versión de los datos, o None si no se actualizó la tabla
+    """
+    if columnas_sqlite(ruta) != list(df.columns):
+        return None
+
+    asignaciones = ', '.join(f"{_identificador(columna)} = ?" for columna in df.columns)
+
+    with _conectar(ruta) as conexion, conexion:
+        # Comprobar el número de registros y actualizar en la misma transacción
+        conexion.execute("BEGIN IMMEDIATE")
+        if conexion.execute(f"SELECT COUNT(*) FROM {TABLA_REGISTROS}").fetchone()[0] != total_registros:
+            return None
+
+        cursor = conexion.executemany(
+            f"UPDATE {TABLA_REGISTROS} SET {asignaciones} WHERE {COLUMNA_POSICION} = ?",
+            (fila + [int(posicion)] for fila, posicion in zip(_filas(df), posiciones)))
+        if cursor.rowcount != len(df):
+            raise sqlite3.IntegrityError("No se encontraron todos los registros a actualizar.")
+
+        _renovar_version(conexion)
+
+    return version_sqlite(ruta)
+
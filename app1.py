@@ -4,22 +4,30 @@ import numpy as np
 import plotly.express as px
 import plotly.figure_factory as ff
 import plotly.graph_objects as go
-from datetime import datetime, timedelta, date
-from validaciones_utils import validar_reglas_negocio, mostrar_estado_validaciones, verificar_condiciones_estandares, verificar_condiciones_oficio_cierre
+from datetime import datetime, date
+from reglas_utils import evaluar_reglas, aplicar_delta
+from alertas_utils import (obtener_alertas, resumir_alertas, seleccionar_pagina, COLUMNAS_ALERTAS, ESTADOS_ALERTA,
+                           TAMANO_PAGINA_ALERTAS)
+from cache_utils import estadisticas_cache_resultados
+from indice_utils import construir_indice_plazos
+from validaciones_utils import validar_reglas_negocio, validar_registro, mostrar_estado_validaciones, verificar_condiciones_estandares, verificar_condiciones_oficio_cierre
 import io
 import base64
 import os
 import re
-from fecha_utils import calcular_plazo_analisis, actualizar_plazo_analisis, calcular_plazo_cronograma, actualizar_plazo_cronograma, calcular_plazo_oficio_cierre, actualizar_plazo_oficio_cierre
+from fecha_utils import calcular_plazo_analisis, calcular_plazo_cronograma, calcular_plazo_oficio_cierre, derivar_plazos, derivar_plazos_incremental, materializar_fechas, quitar_fechas_tipadas, obtener_fecha, formatear_columna_fecha, estadisticas_cache_fechas
 
 # Importar las funciones corregidas
 from config import setup_page, load_css
 from data_utils import (
-    cargar_datos, procesar_metas, calcular_porcentaje_avance,
-    verificar_estado_fechas, formatear_fecha, es_fecha_valida,
-    validar_campos_fecha, guardar_datos_editados, procesar_fecha,
-    contar_registros_completados_por_fecha
+    cargar_datos, procesar_metas, calcular_porcentajes_avance, calcular_estados_fechas,
+    validar_campos_fecha, encolar_registro_editado, procesar_fecha,
+    contar_registros_completados_por_fecha, version_registros, importar_registros_csv,
+    exportar_registros_csv, escribir_registros_csv, generacion_registros, ALMACENAMIENTO_REGISTROS
 )
+from cola_guardado_utils import vaciar_cola_guardado, estado_cola_guardado, reemplazar_con_cola
+from cambios_utils import huellas_celdas, guardar_si_cambio, estadisticas_cambios
+from diario_utils import historial_cambios
 from visualization import crear_gantt, comparar_avance_metas
 from constants import REGISTROS_DATA, META_DATA
 
@@ -74,7 +82,7 @@ def crear_template_excel():
 
 
 def mostrar_dashboard(df_filtrado, metas_nuevas_df, metas_actualizar_df, registros_df, 
-                     entidad_seleccionada, funcionario_seleccionado, nivel_seleccionado):
+                     entidad_seleccionada, funcionario_seleccionado, nivel_seleccionado, indice_plazos=None):
     """Muestra el dashboard principal con métricas y gráficos."""
     # Mostrar métricas generales
     st.markdown('<div class="subtitle">Métricas Generales</div>', unsafe_allow_html=True)
@@ -204,7 +212,7 @@ def mostrar_dashboard(df_filtrado, metas_nuevas_df, metas_actualizar_df, registr
                     unsafe_allow_html=True)
 
         # Crear el diagrama de Gantt
-        fig_gantt = crear_gantt(df_filtrado)
+        fig_gantt = crear_gantt(df_filtrado, indice_plazos)
         if fig_gantt is not None:
             st.plotly_chart(fig_gantt, use_container_width=True)
         else:
@@ -249,7 +257,7 @@ def mostrar_dashboard(df_filtrado, metas_nuevas_df, metas_actualizar_df, registr
 
         for col in columnas_fecha:
             if col in df_mostrar.columns:
-                df_mostrar[col] = df_mostrar[col].apply(lambda x: formatear_fecha(x) if es_fecha_valida(x) else "")
+                df_mostrar[col] = formatear_columna_fecha(df_filtrado, col)
 
         # Mostrar el dataframe con formato
         st.dataframe(
@@ -284,17 +292,19 @@ def mostrar_dashboard(df_filtrado, metas_nuevas_df, metas_actualizar_df, registr
             # BOTÓN PARA DESCARGAR TODOS LOS REGISTROS (datos completos)
             output_completo = io.BytesIO()
             with pd.ExcelWriter(output_completo, engine='openpyxl') as writer:
-                registros_df.to_excel(writer, sheet_name='Registros Completos', index=False)
+                # Exportar sin las columnas de fechas tipadas de uso interno
+                registros_exportar = quitar_fechas_tipadas(registros_df)
+                registros_exportar.to_excel(writer, sheet_name='Registros Completos', index=False)
 
                 # Añadir hojas adicionales con categorías
-                if 'TipoDato' in registros_df.columns:
+                if 'TipoDato' in registros_exportar.columns:
                     # Hoja para registros nuevos
-                    registros_nuevos = registros_df[registros_df['TipoDato'].str.upper() == 'NUEVO']
+                    registros_nuevos = registros_exportar[registros_exportar['TipoDato'].str.upper() == 'NUEVO']
                     if not registros_nuevos.empty:
                         registros_nuevos.to_excel(writer, sheet_name='Registros Nuevos', index=False)
 
                     # Hoja para registros a actualizar
-                    registros_actualizar = registros_df[registros_df['TipoDato'].str.upper() == 'ACTUALIZAR']
+                    registros_actualizar = registros_exportar[registros_exportar['TipoDato'].str.upper() == 'ACTUALIZAR']
                     if not registros_actualizar.empty:
                         registros_actualizar.to_excel(writer, sheet_name='Registros a Actualizar', index=False)
 
@@ -351,6 +361,64 @@ def fecha_desde_selector_a_string(fecha):
     return fecha.strftime('%d/%m/%Y')
 
 
+def mostrar_hallazgos(hallazgos):
+    """Muestra los hallazgos de las reglas de negocio según su severidad."""
+    for _, hallazgo in hallazgos.drop_duplicates('Regla').iterrows():
+        if hallazgo['Severidad'] == 'error':
+            st.error(hallazgo['Mensaje'])
+        elif hallazgo['Severidad'] == 'advertencia':
+            st.warning(hallazgo['Mensaje'])
+        else:
+            st.info(hallazgo['Mensaje'])
+
+
+def aplicar_reglas_registro(registros_df, indice_seleccionado):
+    """
+    Aplica las reglas de negocio solo al registro editado, escribe sus correcciones en el
+    DataFrame y muestra un mensaje por cada regla que lo modificó.
+    """
+    fila = registros_df.index[indice_seleccionado]
+    materializar_fechas(registros_df, filas=[fila])
+    registro, hallazgos = evaluar_reglas(registros_df, filas=[fila])
+    aplicar_delta(registros_df, registro)
+    mostrar_hallazgos(hallazgos)
+    return hallazgos
+
+
+def guardar_registro(registros_df, indice_seleccionado, mostrar_mensajes=False):
+    """
+    Valida solo el registro editado (plazos y reglas de negocio), escribe sus
+    correcciones en el DataFrame y pone únicamente ese registro en la cola de guardado.
+    """
+    fila = registros_df.index[indice_seleccionado]
+    registro, hallazgos = validar_registro(registros_df, fila)
+    aplicar_delta(registros_df, registro)
+    if mostrar_mensajes:
+        mostrar_hallazgos(hallazgos)
+    return encolar_registro_editado(registros_df, fila)
+
+
+@st.fragment(run_every=2)
+def mostrar_estado_guardado():
+    """
+    Indica si hay cambios en la cola de guardado o si ya se escribieron en disco. Se
+    actualiza cada pocos segundos sin recargar el resto del tablero.
+    """
+    estado = estado_cola_guardado()
+
+    if estado['pendientes']:
+        st.warning(f"⏳ Cambios pendientes de guardar (se guardan en menos de {estado['ventana']:g} s).")
+        if st.button("💾 Guardar ahora"):
+            exito, mensaje = vaciar_cola_guardado()
+            if not exito:
+                st.error(mensaje)
+    elif estado['ultimo_guardado'] is not None:
+        st.success(f"✅ Cambios guardados a las {estado['ultimo_guardado']:%H:%M:%S}.")
+
+    if estado['ultimo_error']:
+        st.error(f"Último error de guardado: {estado['ultimo_error']}")
+
+
 def mostrar_edicion_registros(registros_df):
     """Muestra la pestaña de edición de registros."""
     st.markdown('<div class="subtitle">Edición de Registros</div>', unsafe_allow_html=True)
@@ -728,15 +796,9 @@ def mostrar_edicion_registros(registros_df):
                         indice_seleccionado], 'Fecha de entrega de información'] = nueva_fecha_entrega_info_str
                     edited = True
 
-                    # Actualizar automáticamente todos los plazos
-                    registros_df = actualizar_plazo_analisis(registros_df)
-                    registros_df = actualizar_plazo_cronograma(registros_df)
-                    registros_df = actualizar_plazo_oficio_cierre(registros_df)
-
-                    # Guardar los datos actualizados inmediatamente para asegurarnos de que los cambios persistan
-                    exito, mensaje = guardar_datos_editados(registros_df)
-                    if not exito:
-                        st.warning(f"No se pudieron guardar los plazos actualizados: {mensaje}")
+                    # Actualizar automáticamente los plazos del registro editado y registrarlo
+                    # en la cola de guardado, que lo escribe en disco en unos segundos
+                    exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
 
                     # Mostrar los nuevos plazos calculados
                     nuevo_plazo_analisis = registros_df.iloc[indice_seleccionado][
@@ -748,8 +810,6 @@ def mostrar_edicion_registros(registros_df):
                     st.info(f"El plazo de análisis se ha actualizado automáticamente a: {nuevo_plazo_analisis}")
                     st.info(f"El plazo de cronograma se ha actualizado automáticamente a: {nuevo_plazo_cronograma}")
 
-                    # Guardar cambios inmediatamente
-                    exito, mensaje = guardar_datos_editados(registros_df)
                     if exito:
                         st.success("Fecha de entrega actualizada y plazos recalculados correctamente.")
                         st.session_state.cambios_pendientes = False
@@ -838,28 +898,14 @@ def mostrar_edicion_registros(registros_df):
                     # Actualizar la fecha sin restricciones
                     registros_df.at[
                         registros_df.index[indice_seleccionado], 'Estándares'] = nueva_fecha_estandares_str
-                    
-                    # Actualizar campos de estándares que no estén "Completo" a "No aplica"
-                    campos_estandares = ['Registro (completo)', 'ET (completo)', 'CO (completo)', 'DD (completo)',
-                                         'REC (completo)', 'SERVICIO (completo)']
-                    
-                    campos_actualizados = []
-                    for campo in campos_estandares:
-                        if campo in registros_df.columns:
-                            valor_actual = str(registros_df.iloc[indice_seleccionado][campo]).strip()
-                            if valor_actual.upper() != "COMPLETO":
-                                registros_df.at[registros_df.index[indice_seleccionado], campo] = "No aplica"
-                                nombre_campo = campo.split(' (')[0]
-                                campos_actualizados.append(nombre_campo)
-                    
-                    if campos_actualizados:
-                        st.info(f"Los siguientes estándares se actualizaron a 'No aplica': {', '.join(campos_actualizados)}")
-                    
+
+                    # Actualizar campos de estándares que no estén "Completo" a "No aplica" (reglas de negocio)
+                    aplicar_reglas_registro(registros_df, indice_seleccionado)
+
                     edited = True
 
                     # Guardar cambios inmediatamente
-                    registros_df = validar_reglas_negocio(registros_df)
-                    exito, mensaje = guardar_datos_editados(registros_df)
+                    exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                     if exito:
                         st.success("Fecha de estándares actualizada y guardada correctamente.")
                         st.session_state.cambios_pendientes = False
@@ -873,8 +919,7 @@ def mostrar_edicion_registros(registros_df):
                         registros_df.index[indice_seleccionado], 'Estándares'] = nueva_fecha_estandares_str
                     edited = True
                     # Guardar cambios inmediatamente
-                    registros_df = validar_reglas_negocio(registros_df)
-                    exito, mensaje = guardar_datos_editados(registros_df)
+                    exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                     if exito:
                         st.success("Fecha de estándares actualizada y guardada correctamente.")
                         st.session_state.cambios_pendientes = False
@@ -932,8 +977,7 @@ def mostrar_edicion_registros(registros_df):
                         edited = True
 
                         # Guardar cambios inmediatamente al modificar estándares
-                        registros_df = validar_reglas_negocio(registros_df)
-                        exito, mensaje = guardar_datos_editados(registros_df)
+                        exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                         if exito:
                             st.success(
                                 f"Campo '{nombre_campo}' actualizado a '{nuevo_valor}' y guardado correctamente.")
@@ -1003,8 +1047,7 @@ def mostrar_edicion_registros(registros_df):
                         edited = True
 
                         # Guardar cambios inmediatamente para validar reglas de negocio
-                        registros_df = validar_reglas_negocio(registros_df)
-                        exito, mensaje = guardar_datos_editados(registros_df)
+                        exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                         if exito:
                             st.success("Cambios guardados correctamente.")
                             st.session_state.cambios_pendientes = False
@@ -1053,18 +1096,16 @@ def mostrar_edicion_registros(registros_df):
                 fecha_original = "" if pd.isna(row['Publicación']) else row['Publicación']
 
                 if nueva_fecha_publicacion_str and nueva_fecha_publicacion_str != fecha_original:
-                    # Actualizar automáticamente "Disponer datos temáticos" a "Si"
-                    if 'Disponer datos temáticos' in registros_df.columns:
-                        registros_df.at[registros_df.index[indice_seleccionado], 'Disponer datos temáticos'] = 'Si'
-                        st.info("Se ha actualizado automáticamente 'Disponer datos temáticos' a 'Si'")
-                    
                     # Actualizar la fecha de publicación
                     registros_df.at[
                         registros_df.index[indice_seleccionado], 'Publicación'] = nueva_fecha_publicacion_str
                     edited = True
 
+                    # Actualizar automáticamente "Disponer datos temáticos" a "Si" (reglas de negocio)
+                    aplicar_reglas_registro(registros_df, indice_seleccionado)
+
                     # Recalcular el plazo de oficio de cierre inmediatamente
-                    registros_df = actualizar_plazo_oficio_cierre(registros_df)
+                    registros_df = derivar_plazos(registros_df, filas=[registros_df.index[indice_seleccionado]])
 
                     # Obtener el nuevo plazo calculado
                     nuevo_plazo_oficio = registros_df.iloc[indice_seleccionado][
@@ -1074,8 +1115,7 @@ def mostrar_edicion_registros(registros_df):
                         f"El plazo de oficio de cierre se ha actualizado automáticamente a: {nuevo_plazo_oficio}")
 
                     # Guardar cambios inmediatamente
-                    registros_df = validar_reglas_negocio(registros_df)
-                    exito, mensaje = guardar_datos_editados(registros_df)
+                    exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                     if exito:
                         st.success(
                             "Fecha de publicación actualizada y plazo de oficio de cierre recalculado correctamente.")
@@ -1096,8 +1136,7 @@ def mostrar_edicion_registros(registros_df):
 
                     edited = True
                     # Guardar cambios inmediatamente
-                    registros_df = validar_reglas_negocio(registros_df)
-                    exito, mensaje = guardar_datos_editados(registros_df)
+                    exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                     if exito:
                         st.success("Fecha de publicación actualizada y guardada correctamente.")
                         st.session_state.cambios_pendientes = False
@@ -1148,8 +1187,7 @@ def mostrar_edicion_registros(registros_df):
                             edited = True
 
                             # Guardar y validar inmediatamente para detectar posibles cambios en fecha de oficio de cierre
-                            registros_df = validar_reglas_negocio(registros_df)
-                            exito, mensaje = guardar_datos_editados(registros_df)
+                            exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                             if exito:
                                 st.success("Campo actualizado correctamente.")
                                 st.session_state.cambios_pendientes = False
@@ -1174,8 +1212,7 @@ def mostrar_edicion_registros(registros_df):
                             edited = True
 
                             # Guardar y validar inmediatamente para detectar posibles cambios en fecha de oficio de cierre
-                            registros_df = validar_reglas_negocio(registros_df)
-                            exito, mensaje = guardar_datos_editados(registros_df)
+                            exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                             if exito:
                                 st.success("Campo actualizado correctamente.")
                                 st.session_state.cambios_pendientes = False
@@ -1202,31 +1239,26 @@ def mostrar_edicion_registros(registros_df):
 
                         # Si se ha introducido una nueva fecha de oficio de cierre
                         if nueva_fecha_oficio_str and nueva_fecha_oficio_str != fecha_original:
-                            # Solo validar que la publicación esté completada
-                            tiene_publicacion = (
-                                'Publicación' in row and 
-                                pd.notna(row['Publicación']) and 
-                                row['Publicación'] != ""
-                            )
-
-                            if not tiene_publicacion:
-                                st.error(
-                                    "No es posible diligenciar la Fecha de oficio de cierre. Debe completar primero la etapa de Publicación.")
+                            # Validar la nueva fecha con las reglas de negocio sin modificar el registro
+                            candidato = registros_df.loc[[registros_df.index[indice_seleccionado]]].copy()
+                            candidato['Fecha de oficio de cierre'] = nueva_fecha_oficio_str
+                            materializar_fechas(candidato, columnas=['Fecha de oficio de cierre'])
+                            _, hallazgos = evaluar_reglas(candidato, solo_reporte=True)
+                            errores = hallazgos[hallazgos['Severidad'] == 'error']
+
+                            if not errores.empty:
+                                st.error(errores['Mensaje'].iloc[0])
                             else:
                                 # Actualizar fecha de oficio de cierre
                                 registros_df.at[registros_df.index[
                                     indice_seleccionado], 'Fecha de oficio de cierre'] = nueva_fecha_oficio_str
 
-                                # Actualizar Estado a "Completado" automáticamente
-                                registros_df.at[registros_df.index[indice_seleccionado], 'Estado'] = 'Completado'
-
-                                # Recalcular el porcentaje de avance (ahora será 100% automáticamente)
-                                registros_df.at[registros_df.index[indice_seleccionado], 'Porcentaje Avance'] = calcular_porcentaje_avance(registros_df.iloc[indice_seleccionado])
+                                # Actualizar Estado a "Completado" y el avance al 100% (reglas de negocio)
+                                aplicar_reglas_registro(registros_df, indice_seleccionado)
 
                                 edited = True
                                 # Guardar cambios
-                                registros_df = validar_reglas_negocio(registros_df)
-                                exito, mensaje = guardar_datos_editados(registros_df)
+                                exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                                 if exito:
                                     st.success(
                                         "Fecha de oficio de cierre actualizada. Estado cambiado a 'Completado' y avance al 100%.")
@@ -1242,16 +1274,12 @@ def mostrar_edicion_registros(registros_df):
                             registros_df.at[registros_df.index[
                                 indice_seleccionado], 'Fecha de oficio de cierre'] = nueva_fecha_oficio_str
 
-                            # Si se borra la fecha de oficio, cambiar estado a "En proceso"
-                            if registros_df.at[registros_df.index[indice_seleccionado], 'Estado'] == 'Completado':
-                                registros_df.at[registros_df.index[indice_seleccionado], 'Estado'] = 'En proceso'
-                                st.info(
-                                    "El estado ha sido cambiado a 'En proceso' porque se eliminó la fecha de oficio de cierre.")
+                            # Si se borra la fecha de oficio, cambiar estado a "En proceso" (reglas de negocio)
+                            aplicar_reglas_registro(registros_df, indice_seleccionado)
 
                             edited = True
                             # Guardar cambios
-                            registros_df = validar_reglas_negocio(registros_df)
-                            exito, mensaje = guardar_datos_editados(registros_df)
+                            exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                             if exito:
                                 st.success("Fecha de oficio de cierre actualizada correctamente.")
                                 st.session_state.cambios_pendientes = False
@@ -1307,8 +1335,7 @@ def mostrar_edicion_registros(registros_df):
                         edited = True
 
                         # Guardar y validar inmediatamente sin recargar la página
-                        registros_df = validar_reglas_negocio(registros_df)
-                        exito, mensaje = guardar_datos_editados(registros_df)
+                        exito, mensaje = guardar_registro(registros_df, indice_seleccionado)
                         if exito:
                             st.success("Estado actualizado correctamente.")
                             st.session_state.cambios_pendientes = False
@@ -1333,17 +1360,11 @@ def mostrar_edicion_registros(registros_df):
             # Mostrar botón de guardar si se han hecho cambios
             if edited or st.session_state.cambios_pendientes:
                 if st.button("Guardar Todos los Cambios", key=f"guardar_{indice_seleccionado}"):
-                    # Aplicar validaciones de reglas de negocio antes de guardar
-                    registros_df = validar_reglas_negocio(registros_df)
-
-                    # Actualizar el plazo de análisis después de los cambios
-                    registros_df = actualizar_plazo_analisis(registros_df)
-
-                    # Actualizar el plazo de oficio de cierre después de los cambios
-                    registros_df = actualizar_plazo_oficio_cierre(registros_df)
-
-                    # Guardar los datos en el archivo
-                    exito, mensaje = guardar_datos_editados(registros_df)
+                    # Validar (reglas de negocio y plazos) y guardar solo el registro editado,
+                    # escribiendo de inmediato los cambios pendientes
+                    exito, mensaje = guardar_registro(registros_df, indice_seleccionado, mostrar_mensajes=True)
+                    if exito:
+                        exito, mensaje = vaciar_cola_guardado()
 
                     if exito:
                         st.session_state.mensaje_guardado = ("success", mensaje)
@@ -1358,6 +1379,23 @@ def mostrar_edicion_registros(registros_df):
             if st.button("Actualizar Vista", key=f"actualizar_{indice_seleccionado}"):
                 st.rerun()
 
+            # Auditoría de las ediciones guardadas en el diario de cambios
+            if ALMACENAMIENTO_REGISTROS == 'diario':
+                with st.expander("Historial de cambios del registro"):
+                    historial = historial_cambios('registros.csv', indice_seleccionado, cod=row['Cod'])
+                    if historial.empty:
+                        st.info("No hay cambios registrados para este registro.")
+                    else:
+                        st.dataframe(
+                            historial[['fecha', 'columna', 'anterior', 'nuevo']].rename(columns={
+                                'fecha': 'Fecha', 'columna': 'Campo',
+                                'anterior': 'Valor anterior', 'nuevo': 'Valor nuevo'}),
+                            use_container_width=True, hide_index=True)
+
+        # Mantener las fechas tipadas del registro editado al día para las demás pestañas
+        if edited:
+            materializar_fechas(registros_df, filas=[registros_df.index[indice_seleccionado]])
+
     except Exception as e:
         st.error(f"Error al editar el registro: {e}")
 
@@ -1407,7 +1445,7 @@ def mostrar_detalle_cronogramas(df_filtrado):
 
     # ✅ Crear gráfico de registros completados por fecha (corregido)
     df_fechas = df_filtrado.copy()
-    df_fechas['Fecha'] = df_fechas['Publicación'].apply(procesar_fecha)
+    df_fechas['Fecha'] = df_fechas.apply(lambda row: obtener_fecha(row, 'Publicación'), axis=1)
     df_fechas = df_fechas[df_fechas['Fecha'].notna()]
 
     df_completados = df_fechas.groupby('Fecha').size().reset_index(name='Registros Completados')
@@ -1487,6 +1525,9 @@ def mostrar_exportar_resultados(df_filtrado):
 
     col1, col2 = st.columns(2)
 
+    # Exportar sin las columnas de fechas tipadas de uso interno
+    df_filtrado = quitar_fechas_tipadas(df_filtrado)
+
     with col1:
         # Exportar a CSV
         csv = df_filtrado.to_csv(index=False).encode('utf-8')
@@ -1548,7 +1589,7 @@ def mostrar_diagnostico(registros_df, meta_df, metas_nuevas_df, metas_actualizar
         st.markdown("#### Análisis de Valores Faltantes")
 
         # Contar valores faltantes por columna
-        valores_faltantes = registros_df.isna().sum()
+        valores_faltantes = quitar_fechas_tipadas(registros_df).isna().sum()
 
         # Crear dataframe para mostrar
         df_faltantes = pd.DataFrame({
@@ -1584,6 +1625,49 @@ def mostrar_diagnostico(registros_df, meta_df, metas_nuevas_df, metas_actualizar
         else:
             st.success("¡No hay valores faltantes en los datos!")
 
+        # Caché del procesamiento de fechas
+        st.markdown("#### Caché de Fechas")
+        cache_fechas = estadisticas_cache_fechas()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Aciertos", cache_fechas['aciertos'])
+        with col2:
+            st.metric("Fallos", cache_fechas['fallos'])
+        with col3:
+            st.metric("Fechas en caché", f"{cache_fechas['tamano']} / {cache_fechas['maximo']}")
+
+        # Caché de alertas por versión de datos y día de corte
+        st.markdown("#### Caché de Alertas")
+        cache_alertas = estadisticas_cache_resultados()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Aciertos", cache_alertas['aciertos'])
+        with col2:
+            st.metric("Fallos", cache_alertas['fallos'])
+        with col3:
+            st.metric("Invalidaciones", cache_alertas['invalidaciones'])
+        with col4:
+            st.metric("Resultados en caché", f"{cache_alertas['entradas']} / {cache_alertas['maximo']}")
+
+        # Guardados al cargar el tablero: solo se escriben los registros que cambiaron
+        st.markdown("#### Escrituras de Registros")
+        cambios = estadisticas_cambios()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Escrituras evitadas", cambios['evitados'])
+        with col2:
+            st.metric("Guardados parciales", cambios['parciales'])
+        with col3:
+            st.metric("Guardados completos", cambios['completos'])
+        with col4:
+            st.metric("Registros guardados", cambios['filas_guardadas'])
+        if cambios['columnas_modificadas']:
+            st.caption(f"Columnas modificadas en el último guardado: {', '.join(cambios['columnas_modificadas'])}")
+        generacion, vigente = generacion_registros('registros.csv')
+        if generacion:
+            st.caption(f"Generación de registros.csv: {generacion}" +
+                       ("" if vigente else " (el archivo se modificó fuera de la aplicación)"))
+
         # Distribución de registros por entidad
         st.markdown("#### Distribución de Registros por Entidad")
 
@@ -1668,367 +1752,20 @@ def mostrar_ayuda():
 
 # Nueva función para mostrar alertas de vencimientos
 # Función mostrar_alertas_vencimientos corregida para el error NaTType
-def mostrar_alertas_vencimientos(registros_df):
+def mostrar_alertas_vencimientos(registros_df, indice_plazos=None, version_datos=None):
     """Muestra alertas de vencimientos de fechas en los registros."""
     st.markdown('<div class="subtitle">Alertas de Vencimientos</div>', unsafe_allow_html=True)
 
-    # Fecha actual para comparaciones
-    fecha_actual = datetime.now().date()
-
-    # Función para calcular días hábiles entre fechas (excluyendo fines de semana y festivos)
-    def calcular_dias_habiles(fecha_inicio, fecha_fin):
-        if not fecha_inicio or not fecha_fin:
-            return None
-
-        # Convertir a objetos date si son datetime
-        if isinstance(fecha_inicio, datetime):
-            fecha_inicio = fecha_inicio.date()
-        if isinstance(fecha_fin, datetime):
-            fecha_fin = fecha_fin.date()
-
-        # Si la fecha de inicio es posterior a la fecha fin, devolver días negativos
-        if fecha_inicio > fecha_fin:
-            return -calcular_dias_habiles(fecha_fin, fecha_inicio)
-
-        # Calcular días hábiles
-        dias = 0
-        fecha_actual = fecha_inicio
-        while fecha_actual <= fecha_fin:
-            # Si no es fin de semana (0=lunes, 6=domingo)
-            if fecha_actual.weekday() < 5:
-                dias += 1
-            fecha_actual += timedelta(days=1)
-
-        return dias
-
-    # Función para determinar si una fecha está próxima a vencer (dentro de 5 días hábiles)
-    def es_proximo_vencimiento(fecha_limite):
-        if not fecha_limite:
-            return False
-
-        # Convertir a objeto date si es datetime
-        if isinstance(fecha_limite, datetime):
-            fecha_limite = fecha_limite.date()
-
-        # Si ya está vencido, no es "próximo a vencer"
-        if fecha_limite < fecha_actual:
-            return False
-
-        # Calcular días hábiles hasta la fecha límite
-        dias_habiles = calcular_dias_habiles(fecha_actual, fecha_limite)
-
-        # Si está dentro de los próximos 5 días hábiles
-        return dias_habiles is not None and 0 <= dias_habiles <= 5
-
-    # Función para determinar si una fecha está vencida
-    def es_vencido(fecha_limite):
-        if not fecha_limite:
-            return False
-
-        # Convertir a objeto date si es datetime
-        if isinstance(fecha_limite, datetime):
-            fecha_limite = fecha_limite.date()
-
-        return fecha_limite < fecha_actual
-
-    # Función para calcular días de rezago
-    def calcular_dias_rezago(fecha_limite):
-        if not fecha_limite or not es_vencido(fecha_limite):
-            return None
-
-        # Convertir a objeto date si es datetime
-        if isinstance(fecha_limite, datetime):
-            fecha_limite = fecha_limite.date()
-
-        return (fecha_actual - fecha_limite).days
-
-    # Función para formatear fechas de manera segura
-    def formatear_fecha_segura(fecha):
-        if fecha is None or pd.isna(fecha):
-            return ""
-        try:
-            return fecha.strftime('%d/%m/%Y')
-        except:
-            return ""
-
-    # Preprocesar registros para el análisis
-    registros_alertas = []
-
-    for idx, row in registros_df.iterrows():
-        try:
-            # Procesar fechas (convertir de string a datetime) con manejo seguro de NaT
-            fecha_entrega_acuerdo = procesar_fecha(row.get('Entrega acuerdo de compromiso', ''))
-            fecha_entrega_info = procesar_fecha(row.get('Fecha de entrega de información', ''))
-            fecha_plazo_cronograma = procesar_fecha(row.get('Plazo de cronograma', ''))
-            fecha_analisis_cronograma = procesar_fecha(row.get('Análisis y cronograma', ''))
-            fecha_estandares_prog = procesar_fecha(row.get('Estándares (fecha programada)', ''))
-            fecha_estandares = procesar_fecha(row.get('Estándares', ''))
-            fecha_publicacion_prog = procesar_fecha(row.get('Fecha de publicación programada', ''))
-            fecha_publicacion = procesar_fecha(row.get('Publicación', ''))
-            fecha_plazo_oficio_cierre = procesar_fecha(row.get('Plazo de oficio de cierre', ''))
-            fecha_oficio_cierre = procesar_fecha(row.get('Fecha de oficio de cierre', ''))
-
-            # Caso especial: Acuerdo de compromiso pendiente
-            if fecha_entrega_acuerdo is not None and pd.notna(fecha_entrega_acuerdo) and (
-                    fecha_entrega_info is None or pd.isna(fecha_entrega_info)):
-                if es_vencido(fecha_entrega_acuerdo):
-                    dias_rezago = calcular_dias_rezago(fecha_entrega_acuerdo)
-                    registros_alertas.append({
-                        'Cod': row['Cod'],
-                        'Entidad': row['Entidad'],
-                        'Nivel Información': row.get('Nivel Información ', ''),
-                        'Funcionario': row.get('Funcionario', ''),
-                        'Tipo Alerta': 'Acuerdo de compromiso',
-                        'Fecha Programada': fecha_entrega_acuerdo,
-                        'Fecha Real': None,
-                        'Días Rezago': dias_rezago,
-                        'Estado': 'Vencido',
-                        'Descripción': f'Entrega de acuerdo vencida hace {dias_rezago} días sin fecha de entrega de información'
-                    })
-
-            # 1. Entrega de información
-            if fecha_entrega_acuerdo is not None and pd.notna(fecha_entrega_acuerdo):
-                if fecha_entrega_info is not None and pd.notna(fecha_entrega_info):
-                    # Si hay fecha real, verificar si está con retraso
-                    if fecha_entrega_info > fecha_entrega_acuerdo:
-                        dias_rezago = calcular_dias_habiles(fecha_entrega_acuerdo, fecha_entrega_info)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Entrega de información',
-                            'Fecha Programada': fecha_entrega_acuerdo,
-                            'Fecha Real': fecha_entrega_info,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Completado con retraso',
-                            'Descripción': f'Entrega de información con {dias_rezago} días hábiles de retraso'
-                        })
-                else:
-                    # No hay fecha real, verificar si está vencido
-                    if es_vencido(fecha_entrega_acuerdo):
-                        dias_rezago = calcular_dias_rezago(fecha_entrega_acuerdo)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Entrega de información',
-                            'Fecha Programada': fecha_entrega_acuerdo,
-                            'Fecha Real': None,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Vencido',
-                            'Descripción': f'Entrega de información vencida hace {dias_rezago} días'
-                        })
-
-            # 2. Análisis y cronograma
-            if fecha_plazo_cronograma is not None and pd.notna(fecha_plazo_cronograma):
-                if fecha_analisis_cronograma is not None and pd.notna(fecha_analisis_cronograma):
-                    # Hay fecha real, verificar si está con retraso
-                    if fecha_analisis_cronograma > fecha_plazo_cronograma:
-                        dias_rezago = calcular_dias_habiles(fecha_plazo_cronograma, fecha_analisis_cronograma)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Análisis y cronograma',
-                            'Fecha Programada': fecha_plazo_cronograma,
-                            'Fecha Real': fecha_analisis_cronograma,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Completado con retraso',
-                            'Descripción': f'Análisis realizado con {dias_rezago} días hábiles de retraso'
-                        })
-                else:
-                    # No hay fecha real, verificar si está vencido o próximo
-                    if es_vencido(fecha_plazo_cronograma):
-                        dias_rezago = calcular_dias_rezago(fecha_plazo_cronograma)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Análisis y cronograma',
-                            'Fecha Programada': fecha_plazo_cronograma,
-                            'Fecha Real': None,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Vencido',
-                            'Descripción': f'Plazo de cronograma vencido hace {dias_rezago} días sin fecha real'
-                        })
-                    elif es_proximo_vencimiento(fecha_plazo_cronograma):
-                        dias_restantes = calcular_dias_habiles(fecha_actual, fecha_plazo_cronograma)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Análisis y cronograma',
-                            'Fecha Programada': fecha_plazo_cronograma,
-                            'Fecha Real': None,
-                            'Días Rezago': -dias_restantes,  # Negativo indica días por vencer
-                            'Estado': 'Próximo a vencer',
-                            'Descripción': f'Plazo de cronograma vence en {dias_restantes} días hábiles'
-                        })
-
-            # 3. Estándares - mismo patrón de verificación mejorado
-            if fecha_estandares_prog is not None and pd.notna(fecha_estandares_prog):
-                if fecha_estandares is not None and pd.notna(fecha_estandares):
-                    # Hay fecha real, verificar si está con retraso
-                    if fecha_estandares > fecha_estandares_prog:
-                        dias_rezago = calcular_dias_habiles(fecha_estandares_prog, fecha_estandares)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Estándares',
-                            'Fecha Programada': fecha_estandares_prog,
-                            'Fecha Real': fecha_estandares,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Completado con retraso',
-                            'Descripción': f'Estándares completados con {dias_rezago} días hábiles de retraso'
-                        })
-                else:
-                    # No hay fecha real, verificar si está vencido o próximo
-                    if es_vencido(fecha_estandares_prog):
-                        dias_rezago = calcular_dias_rezago(fecha_estandares_prog)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Estándares',
-                            'Fecha Programada': fecha_estandares_prog,
-                            'Fecha Real': None,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Vencido',
-                            'Descripción': f'Plazo de estándares vencido hace {dias_rezago} días sin fecha real'
-                        })
-                    elif es_proximo_vencimiento(fecha_estandares_prog):
-                        dias_restantes = calcular_dias_habiles(fecha_actual, fecha_estandares_prog)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Estándares',
-                            'Fecha Programada': fecha_estandares_prog,
-                            'Fecha Real': None,
-                            'Días Rezago': -dias_restantes,
-                            'Estado': 'Próximo a vencer',
-                            'Descripción': f'Plazo de estándares vence en {dias_restantes} días hábiles'
-                        })
-
-            # 4. Publicación - mismo patrón de verificación mejorado
-            if fecha_publicacion_prog is not None and pd.notna(fecha_publicacion_prog):
-                if fecha_publicacion is not None and pd.notna(fecha_publicacion):
-                    # Hay fecha real, verificar si está con retraso
-                    if fecha_publicacion > fecha_publicacion_prog:
-                        dias_rezago = calcular_dias_habiles(fecha_publicacion_prog, fecha_publicacion)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Publicación',
-                            'Fecha Programada': fecha_publicacion_prog,
-                            'Fecha Real': fecha_publicacion,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Completado con retraso',
-                            'Descripción': f'Publicación realizada con {dias_rezago} días hábiles de retraso'
-                        })
-                else:
-                    # No hay fecha real, verificar si está vencido o próximo
-                    if es_vencido(fecha_publicacion_prog):
-                        dias_rezago = calcular_dias_rezago(fecha_publicacion_prog)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Publicación',
-                            'Fecha Programada': fecha_publicacion_prog,
-                            'Fecha Real': None,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Vencido',
-                            'Descripción': f'Plazo de publicación vencido hace {dias_rezago} días sin fecha real'
-                        })
-                    elif es_proximo_vencimiento(fecha_publicacion_prog):
-                        dias_restantes = calcular_dias_habiles(fecha_actual, fecha_publicacion_prog)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Publicación',
-                            'Fecha Programada': fecha_publicacion_prog,
-                            'Fecha Real': None,
-                            'Días Rezago': -dias_restantes,
-                            'Estado': 'Próximo a vencer',
-                            'Descripción': f'Plazo de publicación vence en {dias_restantes} días hábiles'
-                        })
-
-            # 5. Cierre - mismo patrón de verificación mejorado
-            if fecha_plazo_oficio_cierre is not None and pd.notna(fecha_plazo_oficio_cierre):
-                if fecha_oficio_cierre is not None and pd.notna(fecha_oficio_cierre):
-                    # Hay fecha real, verificar si está con retraso
-                    if fecha_oficio_cierre > fecha_plazo_oficio_cierre:
-                        dias_rezago = calcular_dias_habiles(fecha_plazo_oficio_cierre, fecha_oficio_cierre)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Cierre',
-                            'Fecha Programada': fecha_plazo_oficio_cierre,
-                            'Fecha Real': fecha_oficio_cierre,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Completado con retraso',
-                            'Descripción': f'Oficio de cierre realizado con {dias_rezago} días hábiles de retraso'
-                        })
-                else:
-                    # No hay fecha real, verificar si está vencido o próximo
-                    if es_vencido(fecha_plazo_oficio_cierre):
-                        dias_rezago = calcular_dias_rezago(fecha_plazo_oficio_cierre)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Cierre',
-                            'Fecha Programada': fecha_plazo_oficio_cierre,
-                            'Fecha Real': None,
-                            'Días Rezago': dias_rezago,
-                            'Estado': 'Vencido',
-                            'Descripción': f'Plazo de oficio de cierre vencido hace {dias_rezago} días sin fecha real'
-                        })
-                    elif es_proximo_vencimiento(fecha_plazo_oficio_cierre):
-                        dias_restantes = calcular_dias_habiles(fecha_actual, fecha_plazo_oficio_cierre)
-                        registros_alertas.append({
-                            'Cod': row['Cod'],
-                            'Entidad': row['Entidad'],
-                            'Nivel Información': row.get('Nivel Información ', ''),
-                            'Funcionario': row.get('Funcionario', ''),
-                            'Tipo Alerta': 'Cierre',
-                            'Fecha Programada': fecha_plazo_oficio_cierre,
-                            'Fecha Real': None,
-                            'Días Rezago': -dias_restantes,
-                            'Estado': 'Próximo a vencer',
-                            'Descripción': f'Plazo de oficio de cierre vence en {dias_restantes} días hábiles'
-                        })
-        except Exception as e:
-            st.warning(f"Error procesando registro {row['Cod']}: {e}")
-            continue
-
-    # Crear DataFrame de alertas
-    if registros_alertas:
-        df_alertas = pd.DataFrame(registros_alertas)
-
-        # Asegurarse de que las fechas se formateen correctamente
-        for col in ['Fecha Programada', 'Fecha Real']:
-            if col in df_alertas.columns:
-                df_alertas[col] = df_alertas[col].apply(formatear_fecha_segura)
+    # Obtener las alertas y sus agregados (en caché por versión de datos y día)
+    try:
+        df_alertas, resumen_alertas = obtener_alertas(registros_df, indice_plazos=indice_plazos,
+                                                      version_datos=version_datos)
+    except Exception as e:
+        st.warning(f"Error al generar las alertas: {e}")
+        df_alertas = pd.DataFrame(columns=COLUMNAS_ALERTAS)
+        resumen_alertas = resumir_alertas(df_alertas)
 
+    if not df_alertas.empty:
         # Aplicar colores según estado
         def highlight_estado(val):
             if val == 'Vencido':
@@ -2045,7 +1782,7 @@ def mostrar_alertas_vencimientos(registros_df):
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            num_vencidos = len(df_alertas[df_alertas['Estado'] == 'Vencido'])
+            num_vencidos = resumen_alertas['por_estado']['Vencido']
             st.markdown(f"""
             <div class="metric-card" style="background-color: #fee2e2;">
                 <p style="font-size: 1rem; color: #b91c1c;">Vencidos</p>
@@ -2054,7 +1791,7 @@ def mostrar_alertas_vencimientos(registros_df):
             """, unsafe_allow_html=True)
 
         with col2:
-            num_proximos = len(df_alertas[df_alertas['Estado'] == 'Próximo a vencer'])
+            num_proximos = resumen_alertas['por_estado']['Próximo a vencer']
             st.markdown(f"""
             <div class="metric-card" style="background-color: #fef3c7;">
                 <p style="font-size: 1rem; color: #b45309;">Próximos a vencer</p>
@@ -2063,7 +1800,7 @@ def mostrar_alertas_vencimientos(registros_df):
             """, unsafe_allow_html=True)
 
         with col3:
-            num_retrasados = len(df_alertas[df_alertas['Estado'] == 'Completado con retraso'])
+            num_retrasados = resumen_alertas['por_estado']['Completado con retraso']
             st.markdown(f"""
             <div class="metric-card" style="background-color: #dbeafe;">
                 <p style="font-size: 1rem; color: #1e40af;">Completados con retraso</p>
@@ -2075,16 +1812,9 @@ def mostrar_alertas_vencimientos(registros_df):
             # Gráfico de alertas por tipo
             st.markdown("### Alertas por Tipo")
 
-            alertas_por_tipo = df_alertas.groupby(['Tipo Alerta', 'Estado']).size().unstack(fill_value=0)
-
-            # Asegurarse de que existan todas las columnas
-            for estado in ['Vencido', 'Próximo a vencer', 'Completado con retraso']:
-                if estado not in alertas_por_tipo.columns:
-                    alertas_por_tipo[estado] = 0
-
-            # Reordenar las columnas para mantener consistencia visual
-            columnas_orden = ['Vencido', 'Próximo a vencer', 'Completado con retraso']
-            columnas_disponibles = [col for col in columnas_orden if col in alertas_por_tipo.columns]
+            # Tabla por tipo con todas las columnas de estado, en orden consistente
+            alertas_por_tipo = resumen_alertas['por_tipo']
+            columnas_disponibles = ESTADOS_ALERTA
 
             fig = px.bar(
                 alertas_por_tipo.reset_index(),
@@ -2176,28 +1906,35 @@ def mostrar_alertas_vencimientos(registros_df):
         columnas_alertas_existentes = [col for col in columnas_alertas if col in df_alertas_filtrado.columns]
 
         try:
-            # Ordenar por estado (vencidos primero) y días de rezago (mayor a menor para vencidos)
-            df_alertas_filtrado['Estado_orden'] = df_alertas_filtrado['Estado'].map({
-                'Vencido': 1,
-                'Próximo a vencer': 2,
-                'Completado con retraso': 3
-            })
-
-            df_alertas_filtrado = df_alertas_filtrado.sort_values(
-                by=['Estado_orden', 'Días Rezago'],
-                ascending=[True, False]
-            )
-
-            # Mostrar tabla con formato
+            # Clave de orden precalculada: estado (vencidos primero) y días de rezago (mayor a menor)
+            claves = resumen_alertas['clave_orden'][df_alertas_filtrado.index.to_numpy()]
+
+            # Paginación: solo se ordena y se da formato a la página visible
+            total_alertas = len(df_alertas_filtrado)
+            total_paginas = max(1, -(-total_alertas // TAMANO_PAGINA_ALERTAS))
+            if st.session_state.get('pagina_alertas', 1) > total_paginas:
+                st.session_state.pagina_alertas = 1
+
+            pagina = 1
+            if total_paginas > 1:
+                pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas,
+                                         value=1, step=1, key='pagina_alertas')
+
+            df_pagina = df_alertas_filtrado.iloc[seleccionar_pagina(claves, pagina - 1)]
+            if total_alertas:
+                inicio = (pagina - 1) * TAMANO_PAGINA_ALERTAS
+                st.caption(f"Mostrando alertas {inicio + 1} a {inicio + len(df_pagina)} de {total_alertas}")
+
+            # Mostrar la página con formato
             st.dataframe(
-                df_alertas_filtrado[columnas_alertas_existentes]
-                .style.applymap(lambda _: '',
-                                subset=['Cod', 'Entidad', 'Nivel Información', 'Funcionario', 'Tipo Alerta',
-                                        'Fecha Programada', 'Fecha Real', 'Descripción'])
-                .applymap(highlight_estado, subset=['Estado'])
+                df_pagina[columnas_alertas_existentes]
+                .style.applymap(highlight_estado, subset=['Estado'])
                 .format({'Días Rezago': '{:+d}'})  # Mostrar signo + o - en días rezago
             )
 
+            # Todas las alertas filtradas, en el orden del listado, para la descarga
+            df_alertas_filtrado = df_alertas_filtrado.iloc[np.argsort(claves, kind='stable')]
+
             # Botón para descargar alertas
             output = io.BytesIO()
             with pd.ExcelWriter(output, engine='openpyxl') as writer:
@@ -2404,7 +2141,7 @@ def mostrar_reportes(registros_df, tipo_dato_filtro, acuerdo_filtro, analisis_fi
     
     for col in columnas_fecha:
         if col in df_mostrar.columns:
-            df_mostrar[col] = df_mostrar[col].apply(lambda x: formatear_fecha(x) if es_fecha_valida(x) else "")
+            df_mostrar[col] = formatear_columna_fecha(df_filtrado, col)
     
     # Mostrar dataframe con formato
     st.dataframe(
@@ -2494,6 +2231,10 @@ def main():
         if 'funcionarios' not in st.session_state:
             st.session_state.funcionarios = []
 
+        # Huellas de las fechas de origen de los plazos de la última materialización
+        if 'huellas_plazos' not in st.session_state:
+            st.session_state.huellas_plazos = None
+
         # Configuración de la página
         setup_page()
 
@@ -2527,6 +2268,18 @@ def main():
                 help="Descarga una plantilla de Excel con las columnas requeridas y un ejemplo"
             )
             
+            if ALMACENAMIENTO_REGISTROS in ('sqlite', 'diario'):
+                st.markdown("#### Exportar Registros")
+                if st.button("📤 Exportar registros a CSV",
+                             help="Escribe en registros.csv los registros guardados en registros.db "
+                                  "o en el diario de cambios"):
+                    try:
+                        vaciar_cola_guardado()
+                        exportar_registros_csv('registros.csv')
+                        st.success("Registros exportados a registros.csv.")
+                    except Exception as e:
+                        st.error(f"Error al exportar los registros: {e}")
+
             st.markdown("#### Cargar Datos")
             archivo_cargado = st.file_uploader(
                 "Subir archivo Excel",
@@ -2543,8 +2296,15 @@ def main():
                     st.success(f"Archivo cargado: {len(df_cargado)} filas")
                     
                     if st.button("💾 Aplicar datos cargados"):
-                        # Guardar el archivo como registros.csv
-                        df_cargado.to_csv('registros.csv', index=False, sep=';')
+                        def aplicar_datos_cargados():
+                            # Guardar el archivo como registros.csv (nueva generación, reemplazo atómico)
+                            escribir_registros_csv('registros.csv', df_cargado.to_csv(index=False, sep=';'))
+                            # Con SQLite, reemplazar la tabla de registros con el archivo cargado
+                            importar_registros_csv('registros.csv')
+
+                        # Escribir los cambios pendientes antes de reemplazar los registros, sin que
+                        # la cola escriba cambios de otra sesión encima del archivo cargado
+                        reemplazar_con_cola('registros.csv', aplicar_datos_cargados)
                         st.success("Datos aplicados correctamente. Recargando...")
                         st.rerun()
                         
@@ -2563,6 +2323,9 @@ def main():
         # Cargar datos
         registros_df, meta_df = cargar_datos()
 
+        # Huellas de los valores cargados, para guardar solo lo que cambie
+        huellas_cargadas = huellas_celdas(registros_df)
+
         # Asegurar que las columnas requeridas existan
         columnas_requeridas = ['Cod', 'Entidad', 'TipoDato', 'Acuerdo de compromiso',
                                'Análisis y cronograma', 'Estándares', 'Publicación',
@@ -2573,16 +2336,18 @@ def main():
             if columna not in registros_df.columns:
                 registros_df[columna] = ''
 
-        # Actualizar automáticamente todos los plazos
-        registros_df = actualizar_plazo_analisis(registros_df)
-        registros_df = actualizar_plazo_cronograma(registros_df)
-        registros_df = actualizar_plazo_oficio_cierre(registros_df)
+        # Actualizar automáticamente los plazos, recalculando solo las filas con fechas modificadas
+        registros_df, st.session_state.huellas_plazos = derivar_plazos_incremental(
+            registros_df, st.session_state.huellas_plazos)
 
-        # Guardar los datos actualizados inmediatamente
-        exito, mensaje = guardar_datos_editados(registros_df)
+        # Poner en la cola de guardado solo los registros que cambiaron
+        exito, mensaje = guardar_si_cambio(registros_df, huellas_cargadas)
         if not exito:
             st.warning(f"No se pudieron guardar los plazos actualizados: {mensaje}")
 
+        with st.sidebar:
+            mostrar_estado_guardado()
+
         # Verificar si los DataFrames están vacíos o no tienen registros
         if registros_df.empty:
             st.error(
@@ -2633,12 +2398,6 @@ def main():
             """)
             mostrar_estado_validaciones(registros_df, st)
 
-        # Actualizar automáticamente el plazo de análisis
-        registros_df = actualizar_plazo_analisis(registros_df)
-
-        # Actualizar automáticamente el plazo de oficio de cierre
-        registros_df = actualizar_plazo_oficio_cierre(registros_df)
-
         # Procesar las metas
         metas_nuevas_df, metas_actualizar_df = procesar_metas(meta_df)
 
@@ -2658,10 +2417,17 @@ def main():
             registros_df[columna] = registros_df[columna].astype(str)
 
         # Agregar columna de porcentaje de avance
-        registros_df['Porcentaje Avance'] = registros_df.apply(calcular_porcentaje_avance, axis=1)
+        registros_df['Porcentaje Avance'] = calcular_porcentajes_avance(registros_df)
+
+        # Índice de vencimientos para las consultas por rango de fechas de todas las pestañas
+        indice_plazos = construir_indice_plazos(registros_df)
+
+        # Versión del contenido de los registros, para reutilizar resultados en caché
+        version_datos = version_registros('registros.csv')
 
         # Agregar columna de estado de fechas
-        registros_df['Estado Fechas'] = registros_df.apply(verificar_estado_fechas, axis=1)
+        registros_df['Estado Fechas'] = calcular_estados_fechas(registros_df, fecha_corte=datetime.now(),
+                                                                indice_plazos=indice_plazos)
 
         # Crear pestañas - MODIFICADO: Cambio de "Datos Completos" a "Edición de Registros"
         # Cambiar la declaración de pestañas
@@ -2719,7 +2485,7 @@ def main():
             
             # MODIFICACIÓN: Pasar los valores de filtros a la función mostrar_dashboard
             mostrar_dashboard(df_filtrado, metas_nuevas_df, metas_actualizar_df, registros_df,
-                            entidad_seleccionada, funcionario_seleccionado, nivel_seleccionado)     
+                            entidad_seleccionada, funcionario_seleccionado, nivel_seleccionado, indice_plazos)     
         with tab2:
             registros_df = mostrar_edicion_registros(registros_df)
 
@@ -2728,7 +2494,7 @@ def main():
             # Ya no hay filtros en la parte superior de alertas
             st.markdown("---")  # Separador visual
     
-            mostrar_alertas_vencimientos(registros_df)
+            mostrar_alertas_vencimientos(registros_df, indice_plazos, version_datos)
 
         with tab4:
             # Nueva pestaña de Reportes
@@ -0,0 +1,71 @@
+import io
+import os
+import random
+import tempfile
+import time
+import pandas as pd
+from data_utils import normalizar_csv, leer_csv_tolerante
+
+
+def generar_registros_sinteticos(ruta_destino, filas=200_000, ruta_origen='registros.csv', semilla=42):
+    """
+    Genera un archivo de registros sintético replicando las filas de registros.csv.
+    Un pequeño porcentaje de filas se recorta o se alarga para simular filas irregulares.
+    """
+    with open(ruta_origen, 'r', encoding='utf-8') as f:
+        lineas = [linea for linea in f.read().split('\n') if linea.strip()]
+
+    encabezado, datos = lineas[0], lineas[1:]
+    aleatorio = random.Random(semilla)
+
+    with open(ruta_destino, 'w', encoding='utf-8') as f:
+        f.write(encabezado + '\n')
+        for i in range(filas):
+            campos = aleatorio.choice(datos).split(';')
+            campos[0] = str(i + 1)
+            azar = aleatorio.random()
+            if azar < 0.01:
+                campos = campos[:len(campos) // 2]  # Fila corta
+            elif azar < 0.02:
+                campos = campos + ['extra', 'extra']  # Fila larga
+            f.write(';'.join(campos) + '\n')
+
+
+def cargar_ruta_anterior(ruta):
+    """Ruta de carga anterior: normalizar_csv línea a línea y motor python."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+    contenido_normalizado = normalizar_csv(contenido, ';')
+    return pd.read_csv(io.StringIO(contenido_normalizado), sep=';',
+                       engine='python', on_bad_lines='skip', dtype=str)
+
+
+def medir(funcion, *args, repeticiones=3):
+    """Retorna el menor tiempo (en segundos) de varias ejecuciones y el último resultado."""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def ejecutar_benchmark(filas=200_000):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'registros_sinteticos.csv')
+        generar_registros_sinteticos(ruta, filas)
+
+        tiempo_anterior, df_anterior = medir(cargar_ruta_anterior, ruta)
+        tiempo_nuevo, (df_nuevo, lineas_omitidas) = medir(leer_csv_tolerante, ruta)
+
+    print(f"Archivo sintético: {filas} filas")
+    print(f"Ruta anterior (normalizar_csv + motor python): {tiempo_anterior:.2f} s")
+    print(f"Lector tolerante (motor C): {tiempo_nuevo:.2f} s")
+    print(f"Aceleración: {tiempo_anterior / tiempo_nuevo:.1f}x")
+    print(f"Líneas omitidas: {lineas_omitidas}")
+    print(f"Mismo resultado: {df_anterior.fillna('').equals(df_nuevo.fillna(''))}")
+
+
+if __name__ == "__main__":
+    ejecutar_benchmark()
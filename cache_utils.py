@@ -0,0 +1,48 @@
+# Caché de resultados derivados de los registros (alertas y sus agregados).
+# Las claves incluyen la versión de los datos, de modo que un resultado solo se
+# reutiliza mientras el contenido de registros.csv no cambie.
+MAX_ENTRADAS_CACHE = 16
+
+_CACHE_RESULTADOS = {}
+_ESTADISTICAS_CACHE = {'aciertos': 0, 'fallos': 0, 'invalidaciones': 0}
+
+
+def obtener_de_cache(clave, calcular):
+    """
+    Retorna el resultado guardado para la clave o lo calcula con calcular() y lo guarda.
+    Las claves son tuplas (nombre del resultado, versión de los datos, parámetros...).
+    Cuando la caché está llena se descarta la entrada más antigua.
+    """
+    if clave in _CACHE_RESULTADOS:
+        _ESTADISTICAS_CACHE['aciertos'] += 1
+        return _CACHE_RESULTADOS[clave]
+
+    _ESTADISTICAS_CACHE['fallos'] += 1
+    resultado = calcular()
+
+    if len(_CACHE_RESULTADOS) >= MAX_ENTRADAS_CACHE:
+        _CACHE_RESULTADOS.pop(next(iter(_CACHE_RESULTADOS)), None)
+    _CACHE_RESULTADOS[clave] = resultado
+    return resultado
+
+
+def invalidar_cache_resultados(version_vigente=None):
+    """
+    Descarta los resultados calculados sobre versiones de datos anteriores.
+
+    Args:
+        version_vigente: Versión de los datos recién guardados; sus resultados se
+                         conservan. Si es None se descarta toda la caché.
+    """
+    # Se recorre una copia de las claves: los guardados en segundo plano invalidan la caché
+    obsoletas = [clave for clave in list(_CACHE_RESULTADOS)
+                 if version_vigente is None or clave[1] != version_vigente]
+    for clave in obsoletas:
+        _CACHE_RESULTADOS.pop(clave, None)
+    if obsoletas:
+        _ESTADISTICAS_CACHE['invalidaciones'] += 1
+
+
+def estadisticas_cache_resultados():
+    """Retorna los aciertos, fallos, invalidaciones y entradas de la caché de resultados."""
+    return dict(_ESTADISTICAS_CACHE, entradas=len(_CACHE_RESULTADOS), maximo=MAX_ENTRADAS_CACHE)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from constants import PREFIJO_FECHA_TIPADA
+from data_utils import encolar_datos_editados, encolar_registros_editados
+
+# Guardados evitados porque los registros no cambiaron, y guardados realizados
+_ESTADISTICAS_CAMBIOS = {'evitados': 0, 'parciales': 0, 'completos': 0,
+                         'filas_guardadas': 0, 'columnas_modificadas': []}
+
+
+def huellas_celdas(df):
+    """
+    Calcula la huella (hash de 64 bits) de cada celda de las columnas de texto de un
+    DataFrame de registros. Las columnas de fechas tipadas se omiten porque se derivan
+    de las de texto.
+
+    Returns:
+        DataFrame: Huellas con el mismo índice y las mismas columnas de texto que df
+    """
+    columnas = [columna for columna in df.columns if not str(columna).startswith(PREFIJO_FECHA_TIPADA)]
+    return pd.DataFrame({columna: pd.util.hash_pandas_object(df[columna].astype(object), index=False).to_numpy()
+                         for columna in columnas}, index=df.index)
+
+
+def detectar_cambios(huellas_previas, df):
+    """
+    Compara las huellas de un DataFrame con las tomadas antes de modificarlo.
+
+    Returns:
+        dict: {'estructura': True si cambiaron las filas o las columnas,
+               'filas': etiquetas de las filas con algún valor distinto,
+               'columnas': columnas con algún valor distinto}
+    """
+    huellas = huellas_celdas(df)
+    if not (huellas.index.equals(huellas_previas.index) and list(huellas.columns) == list(huellas_previas.columns)):
+        return {'estructura': True, 'filas': df.index, 'columnas': list(huellas.columns)}
+
+    distintas = huellas.to_numpy() != huellas_previas.to_numpy()
+    return {
+        'estructura': False,
+        'filas': df.index[distintas.any(axis=1)],
+        'columnas': list(huellas.columns[distintas.any(axis=0)])
+    }
+
+
+def guardar_si_cambio(df, huellas_previas, ruta_archivo='registros.csv'):
+    """
+    Pone en la cola de guardado solo lo que cambió desde que se tomaron las huellas:
+    las filas modificadas, o todos los registros si cambió la estructura. Si no hay
+    cambios no se escribe nada y se cuenta como guardado evitado.
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    cambios = detectar_cambios(huellas_previas, df)
+
+    if cambios['estructura']:
+        _ESTADISTICAS_CAMBIOS['completos'] += 1
+        _ESTADISTICAS_CAMBIOS['columnas_modificadas'] = cambios['columnas']
+        return encolar_datos_editados(df, ruta_archivo)
+
+    if len(cambios['filas']) == 0:
+        _ESTADISTICAS_CAMBIOS['evitados'] += 1
+        return True, "Sin cambios que guardar."
+
+    _ESTADISTICAS_CAMBIOS['parciales'] += 1
+    _ESTADISTICAS_CAMBIOS['filas_guardadas'] += len(cambios['filas'])
+    _ESTADISTICAS_CAMBIOS['columnas_modificadas'] = cambios['columnas']
+    return encolar_registros_editados(df, cambios['filas'], ruta_archivo)
+
+
+def estadisticas_cambios():
+    """Retorna los guardados evitados y realizados por el control de cambios."""
+    return dict(_ESTADISTICAS_CAMBIOS)
+
+
+# Función para probar la detección de cambios
+def test_detectar_cambios():
+    df = pd.DataFrame({'Cod': ['1', '2', '3'], 'Plazo de análisis': ['', '10/01/2025', '']})
+    huellas = huellas_celdas(df)
+
+    print(f"Sin cambios: {detectar_cambios(huellas, df)}")
+
+    df.loc[2, 'Plazo de análisis'] = '15/01/2025'
+    print(f"Una celda: {detectar_cambios(huellas, df)}")
+
+    df['Nueva'] = np.nan
+    print(f"Columna agregada: {detectar_cambios(huellas, df)['estructura']}")
+
+
+if __name__ == "__main__":
+    test_detectar_cambios()
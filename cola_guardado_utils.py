@@ -0,0 +1,203 @@
+import os
+import atexit
+import threading
+import time
+from datetime import datetime
+
+# Cola de guardado diferido: los cambios se aplican en memoria de inmediato y un hilo en
+# segundo plano los escribe en disco cuando el cambio pendiente más antiguo cumple la
+# ventana de guardado. Los cambios sucesivos sobre la misma ruta se combinan en una sola
+# escritura. Al terminar el proceso se escriben los cambios pendientes.
+VENTANA_GUARDADO_SEGUNDOS = float(os.environ.get('VENTANA_GUARDADO_SEGUNDOS', '2'))
+
+# Cambios pendientes por ruta: {'datos', 'filas' (None = todas), 'escribir', 'desde',
+# 'version', 'generacion'}
+_PENDIENTES = {}
+_AVISO = threading.Condition()
+
+# Serializa las escrituras. Las lecturas no lo toman: los archivos se reemplazan de forma
+# atómica y un cambio sigue en la cola hasta que termina de escribirse.
+_ESCRITURA = threading.RLock()
+
+_ESTADO_COLA = {'hilo': None}
+_ESTADISTICAS_COLA = {'encolados': 0, 'escrituras': 0, 'errores': 0,
+                      'ultimo_guardado': None, 'ultimo_error': None}
+
+
+def encolar_guardado(ruta, datos, escribir, filas=None):
+    """
+    Registra un cambio pendiente de guardar. Se conserva una copia de los datos, de modo
+    que el llamador puede seguir modificándolos.
+
+    Si ya hay cambios pendientes con las mismas filas y columnas, de un guardado por
+    registros solo se toman las filas indicadas: así no se pierden los registros que
+    otra sesión editó durante la misma ventana. Un guardado completo, o datos con otra
+    estructura, reemplazan los datos pendientes.
+
+    Args:
+        ruta: Ruta del archivo de destino
+        datos: DataFrame completo con el cambio aplicado
+        escribir: Función escribir(datos, filas) que guarda los datos y retorna (exito, mensaje)
+        filas: Etiquetas de las filas modificadas (None si se debe guardar todo)
+    """
+    with _AVISO:
+        pendiente = _PENDIENTES.get(ruta)
+        if pendiente is None:
+            pendiente = _PENDIENTES[ruta] = {'filas': [], 'desde': time.monotonic()}
+
+        previos = pendiente.get('datos')
+        combinar = (filas is not None and previos is not None and previos.index.equals(datos.index)
+                    and list(previos.columns) == list(datos.columns))
+
+        if combinar:
+            # Se combina sobre una copia: los datos pendientes pueden estar escribiéndose
+            filas = list(filas)
+            combinados = previos.copy()
+            combinados.loc[filas] = datos.loc[filas]
+            pendiente['datos'] = combinados
+        else:
+            pendiente['datos'] = datos.copy()
+
+        if filas is None or pendiente['filas'] is None or (previos is not None and not combinar):
+            pendiente['filas'] = None
+        else:
+            pendiente['filas'].extend(fila for fila in filas if fila not in pendiente['filas'])
+
+        pendiente['escribir'] = escribir
+        pendiente['version'] = None
+        pendiente['generacion'] = pendiente.get('generacion', 0) + 1
+        _ESTADISTICAS_COLA['encolados'] += 1
+
+        _iniciar_escritor()
+        _AVISO.notify()
+
+
+def leer_con_cola(ruta, leer):
+    """
+    Retorna (copia de los datos pendientes, 0) si hay cambios sin guardar para la ruta;
+    si no, el resultado de leer(ruta).
+    """
+    with _AVISO:
+        pendiente = _PENDIENTES.get(ruta)
+        if pendiente is not None:
+            return pendiente['datos'].copy(), 0
+    return leer(ruta)
+
+
+def reemplazar_con_cola(ruta, reemplazar):
+    """
+    Escribe los cambios pendientes de una ruta y ejecuta reemplazar() sin que la cola
+    escriba en medio. Los cambios que se registren para la ruta mientras tanto se basan
+    en los datos reemplazados y se descartan, para que no se escriban encima.
+
+    Returns:
+        El resultado de reemplazar()
+    """
+    with _ESCRITURA:
+        vaciar_cola_guardado(ruta)
+        resultado = reemplazar()
+        with _AVISO:
+            _PENDIENTES.pop(ruta, None)
+        return resultado
+
+
+def version_en_cola(ruta, calcular):
+    """
+    Versión de los datos pendientes de una ruta, calculada una sola vez con
+    calcular(datos), o None si la ruta no tiene cambios pendientes.
+    """
+    with _AVISO:
+        pendiente = _PENDIENTES.get(ruta)
+        if pendiente is None:
+            return None
+        if pendiente['version'] is None:
+            pendiente['version'] = f"cola:{calcular(pendiente['datos'])}"
+        return pendiente['version']
+
+
+def vaciar_cola_guardado(ruta=None):
+    """
+    Escribe de inmediato los cambios pendientes (de una ruta o de todas).
+
+    Un cambio sigue en la cola mientras se escribe, de modo que su versión continúa
+    vigente; si se registran nuevos cambios durante la escritura, o la escritura falla,
+    quedan pendientes.
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    with _ESCRITURA:
+        with _AVISO:
+            rutas = list(_PENDIENTES) if ruta is None else [r for r in _PENDIENTES if r == ruta]
+            pendientes = [(r, _PENDIENTES[r], dict(_PENDIENTES[r])) for r in rutas]
+            for _, _, escritura in pendientes:
+                if escritura['filas'] is not None:
+                    escritura['filas'] = list(escritura['filas'])
+
+        errores = []
+        for ruta_pendiente, pendiente, escritura in pendientes:
+            try:
+                exito, mensaje = escritura['escribir'](escritura['datos'], escritura['filas'])
+            except Exception as e:
+                exito, mensaje = False, f"Error al guardar datos: {e}"
+
+            with _AVISO:
+                if not exito:
+                    # Conservar los cambios y reintentar al cumplirse de nuevo la ventana
+                    pendiente['desde'] = time.monotonic()
+                elif pendiente['generacion'] == escritura['generacion']:
+                    _PENDIENTES.pop(ruta_pendiente, None)
+
+            _ESTADISTICAS_COLA['escrituras'] += 1
+            if exito:
+                _ESTADISTICAS_COLA['ultimo_guardado'] = datetime.now()
+            else:
+                _ESTADISTICAS_COLA['errores'] += 1
+                _ESTADISTICAS_COLA['ultimo_error'] = f"{ruta_pendiente}: {mensaje}"
+                errores.append(mensaje)
+
+    if errores:
+        return False, '; '.join(errores)
+    return True, "Datos guardados correctamente."
+
+
+def estado_cola_guardado():
+    """Retorna los cambios pendientes, el último guardado y las estadísticas de la cola."""
+    with _AVISO:
+        pendientes = list(_PENDIENTES.values())
+        antiguedad = time.monotonic() - min(p['desde'] for p in pendientes) if pendientes else None
+
+    return dict(_ESTADISTICAS_COLA,
+                pendientes=len(pendientes),
+                registros_pendientes=None if any(p['filas'] is None for p in pendientes)
+                else sum(len(p['filas']) for p in pendientes),
+                segundos_pendiente=antiguedad,
+                ventana=VENTANA_GUARDADO_SEGUNDOS)
+
+
+def _iniciar_escritor():
+    """Inicia el hilo de escritura si no está activo (se llama con _AVISO tomado)."""
+    hilo = _ESTADO_COLA['hilo']
+    if hilo is None or not hilo.is_alive():
+        hilo = threading.Thread(target=_escritor, name='cola-guardado', daemon=True)
+        _ESTADO_COLA['hilo'] = hilo
+        hilo.start()
+
+
+def _escritor():
+    """Espera a que el cambio pendiente más antiguo cumpla la ventana y vacía la cola."""
+    while True:
+        with _AVISO:
+            while not _PENDIENTES:
+                _AVISO.wait()
+
+            espera = min(p['desde'] for p in _PENDIENTES.values()) + VENTANA_GUARDADO_SEGUNDOS - time.monotonic()
+            if espera > 0:
+                _AVISO.wait(espera)
+                continue
+
+        vaciar_cola_guardado()
+
+
+# Garantizar que los cambios pendientes se escriban al terminar el proceso
+atexit.register(vaciar_cola_guardado)
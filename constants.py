@@ -42,12 +42,16 @@ Mes;Acuerdo de compromiso;Análisis y cronograma;Estándares;Publicación;;Acuer
 # Lista de valores que se consideran positivos para verificación de campos
 VALORES_POSITIVOS = ['SI', 'SÍ', 'S', 'YES', 'Y', 'COMPLETO', 'COMPLETADO', 'TERMINADO']
 
-# Definición de hitos y sus pesos para el cálculo de porcentaje
+# Valores que indican que el acuerdo de compromiso está completo
+VALORES_ACUERDO_POSITIVOS = ['SI', 'SÍ', 'S', 'YES', 'Y', 'COMPLETO']
+
+# Definición de hitos y sus pesos (en puntos porcentuales) para el cálculo de porcentaje.
+# Con fecha de oficio de cierre el avance es siempre 100%.
 HITOS = {
-    'Acuerdo de compromiso': 0.25,
-    'Análisis y cronograma': 0.25,
-    'Estándares': 0.25,
-    'Publicación': 0.25
+    'Acuerdo de compromiso': 20,
+    'Análisis y cronograma': 20,
+    'Estándares': 30,
+    'Publicación': 25
 }
 
 # Mapeo de campos de fechas para presentación
@@ -57,6 +61,20 @@ CAMPOS_FECHA = {
     'Publicación': 'Fecha de publicación programada'
 }
 
+# Columnas de fecha que se convierten una sola vez a datetime64 al cargar los registros
+COLUMNAS_FECHA = list(CAMPOS_FECHA) + list(CAMPOS_FECHA.values()) + [
+    'Suscripción acuerdo de compromiso',
+    'Entrega acuerdo de compromiso',
+    'Fecha de entrega de información',
+    'Plazo de análisis',
+    'Plazo de cronograma',
+    'Plazo de oficio de cierre',
+    'Fecha de oficio de cierre'
+]
+
+# Prefijo de las columnas datetime64 que acompañan a cada columna de fecha
+PREFIJO_FECHA_TIPADA = '_fecha_'
+
 # Duración de los hitos en días (para el Gantt)
 DURACION_HITOS = {
     'Acuerdo de compromiso': 7,  # 1 semana
@@ -75,3 +93,8 @@ COLORES_HITOS = {
 
 # Días de alerta para fechas próximas a vencer
 DIAS_ALERTA = 30
+
+# Días hábiles para el cálculo automático de plazos
+DIAS_HABILES_PLAZO_ANALISIS = 5  # Después de la fecha de entrega de información
+DIAS_HABILES_PLAZO_CRONOGRAMA = 3  # Después del plazo de análisis
+DIAS_HABILES_PLAZO_OFICIO_CIERRE = 7  # Después de la fecha de publicación
@@ -3,9 +3,48 @@ import numpy as np
 import io
 import re
 import os
+import json
+import hashlib
+import warnings
+import threading
 import streamlit as st
 from datetime import datetime, timedelta
-from constants import REGISTROS_DATA, META_DATA
+from constants import (REGISTROS_DATA, META_DATA, COLUMNAS_FECHA, HITOS, VALORES_ACUERDO_POSITIVOS,
+                       CAMPOS_FECHA, DIAS_ALERTA)
+from fecha_utils import (procesar_fecha, materializar_fechas, quitar_fechas_tipadas, obtener_fecha,
+                         columna_tipada)
+from indice_utils import construir_indice_plazos, consultar_plazos, indice_vigente
+from cache_utils import invalidar_cache_resultados
+from almacenamiento_utils import (ruta_sqlite, version_sqlite, leer_registros_sqlite,
+                                  escribir_registros_sqlite, actualizar_registros_sqlite,
+                                  hash_contenido)
+from cola_guardado_utils import encolar_guardado, leer_con_cola, version_en_cola
+from diario_utils import (UMBRAL_COMPACTACION_DIARIO, rutas_diario, anotar_cambios, leer_diario,
+                          aplicar_diario, archivar_diario)
+
+# Caracteres de control que se eliminan de los valores cargados
+PATRON_CARACTERES_CONTROL = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+
+# Filas serializadas del último CSV guardado por ruta, para guardar solo el registro editado
+_FILAS_CSV = {}
+
+# Almacenamiento de los registros: 'csv' (se reescribe el archivo completo), 'sqlite'
+# (registros.db, con actualización por registro) o 'diario' (CSV base más un diario de
+# cambios que se compacta periódicamente). Se elige con la variable de entorno
+# ALMACENAMIENTO_REGISTROS; la ruta de los registros es siempre la del CSV.
+ALMACENAMIENTO_REGISTROS = os.environ.get('ALMACENAMIENTO_REGISTROS', 'csv')
+
+# Registros guardados (texto limpio de base más diario) por ruta, para anotar en el
+# diario los valores anteriores de cada edición
+_ESTADO_DIARIO = {}
+_BLOQUEO_DIARIO = threading.RLock()
+
+# pyarrow es opcional: sin él no se usan snapshots y siempre se lee el CSV
+try:
+    import pyarrow  # noqa: F401
+    SNAPSHOT_DISPONIBLE = True
+except ImportError:
+    SNAPSHOT_DISPONIBLE = False
 
 
 def normalizar_csv(contenido, separador=';'):
@@ -35,6 +74,44 @@ def normalizar_csv(contenido, separador=';'):
     return '\n'.join(lineas_normalizadas)
 
 
+def leer_csv_tolerante(ruta, encabezado=True):
+    """
+    Lee un CSV con el motor C de pandas tolerando filas irregulares: las filas con menos
+    campos se completan con vacíos y las que tienen más se recortan al número de columnas
+    de la primera línea. El separador (';' o ',') se detecta a partir de la primera línea.
+
+    Returns:
+        tuple: (DataFrame con todos los valores como texto, número de líneas omitidas)
+    """
+    # Un solo archivo abierto: si se reemplaza durante la lectura, se sigue leyendo el mismo
+    with open(ruta, 'r', encoding='utf-8') as f:
+        primer_linea = f.readline()
+        f.seek(0)
+
+        separador = ';' if ';' in primer_linea else ','
+        columnas = primer_linea.count(separador) + 1
+
+        # usecols hace que el parser complete o recorte cada fila al número de columnas
+        with warnings.catch_warnings(record=True) as avisos:
+            warnings.simplefilter('always', pd.errors.ParserWarning)
+            df = pd.read_csv(f, sep=separador, header=0 if encabezado else None,
+                             usecols=range(columnas), dtype=str, engine='c',
+                             on_bad_lines='warn')
+
+    lineas_omitidas = sum(str(aviso.message).count('Skipping line') for aviso in avisos
+                          if issubclass(aviso.category, pd.errors.ParserWarning))
+
+    # Descartar las líneas que solo contienen espacios
+    if columnas > 1 and not df.empty:
+        primera = df.iloc[:, 0]
+        solo_espacios = (primera.notna() & (primera.str.strip() == '') &
+                         df.iloc[:, 1:].isna().all(axis=1))
+        if solo_espacios.any():
+            df = df[~solo_espacios].reset_index(drop=True)
+
+    return df, lineas_omitidas
+
+
 def limpiar_valor(valor):
     """Limpia un valor de entrada de posibles errores."""
     if pd.isna(valor) or valor is None:
@@ -44,11 +121,354 @@ def limpiar_valor(valor):
     valor = str(valor)
 
     # Eliminar caracteres problemáticos
-    valor = re.sub(r'[\000-\010]|[\013-\014]|[\016-\037]', '', valor)
+    valor = PATRON_CARACTERES_CONTROL.sub('', valor)
 
     return valor.strip()
 
 
+def limpiar_columna(serie):
+    """
+    Limpia una columna completa con operaciones vectorizadas, con el mismo resultado
+    que aplicar limpiar_valor a cada celda. La eliminación de caracteres de control
+    solo se ejecuta si la columna contiene alguno.
+    """
+    if isinstance(serie.dtype, pd.StringDtype):
+        texto = serie.fillna('')
+    else:
+        texto = serie.astype(object).where(serie.notna(), '').astype(str)
+
+    if texto.str.contains(PATRON_CARACTERES_CONTROL).any():
+        texto = texto.str.replace(PATRON_CARACTERES_CONTROL, '', regex=True)
+
+    return texto.str.strip()
+
+
+def limpiar_dataframe(df):
+    """Limpia todos los valores de un DataFrame, columna por columna."""
+    for col in df.columns:
+        df[col] = limpiar_columna(df[col])
+    return df
+
+
+def rutas_snapshot(ruta_csv):
+    """Devuelve las rutas del snapshot columnar y de su huella para un archivo CSV."""
+    base = os.path.splitext(ruta_csv)[0]
+    return f"{base}.snapshot.feather", f"{base}.snapshot.json"
+
+
+def huella_archivo(ruta, calcular_hash=True):
+    """Calcula la huella de un archivo: tamaño, fecha de modificación y hash del contenido."""
+    estado = os.stat(ruta)
+    huella = {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+
+    if calcular_hash:
+        sha = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloque)
+        huella['sha256'] = sha.hexdigest()
+
+    return huella
+
+
+def cargar_snapshot(ruta_csv):
+    """
+    Carga el snapshot columnar de un CSV si corresponde al contenido actual del archivo.
+    Si el tamaño y la fecha coinciden se usa directamente; si solo cambió la fecha,
+    se compara el hash del contenido. Retorna None si no hay snapshot válido.
+    """
+    if not SNAPSHOT_DISPONIBLE:
+        return None
+
+    ruta_datos, ruta_huella = rutas_snapshot(ruta_csv)
+    if not (os.path.exists(ruta_datos) and os.path.exists(ruta_huella)):
+        return None
+
+    try:
+        with open(ruta_huella, 'r', encoding='utf-8') as f:
+            huella_guardada = json.load(f)
+
+        huella_actual = huella_archivo(ruta_csv, calcular_hash=False)
+        if huella_actual['tamano'] != huella_guardada.get('tamano'):
+            return None
+
+        if huella_actual['mtime_ns'] != huella_guardada.get('mtime_ns'):
+            # El archivo fue modificado o tocado: comparar el contenido
+            huella_actual = huella_archivo(ruta_csv)
+            if huella_actual['sha256'] != huella_guardada.get('sha256'):
+                return None
+
+            # Mismo contenido: actualizar la huella para evitar recalcular el hash
+            _escribir_atomico(ruta_huella, json.dumps(huella_actual).encode('utf-8'))
+
+        return pd.read_feather(ruta_datos)
+    except Exception:
+        return None
+
+
+def guardar_snapshot(ruta_csv, df, huella=None):
+    """
+    Guarda el snapshot columnar de un DataFrame junto con la huella del CSV de origen
+    (la indicada, o la del archivo actual).
+    """
+    if not SNAPSHOT_DISPONIBLE:
+        return False
+
+    ruta_datos, ruta_huella = rutas_snapshot(ruta_csv)
+    try:
+        buffer = io.BytesIO()
+        df.reset_index(drop=True).to_feather(buffer)
+        _escribir_atomico(ruta_datos, buffer.getvalue())
+        _escribir_atomico(ruta_huella, json.dumps(huella or huella_archivo(ruta_csv)).encode('utf-8'))
+        return True
+    except Exception:
+        return False
+
+
+def version_registros(ruta_csv='registros.csv'):
+    """
+    Versión del contenido de los registros, o None si no existen. Con almacenamiento CSV
+    es el hash sha256 del archivo; con SQLite, el identificador de la última escritura.
+    Si hay cambios en la cola de guardado, es el hash de los datos pendientes.
+    """
+    version = version_en_cola(ruta_csv, hash_contenido)
+    if version is not None:
+        return version
+    return ALMACENAMIENTOS[ALMACENAMIENTO_REGISTROS]['version'](ruta_csv)
+
+
+def _version_csv(ruta_csv):
+    """
+    Hash sha256 de un archivo de registros, o None si no existe. Reutiliza el hash
+    guardado con el snapshot mientras el tamaño y la fecha de modificación del archivo
+    no cambien.
+    """
+    if not os.path.exists(ruta_csv):
+        return None
+
+    huella = huella_archivo(ruta_csv, calcular_hash=False)
+    _, ruta_huella = rutas_snapshot(ruta_csv)
+    try:
+        with open(ruta_huella, 'r', encoding='utf-8') as f:
+            huella_guardada = json.load(f)
+        if (huella_guardada.get('tamano') == huella['tamano'] and
+                huella_guardada.get('mtime_ns') == huella['mtime_ns'] and 'sha256' in huella_guardada):
+            return huella_guardada['sha256']
+    except (OSError, ValueError):
+        pass
+
+    return huella_archivo(ruta_csv)['sha256']
+
+
+def _escribir_atomico(ruta, contenido):
+    """
+    Escribe un archivo completo en un temporal propio del hilo, lo fuerza a disco y lo
+    renombra sobre el destino. Quien abra la ruta obtiene siempre el archivo anterior o
+    el nuevo completo, nunca uno a medio escribir.
+
+    Returns:
+        dict: Huella (tamaño y fecha de modificación) del archivo escrito, tomada del
+              temporal antes de renombrarlo, de modo que no puede corresponder a otra
+              escritura posterior
+    """
+    ruta_temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(ruta_temporal, 'wb') as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+            estado = os.fstat(f.fileno())
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+    _sincronizar_directorio(os.path.dirname(os.path.abspath(ruta)))
+    return {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+
+
+def _sincronizar_directorio(directorio):
+    """Fuerza a disco el renombrado de un archivo (no disponible en Windows)."""
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def ruta_generacion(ruta_csv):
+    """Devuelve la ruta del archivo con la generación de un archivo de registros CSV."""
+    return f"{os.path.splitext(ruta_csv)[0]}.generacion.json"
+
+
+def generacion_registros(ruta_csv='registros.csv'):
+    """
+    Retorna la generación del archivo de registros: el número de escrituras completas
+    hechas con escribir_registros_csv, y si el archivo actual es esa generación (False
+    si se modificó por fuera de la aplicación). Retorna (0, False) si no hay generación.
+    """
+    try:
+        with open(ruta_generacion(ruta_csv), 'r', encoding='utf-8') as f:
+            generacion = json.load(f)
+        vigente = huella_archivo(ruta_csv, calcular_hash=False) == {
+            'tamano': generacion.get('tamano'), 'mtime_ns': generacion.get('mtime_ns')}
+        return int(generacion['generacion']), vigente
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0, False
+
+
+def escribir_registros_csv(ruta_csv, contenido):
+    """
+    Escribe el texto completo de un archivo de registros como una nueva generación: el
+    archivo se reemplaza de forma atómica y después se anota el número de generación
+    con la huella del archivo escrito. Los lectores no necesitan bloqueos: al abrir la
+    ruta obtienen la última generación completa.
+
+    Returns:
+        tuple: (número de la generación escrita, huella del archivo escrito con el hash
+                de su contenido)
+    """
+    generacion = generacion_registros(ruta_csv)[0] + 1
+    datos = contenido.encode('utf-8')
+    huella = _escribir_atomico(ruta_csv, datos)
+    _escribir_atomico(ruta_generacion(ruta_csv), json.dumps(dict(huella, generacion=generacion)).encode('utf-8'))
+    return generacion, dict(huella, sha256=hashlib.sha256(datos).hexdigest())
+
+
+def cargar_registros(ruta_csv='registros.csv'):
+    """
+    Carga los registros con las fechas tipadas desde el almacenamiento activo, o desde
+    la cola de guardado si tienen cambios aún no escritos. No muestra mensajes, de modo
+    que también se puede usar fuera de Streamlit.
+
+    Returns:
+        tuple: (registros_df, lineas_omitidas)
+    """
+    registros_df, lineas_omitidas = leer_con_cola(ruta_csv, ALMACENAMIENTOS[ALMACENAMIENTO_REGISTROS]['cargar'])
+
+    # Completar las fechas tipadas que no vengan en el snapshot
+    faltantes = [columna for columna in COLUMNAS_FECHA
+                 if columna in registros_df.columns and columna_tipada(columna) not in registros_df.columns]
+    if faltantes:
+        materializar_fechas(registros_df, columnas=faltantes)
+
+    return registros_df, lineas_omitidas
+
+
+def _cargar_registros_csv(ruta_csv):
+    """
+    Lee un archivo de registros CSV, usando el snapshot columnar si el archivo no ha
+    cambiado desde la última lectura.
+    """
+    registros_df = cargar_snapshot(ruta_csv)
+    lineas_omitidas = 0
+
+    if registros_df is None:
+        # Huella del archivo antes de leerlo: si se reemplaza durante la lectura, no se
+        # guarda un snapshot que no le corresponde
+        huella = huella_archivo(ruta_csv)
+
+        # Leer con el motor C, completando o recortando las filas irregulares
+        registros_df, lineas_omitidas = leer_csv_tolerante(ruta_csv)
+
+        # Limpiar valores
+        registros_df = limpiar_dataframe(registros_df)
+
+        # Convertir una sola vez las columnas de fecha a datetime64
+        materializar_fechas(registros_df)
+
+        # Guardar el snapshot (con las fechas tipadas) para las siguientes lecturas
+        if huella_archivo(ruta_csv, calcular_hash=False) == {k: huella[k] for k in ('tamano', 'mtime_ns')}:
+            guardar_snapshot(ruta_csv, registros_df, huella)
+
+    return registros_df, lineas_omitidas
+
+
+def _cargar_registros_sqlite(ruta_csv):
+    """
+    Lee la tabla de registros de la base SQLite; la primera vez importa el CSV. Usa el
+    snapshot columnar de la base mientras la versión de los datos no cambie.
+    """
+    ruta = ruta_sqlite(ruta_csv)
+    version = version_sqlite(ruta)
+    if version is None:
+        return importar_registros_csv(ruta_csv)
+
+    ruta_datos, ruta_version = f"{ruta}.snapshot.feather", f"{ruta}.snapshot.json"
+    if SNAPSHOT_DISPONIBLE:
+        try:
+            with open(ruta_version, 'r', encoding='utf-8') as f:
+                if json.load(f).get('version') == version:
+                    return pd.read_feather(ruta_datos), 0
+        except Exception:
+            pass
+
+    registros_df = limpiar_dataframe(leer_registros_sqlite(ruta))
+    materializar_fechas(registros_df)
+
+    if SNAPSHOT_DISPONIBLE:
+        try:
+            buffer = io.BytesIO()
+            registros_df.to_feather(buffer)
+            _escribir_atomico(ruta_datos, buffer.getvalue())
+            _escribir_atomico(ruta_version, json.dumps({'version': version}).encode('utf-8'))
+        except Exception:
+            pass
+
+    return registros_df, 0
+
+
+def existen_registros(ruta_csv='registros.csv'):
+    """Verifica si hay registros guardados: el archivo CSV o, con SQLite, la base."""
+    if ALMACENAMIENTO_REGISTROS == 'sqlite' and version_sqlite(ruta_sqlite(ruta_csv)) is not None:
+        return True
+    return os.path.exists(ruta_csv)
+
+
+def importar_registros_csv(ruta_csv='registros.csv'):
+    """
+    Lee un archivo de registros CSV y, con almacenamiento SQLite, reemplaza con él la
+    tabla de registros; con diario, el archivo pasa a ser la nueva base y el diario
+    vigente se archiva. Con almacenamiento CSV el archivo ya es el almacenamiento y
+    solo se lee.
+
+    Returns:
+        tuple: (registros_df, lineas_omitidas)
+    """
+    registros_df, lineas_omitidas = _cargar_registros_csv(ruta_csv)
+
+    if ALMACENAMIENTO_REGISTROS == 'sqlite':
+        version = escribir_registros_sqlite(ruta_sqlite(ruta_csv), quitar_fechas_tipadas(registros_df))
+        invalidar_cache_resultados(version)
+    elif ALMACENAMIENTO_REGISTROS == 'diario':
+        # El diario vigente corresponde al CSV anterior
+        with _BLOQUEO_DIARIO:
+            archivar_diario(*rutas_diario(ruta_csv))
+            _recordar_estado_diario(ruta_csv, registros_df, 0)
+        invalidar_cache_resultados(version_registros(ruta_csv))
+
+    return registros_df, lineas_omitidas
+
+
+def exportar_registros_csv(ruta_csv='registros.csv'):
+    """
+    Escribe los registros de la base SQLite en el archivo CSV; con diario, compacta el
+    diario en el CSV base. Con almacenamiento CSV el archivo ya está al día y no se
+    modifica.
+    """
+    if ALMACENAMIENTO_REGISTROS == 'sqlite':
+        escribir_registros_csv(ruta_csv, leer_registros_sqlite(ruta_sqlite(ruta_csv)).to_csv(index=False, sep=';'))
+    elif ALMACENAMIENTO_REGISTROS == 'diario':
+        if not compactar_diario(ruta_csv):
+            raise RuntimeError("No hay registros cargados que correspondan a los archivos actuales.")
+
+
 def cargar_datos():
     """Carga los datos desde archivos CSV. No usa datos de ejemplo."""
     try:
@@ -67,33 +487,11 @@ def cargar_datos():
         columnas_meta = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
 
         # Cargar archivo de registros
-        if os.path.exists('registros.csv'):
+        if existen_registros('registros.csv'):
             try:
-                # Leer el contenido directamente
-                with open('registros.csv', 'r', encoding='utf-8') as f:
-                    contenido = f.read()
-
-                # Verificar si el delimitador es realmente ';'
-                primer_linea = contenido.split('\n')[0]
-                if ';' in primer_linea:
-                    # Si hay ';' en la primera línea, normalizar y usar ';' como separador
-                    contenido_normalizado = normalizar_csv(contenido, ';')
-                    registros_df = pd.read_csv(io.StringIO(contenido_normalizado), sep=';',
-                                               engine='python', on_bad_lines='skip',
-                                               dtype=str)  # Usar string para todos los tipos
-                else:
-                    # Intentar con coma como separador alternativo
-                    contenido_normalizado = normalizar_csv(contenido, ',')
-                    registros_df = pd.read_csv(io.StringIO(contenido_normalizado), sep=',',
-                                               engine='python', on_bad_lines='skip',
-                                               dtype=str)  # Usar string para todos los tipos
-
-                # Mostrar todas las columnas que se han cargado del CSV
-                #st.info(f"Columnas cargadas del archivo registros.csv: {', '.join(registros_df.columns)}")
-
-                # Limpiar valores
-                for col in registros_df.columns:
-                    registros_df[col] = registros_df[col].apply(limpiar_valor)
+                registros_df, lineas_omitidas = cargar_registros('registros.csv')
+                if lineas_omitidas:
+                    st.warning(f"Se omitieron {lineas_omitidas} líneas mal formadas del archivo registros.csv.")
 
                 # Verificar y añadir columnas requeridas si faltan
                 for columna in columnas_requeridas:
@@ -101,6 +499,12 @@ def cargar_datos():
                         st.warning(f"La columna '{columna}' no existe en el archivo. Se creará como columna vacía.")
                         registros_df[columna] = ''
 
+                # Completar las fechas tipadas de las columnas agregadas
+                faltantes = [columna for columna in COLUMNAS_FECHA
+                             if columna in registros_df.columns and columna_tipada(columna) not in registros_df.columns]
+                if faltantes:
+                    materializar_fechas(registros_df, columnas=faltantes)
+
                 #st.success(f"Archivo registros.csv cargado correctamente con {len(registros_df)} registros.")
             except Exception as e:
                 st.error(f"Error al procesar el archivo registros.csv: {str(e)}")
@@ -114,28 +518,13 @@ def cargar_datos():
         # Cargar archivo de metas
         if os.path.exists('meta.csv'):
             try:
-                # Leer el contenido y determinar el separador correcto
-                with open('meta.csv', 'r', encoding='utf-8') as f:
-                    contenido = f.read()
-
-                # Verificar si el delimitador es realmente ';'
-                primer_linea = contenido.split('\n')[0]
-                if ';' in primer_linea:
-                    # Si hay ';' en la primera línea, normalizar y usar ';' como separador
-                    contenido_normalizado = normalizar_csv(contenido, ';')
-                    meta_df = pd.read_csv(io.StringIO(contenido_normalizado), sep=';',
-                                          header=None, engine='python', on_bad_lines='skip',
-                                          dtype=str)  # Usar string para todos los tipos
-                else:
-                    # Intentar con coma como separador alternativo
-                    contenido_normalizado = normalizar_csv(contenido, ',')
-                    meta_df = pd.read_csv(io.StringIO(contenido_normalizado), sep=',',
-                                          header=None, engine='python', on_bad_lines='skip',
-                                          dtype=str)  # Usar string para todos los tipos
+                # Leer con el motor C, completando o recortando las filas irregulares
+                meta_df, lineas_omitidas = leer_csv_tolerante('meta.csv', encabezado=False)
+                if lineas_omitidas:
+                    st.warning(f"Se omitieron {lineas_omitidas} líneas mal formadas del archivo meta.csv.")
 
                 # Limpiar valores
-                for col in meta_df.columns:
-                    meta_df[col] = meta_df[col].apply(limpiar_valor)
+                meta_df = limpiar_dataframe(meta_df)
 
                 #st.success("Archivo meta.csv cargado correctamente.")
             except Exception as e:
@@ -160,38 +549,6 @@ def cargar_datos():
 
         return registros_df, meta_df
 
-def procesar_fecha(fecha_str):
-    """Procesa una fecha de manera segura manejando NaT."""
-    if pd.isna(fecha_str) or fecha_str == '' or fecha_str is None:
-        return None
-
-    # Si es un objeto datetime o Timestamp, retornarlo directamente
-    if isinstance(fecha_str, (pd.Timestamp, datetime)):
-        if pd.isna(fecha_str):  # Comprobar si es NaT
-            return None
-        return fecha_str
-
-    # Si es un string, procesarlo
-    try:
-        # Eliminar espacios y caracteres extraños
-        fecha_str = re.sub(r'[^\d/\-]', '', str(fecha_str).strip())
-
-        # Formatos a intentar
-        formatos = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y']
-
-        for formato in formatos:
-            try:
-                fecha = pd.to_datetime(fecha_str, format=formato)
-                if pd.notna(fecha):  # Verificar que no sea NaT
-                    return fecha
-            except:
-                continue
-
-        return None
-    except Exception:
-        return None
-
-
 def es_fecha_valida(valor):
     """Verifica si un valor es una fecha válida."""
     try:
@@ -237,7 +594,7 @@ def calcular_porcentaje_avance(registro):
     MODIFICADO: Calcula el porcentaje de avance de un registro basado en los campos de completitud.
     NUEVA REGLA: Si tiene fecha de oficio de cierre, automáticamente 100% de avance.
 
-    Ponderación (cuando no hay fecha de cierre):
+    Ponderación (cuando no hay fecha de cierre), definida en constants.HITOS:
     - Acuerdo de compromiso: 20%
     - Análisis y cronograma (fecha real): 20%
     - Estándares (fecha real): 30%
@@ -257,33 +614,17 @@ def calcular_porcentaje_avance(registro):
         avance = 0
 
         # Verificar el acuerdo de compromiso (20%)
-        if 'Acuerdo de compromiso' in registro and str(registro['Acuerdo de compromiso']).strip().upper() in ['SI',
-                                                                                                              'SÍ', 'S',
-                                                                                                              'YES',
-                                                                                                              'Y',
-                                                                                                              'COMPLETO']:
-            avance += 20
-
-        # Verificar análisis y cronograma - VERIFICADO: basado en la fecha (20%)
-        if ('Análisis y cronograma' in registro and 
-            registro['Análisis y cronograma'] and 
-            pd.notna(registro['Análisis y cronograma']) and
-            str(registro['Análisis y cronograma']).strip() != ''):
-            avance += 20
-
-        # Verificar estándares - VERIFICADO: basado en la fecha (30%)
-        if ('Estándares' in registro and 
-            registro['Estándares'] and 
-            pd.notna(registro['Estándares']) and
-            str(registro['Estándares']).strip() != ''):
-            avance += 30
-
-        # Verificar publicación - VERIFICADO: basado en la fecha (25%)
-        if ('Publicación' in registro and 
-            registro['Publicación'] and 
-            pd.notna(registro['Publicación']) and
-            str(registro['Publicación']).strip() != ''):
-            avance += 25
+        if ('Acuerdo de compromiso' in registro and
+            str(registro['Acuerdo de compromiso']).strip().upper() in VALORES_ACUERDO_POSITIVOS):
+            avance += HITOS['Acuerdo de compromiso']
+
+        # Verificar análisis y cronograma, estándares y publicación - basados en la fecha real
+        for hito in ['Análisis y cronograma', 'Estándares', 'Publicación']:
+            if (hito in registro and
+                registro[hito] and
+                pd.notna(registro[hito]) and
+                str(registro[hito]).strip() != ''):
+                avance += HITOS[hito]
 
         # Nota: No sumamos los 5% del oficio de cierre aquí porque si llegáramos a este punto
         # significa que no hay fecha de cierre, por lo que el máximo sería 95%
@@ -294,7 +635,65 @@ def calcular_porcentaje_avance(registro):
         import streamlit as st
         st.warning(f"Error al calcular porcentaje de avance: {e}")
         return 0
-        
+
+
+def _columna_con_valor(df, columna):
+    """
+    Máscara de las filas cuya columna tiene valor: no nulo, verdadero y no vacío
+    tras quitar espacios (mismo criterio que calcular_porcentaje_avance).
+    """
+    if columna not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+
+    serie = df[columna]
+    mascara = serie.notna() & (serie.astype(str).str.strip() != '')
+    if not isinstance(serie.dtype, pd.StringDtype):
+        # Valores no textuales que se evalúan como falsos (0, False) no cuentan
+        mascara &= serie.fillna(0).astype(bool)
+    return mascara.to_numpy(dtype=bool)
+
+
+def _acuerdo_completo(df):
+    """Máscara de las filas cuyo acuerdo de compromiso tiene un valor positivo."""
+    if 'Acuerdo de compromiso' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+
+    valores = df['Acuerdo de compromiso'].astype(str).str.strip().str.upper()
+    return valores.isin(VALORES_ACUERDO_POSITIVOS).to_numpy(dtype=bool)
+
+
+def calcular_porcentajes_avance(df):
+    """
+    Calcula el porcentaje de avance de todos los registros en una sola pasada vectorizada.
+    Construye una matriz booleana de hitos cumplidos y aplica la suma ponderada con los
+    pesos de constants.HITOS; los registros con fecha de oficio de cierre quedan en 100.
+    Produce los mismos valores que calcular_porcentaje_avance fila por fila.
+
+    Returns:
+        Series: Porcentaje de avance por registro, con el mismo índice del DataFrame
+    """
+    try:
+        # Matriz booleana de hitos cumplidos: el acuerdo por su valor, los demás por su fecha real
+        columnas_hitos = []
+        for hito in HITOS:
+            if hito == 'Acuerdo de compromiso':
+                columnas_hitos.append(_acuerdo_completo(df))
+            else:
+                columnas_hitos.append(_columna_con_valor(df, hito))
+        hitos_cumplidos = np.column_stack(columnas_hitos)
+
+        avance = hitos_cumplidos @ np.array(list(HITOS.values()))
+
+        # NUEVA REGLA: Si tiene fecha de oficio de cierre, automáticamente 100%
+        avance = np.where(_columna_con_valor(df, 'Fecha de oficio de cierre'), 100, avance)
+
+        return pd.Series(avance, index=df.index)
+    except Exception as e:
+        # En caso de error, retornar 0 para todos los registros
+        st.warning(f"Error al calcular porcentaje de avance: {e}")
+        return pd.Series(0, index=df.index)
+
+
 def procesar_metas(meta_df):
     """Procesa las metas a partir del DataFrame de metas."""
     try:
@@ -385,7 +784,7 @@ def verificar_estado_fechas(row):
 
     for campo in campos_fecha:
         if campo in row and row[campo]:
-            fecha = procesar_fecha(row[campo])
+            fecha = obtener_fecha(row, campo)
             if fecha is not None and pd.notna(fecha):
                 # Si la fecha ya está vencida
                 if fecha < fecha_actual:
@@ -398,6 +797,43 @@ def verificar_estado_fechas(row):
     return estado
 
 
+def calcular_estados_fechas(df, fecha_corte=None, indice_plazos=None):
+    """
+    Versión vectorizada de verificar_estado_fechas para todo el DataFrame.
+
+    Toma la fecha programada más próxima de cada registro y la compara con la fecha
+    de corte: 'vencido' si es anterior, 'proximo' si cae dentro de DIAS_ALERTA días
+    y 'normal' en otro caso (también si el registro no tiene fechas programadas).
+    Los registros de cada caso se obtienen con consultas por rango sobre el índice
+    de vencimientos.
+
+    Args:
+        df: DataFrame de registros
+        fecha_corte: Fecha de referencia (por defecto, el momento actual)
+        indice_plazos: Índice de vencimientos de df (se construye si no se indica)
+
+    Returns:
+        pandas.Series: Estado de fechas de cada registro, con el índice de df
+    """
+    fecha_corte = pd.Timestamp(datetime.now() if fecha_corte is None else fecha_corte)
+    if not indice_vigente(indice_plazos, df):
+        indice_plazos = construir_indice_plazos(df, dict.fromkeys(CAMPOS_FECHA.values()))
+
+    # Las fechas no tienen hora: fecha < corte equivale a fecha < techo del día de corte,
+    # y fecha <= corte + DIAS_ALERTA a fecha < día siguiente al límite
+    limite_vencido = fecha_corte.ceil('D')
+    limite_proximo = (fecha_corte + timedelta(days=DIAS_ALERTA)).floor('D') + timedelta(days=1)
+
+    vencido = np.zeros(len(df), dtype=bool)
+    proximo = np.zeros(len(df), dtype=bool)
+    for campo in CAMPOS_FECHA.values():
+        vencido[consultar_plazos(indice_plazos, campo, hasta=limite_vencido)[0]] = True
+        proximo[consultar_plazos(indice_plazos, campo, desde=limite_vencido, hasta=limite_proximo)[0]] = True
+
+    estados = np.select([vencido, proximo], ['vencido', 'proximo'], default='normal')
+    return pd.Series(estados, index=df.index)
+
+
 def validar_campos_fecha(df, campos_fecha=['Análisis y cronograma', 'Estándares', 'Publicación']):
     """
     Valida que los campos específicos contengan solo fechas válidas.
@@ -415,22 +851,392 @@ def validar_campos_fecha(df, campos_fecha=['Análisis y cronograma', 'Estándare
 
 def guardar_datos_editados(df, ruta_archivo='registros.csv'):
     """Guarda los datos editados en un archivo CSV, asegurando que ciertos campos sean fechas."""
+    exito, mensaje = _guardar_datos_editados(df, ruta_archivo)
+    if not exito:
+        st.error(mensaje)
+    return exito, mensaje
+
+
+def _guardar_datos_editados(df, ruta_archivo):
+    """
+    Como guardar_datos_editados, pero sin mostrar mensajes: lo usa la cola de guardado,
+    que escribe desde un hilo sin contexto de Streamlit y registra el error.
+    """
     try:
-        # Validar que los campos de fechas sean fechas válidas
-        df_validado = validar_campos_fecha(df)
+        # Validar que los campos de fechas sean fechas válidas (sin las columnas tipadas)
+        df_validado = validar_campos_fecha(quitar_fechas_tipadas(df))
+
+        ALMACENAMIENTOS[ALMACENAMIENTO_REGISTROS]['guardar'](df_validado, ruta_archivo)
+
+        return True, "Datos guardados correctamente."
+    except Exception as e:
+        return False, f"Error al guardar datos: {e}"
+
+
+def _guardar_registros_csv(df_validado, ruta_archivo):
+    """Reescribe el archivo CSV completo y actualiza su snapshot."""
+    # Convertir DataFrame a CSV
+    csv_data = df_validado.to_csv(index=False, sep=';')
+
+    # Guardar archivo como una nueva generación, sin dejarlo nunca a medio escribir
+    _, huella = escribir_registros_csv(ruta_archivo, csv_data)
+
+    # Los mismos valores que produciría la lectura del CSV
+    leidos = materializar_fechas(limpiar_dataframe(df_validado.reset_index(drop=True)))
+
+    # Conservar las filas serializadas para los guardados incrementales
+    _recordar_filas_csv(ruta_archivo, df_validado, csv_data, huella, leidos)
+
+    # Descartar los resultados en caché calculados sobre un contenido distinto
+    invalidar_cache_resultados(version_registros(ruta_archivo))
 
-        # Convertir DataFrame a CSV
-        csv_data = df_validado.to_csv(index=False, sep=';')
+    # Actualizar el snapshot con la huella del archivo escrito (no la del que haya en
+    # disco si otro lo reemplazó)
+    guardar_snapshot(ruta_archivo, leidos, huella)
 
-        # Guardar archivo
-        with open(ruta_archivo, 'w', encoding='utf-8') as f:
-            f.write(csv_data)
+
+def _guardar_registros_sqlite(df_validado, ruta_archivo):
+    """Reemplaza la tabla de registros en una sola transacción."""
+    escribir_registros_sqlite(ruta_sqlite(ruta_archivo), df_validado)
+    invalidar_cache_resultados(version_registros(ruta_archivo))
+
+def _recordar_filas_csv(ruta_archivo, df, csv_data, huella, leidos):
+    """
+    Guarda en memoria el texto de cada fila del CSV recién escrito, junto con la huella
+    del archivo escrito, las columnas y el índice del DataFrame que lo produjo, y los
+    registros tal como se leerían del archivo (para actualizar el snapshot).
+    """
+    _FILAS_CSV.pop(ruta_archivo, None)
+    lineas = csv_data.split('\n')
+
+    # Los campos con saltos de línea (entre comillas) ocupan varias líneas del archivo
+    saltos = np.zeros(len(df), dtype=int)
+    for columna in df.columns:
+        if df[columna].dtype == object or isinstance(df[columna].dtype, pd.StringDtype):
+            saltos += df[columna].astype(str).str.count('\n').to_numpy(dtype=int)
+
+    if len(lineas) != len(df) + saltos.sum() + 2:
+        return
+
+    if saltos.any():
+        limites = np.concatenate([[1], np.cumsum(saltos + 1) + 1])
+        filas = ['\n'.join(lineas[inicio:fin]) for inicio, fin in zip(limites[:-1], limites[1:])]
+    else:
+        filas = lineas[1:-1]
+
+    _FILAS_CSV[ruta_archivo] = {
+        'huella': {'tamano': huella['tamano'], 'mtime_ns': huella['mtime_ns']},
+        'columnas': list(df.columns),
+        'indice': df.index.copy(),
+        'encabezado': lineas[0],
+        'filas': filas,
+        'leidos': leidos
+    }
+
+
+def guardar_registro_editado(df, fila, ruta_archivo='registros.csv'):
+    """
+    Guarda un solo registro editado: valida y serializa únicamente esa fila. Con
+    almacenamiento CSV la fila se reemplaza en el texto del último CSV guardado; con
+    SQLite se actualiza con una sentencia UPDATE.
+
+    Si el almacenamiento no corresponde a la estructura del DataFrame (por ejemplo,
+    no hay un guardado previo del CSV), se recurre al guardado completo.
+
+    Args:
+        df: DataFrame de registros con el registro ya validado
+        fila: Etiqueta de la fila editada
+        ruta_archivo: Ruta del archivo CSV
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    return guardar_registros_editados(df, [fila], ruta_archivo)
+
+
+def guardar_registros_editados(df, filas, ruta_archivo='registros.csv'):
+    """
+    Guarda varios registros editados en una sola escritura (ver guardar_registro_editado).
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    exito, mensaje = _guardar_registros_editados(df, filas, ruta_archivo)
+    if not exito:
+        st.error(mensaje)
+    return exito, mensaje
+
+
+def _guardar_registros_editados(df, filas, ruta_archivo):
+    """Como guardar_registros_editados, pero sin mostrar mensajes (ver _guardar_datos_editados)."""
+    try:
+        if not ALMACENAMIENTOS[ALMACENAMIENTO_REGISTROS]['guardar_registros'](df, list(filas), ruta_archivo):
+            return _guardar_datos_editados(df, ruta_archivo)
 
         return True, "Datos guardados correctamente."
+    except Exception as e:
+        _FILAS_CSV.pop(ruta_archivo, None)
+        return False, f"Error al guardar datos: {e}"
+
+
+def _escribir_pendiente(ruta_archivo):
+    """
+    Función de escritura de la cola de guardado para un archivo de registros. No
+    muestra mensajes: la cola registra el error y lo muestra el indicador de guardado.
+    """
+    def escribir(df, filas):
+        if filas is None:
+            return _guardar_datos_editados(df, ruta_archivo)
+        return _guardar_registros_editados(df, filas, ruta_archivo)
+    return escribir
+
+
+def encolar_registro_editado(df, fila, ruta_archivo='registros.csv'):
+    """
+    Registra un registro editado en la cola de guardado: la siguiente carga ya lo
+    incluye y se escribe en disco, junto con los demás cambios pendientes, al cumplirse
+    la ventana de guardado.
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    return encolar_registros_editados(df, [fila], ruta_archivo)
+
+
+def encolar_registros_editados(df, filas, ruta_archivo='registros.csv'):
+    """
+    Registra varios registros editados en la cola de guardado (ver encolar_registro_editado).
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    try:
+        filas = list(filas)
+
+        # Normalizar las fechas de los registros como al guardarlos, para que la copia
+        # en memoria coincida con lo que se escribirá
+        datos = df.copy()
+        datos.loc[filas] = validar_campos_fecha(datos.loc[filas])
+        encolar_guardado(ruta_archivo, datos, _escribir_pendiente(ruta_archivo), filas=filas)
+        return True, "Cambios registrados; se guardarán en unos segundos."
+    except Exception as e:
+        st.error(f"Error al guardar datos: {e}")
+        return False, f"Error al guardar datos: {e}"
+
+
+def encolar_datos_editados(df, ruta_archivo='registros.csv'):
+    """
+    Registra todos los registros en la cola de guardado; se escriben completos al
+    cumplirse la ventana de guardado.
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    try:
+        encolar_guardado(ruta_archivo, df, _escribir_pendiente(ruta_archivo))
+        return True, "Cambios registrados; se guardarán en unos segundos."
     except Exception as e:
         st.error(f"Error al guardar datos: {e}")
         return False, f"Error al guardar datos: {e}"
 
+
+def _guardar_filas_csv(df, filas, ruta_archivo):
+    """
+    Reemplaza las filas en el texto del último CSV guardado y reescribe el archivo de
+    forma atómica, sin volver a convertir el resto del DataFrame. El snapshot columnar se
+    actualiza cambiando solo esas filas en los registros leídos del último guardado. Retorna
+    False si no hay un guardado previo que corresponda al archivo actual y a la
+    estructura del DataFrame.
+    """
+    guardado = _FILAS_CSV.get(ruta_archivo)
+    registros = quitar_fechas_tipadas(df.loc[filas])
+    if (guardado is None or not os.path.exists(ruta_archivo)
+            or huella_archivo(ruta_archivo, calcular_hash=False) != guardado['huella']
+            or list(registros.columns) != guardado['columnas']
+            or not df.index.equals(guardado['indice'])):
+        return False
+
+    registros = validar_campos_fecha(registros)
+    for fila in filas:
+        texto_fila = registros.loc[[fila]].to_csv(index=False, header=False, sep=';')
+        guardado['filas'][df.index.get_loc(fila)] = texto_fila[:-1]
+
+    contenido = guardado['encabezado'] + '\n' + '\n'.join(guardado['filas']) + '\n'
+    _, huella = escribir_registros_csv(ruta_archivo, contenido)
+
+    guardado['huella'] = {'tamano': huella['tamano'], 'mtime_ns': huella['mtime_ns']}
+    invalidar_cache_resultados(version_registros(ruta_archivo))
+
+    # Actualizar el snapshot con los valores que produciría la lectura del CSV: solo se
+    # limpian los registros guardados y se vuelven a convertir sus fechas
+    leidos = guardado['leidos']
+    posiciones = [df.index.get_loc(fila) for fila in filas]
+    leidos.loc[posiciones, registros.columns] = registros.map(limpiar_valor).to_numpy()
+    guardar_snapshot(ruta_archivo, materializar_fechas(leidos, filas=posiciones), huella)
+    return True
+
+
+def _guardar_filas_sqlite(df, filas, ruta_archivo):
+    """
+    Actualiza los registros en la tabla con sentencias UPDATE por posición, en una sola
+    transacción. Retorna False si la tabla no tiene las mismas columnas y número de
+    registros que df.
+    """
+    registros = validar_campos_fecha(quitar_fechas_tipadas(df.loc[filas]))
+    version = actualizar_registros_sqlite(ruta_sqlite(ruta_archivo), registros,
+                                          [df.index.get_loc(fila) for fila in filas], len(df))
+    if version is None:
+        return False
+
+    invalidar_cache_resultados(version_registros(ruta_archivo))
+    return True
+
+
+def _clave_diario(ruta_archivo):
+    """Tamaño y fecha del CSV base y tamaño del diario, para detectar cambios externos."""
+    ruta_diario, _ = rutas_diario(ruta_archivo)
+    base = os.stat(ruta_archivo)
+    return (base.st_size, base.st_mtime_ns,
+            os.path.getsize(ruta_diario) if os.path.exists(ruta_diario) else 0)
+
+
+def _recordar_estado_diario(ruta_archivo, registros, entradas):
+    _ESTADO_DIARIO[ruta_archivo] = {
+        'registros': limpiar_dataframe(quitar_fechas_tipadas(registros).reset_index(drop=True)),
+        'entradas': entradas,
+        'clave': _clave_diario(ruta_archivo),
+        'compactando': False
+    }
+
+
+def _version_diario(ruta_csv):
+    """Hash del CSV base más el hash del diario de cambios vigente."""
+    version = _version_csv(ruta_csv)
+    ruta_diario, _ = rutas_diario(ruta_csv)
+    if version is None or not os.path.exists(ruta_diario):
+        return version
+
+    with open(ruta_diario, 'rb') as f:
+        return f"{version}:{hashlib.sha256(f.read()).hexdigest()}"
+
+
+def _cargar_registros_diario(ruta_csv):
+    """Lee el CSV base (o su snapshot) y aplica el diario de cambios."""
+    with _BLOQUEO_DIARIO:
+        registros_df, lineas_omitidas = _cargar_registros_csv(ruta_csv)
+
+        diario = leer_diario(rutas_diario(ruta_csv)[0])
+        if not diario.empty:
+            filas = aplicar_diario(registros_df, diario)
+            materializar_fechas(registros_df, filas=filas)
+
+        estado = _ESTADO_DIARIO.get(ruta_csv)
+        if estado is None or estado['clave'] != _clave_diario(ruta_csv):
+            _recordar_estado_diario(ruta_csv, registros_df, len(diario))
+
+    return registros_df, lineas_omitidas
+
+
+def _guardar_registros_diario(df_validado, ruta_archivo):
+    """Reescribe el CSV base completo y pasa el diario al histórico."""
+    with _BLOQUEO_DIARIO:
+        _guardar_registros_csv(df_validado, ruta_archivo)
+        archivar_diario(*rutas_diario(ruta_archivo))
+        _recordar_estado_diario(ruta_archivo, df_validado, 0)
+
+    invalidar_cache_resultados(version_registros(ruta_archivo))
+
+
+def _guardar_filas_diario(df, filas, ruta_archivo):
+    """
+    Agrega al diario una entrada por cada celda modificada de las filas, sin reescribir
+    el CSV base. Al superar el umbral de entradas, compacta el diario en segundo plano.
+    Retorna False si no hay un estado cargado que corresponda a los archivos actuales
+    y a la estructura del DataFrame.
+    """
+    with _BLOQUEO_DIARIO:
+        estado = _ESTADO_DIARIO.get(ruta_archivo)
+        registros = validar_campos_fecha(quitar_fechas_tipadas(df.loc[filas])).map(limpiar_valor)
+        if (estado is None or not os.path.exists(ruta_archivo)
+                or estado['clave'] != _clave_diario(ruta_archivo)
+                or list(registros.columns) != list(estado['registros'].columns)
+                or len(df) != len(estado['registros'])):
+            return False
+
+        posiciones = [df.index.get_loc(fila) for fila in filas]
+        anteriores = estado['registros'].iloc[posiciones]
+        filas_cambio, columnas_cambio = np.nonzero(registros.to_numpy() != anteriores.to_numpy())
+
+        fecha = datetime.now().isoformat(timespec='seconds')
+        columna_cod = registros.columns.get_loc('Cod') if 'Cod' in registros.columns else None
+        entradas = [{
+            'fila': posiciones[i],
+            'Cod': registros.iat[i, columna_cod] if columna_cod is not None else '',
+            'columna': registros.columns[j],
+            'anterior': anteriores.iat[i, j],
+            'nuevo': registros.iat[i, j],
+            'fecha': fecha
+        } for i, j in zip(filas_cambio, columnas_cambio)]
+
+        anotar_cambios(rutas_diario(ruta_archivo)[0], entradas)
+        for entrada in entradas:
+            estado['registros'].iat[entrada['fila'], estado['registros'].columns.get_loc(entrada['columna'])] = \
+                entrada['nuevo']
+        estado['entradas'] += len(entradas)
+        estado['clave'] = _clave_diario(ruta_archivo)
+
+        if estado['entradas'] >= UMBRAL_COMPACTACION_DIARIO and not estado['compactando']:
+            estado['compactando'] = True
+            threading.Thread(target=compactar_diario, args=(ruta_archivo,),
+                             name='compactacion-diario', daemon=True).start()
+
+    invalidar_cache_resultados(version_registros(ruta_archivo))
+    return True
+
+
+def compactar_diario(ruta_archivo='registros.csv'):
+    """
+    Escribe un nuevo CSV base con los registros vigentes (base más diario) y pasa el
+    diario al histórico. Si la compactación se interrumpe tras escribir la base, el
+    diario restante no revierte valores al aplicarse (ver aplicar_diario).
+    """
+    with _BLOQUEO_DIARIO:
+        estado = _ESTADO_DIARIO.get(ruta_archivo)
+        if estado is None or estado['clave'] != _clave_diario(ruta_archivo):
+            return False
+
+        try:
+            _guardar_registros_diario(estado['registros'], ruta_archivo)
+            return True
+        except Exception:
+            estado['compactando'] = False
+            return False
+
+
+# Almacenamientos de registros disponibles: funciones para cargar los registros, guardarlos
+# completos, guardar solo algunos registros y obtener la versión de los datos
+ALMACENAMIENTOS = {
+    'csv': {
+        'cargar': _cargar_registros_csv,
+        'guardar': _guardar_registros_csv,
+        'guardar_registros': _guardar_filas_csv,
+        'version': _version_csv
+    },
+    'sqlite': {
+        'cargar': _cargar_registros_sqlite,
+        'guardar': _guardar_registros_sqlite,
+        'guardar_registros': _guardar_filas_sqlite,
+        'version': lambda ruta_csv: version_sqlite(ruta_sqlite(ruta_csv))
+    },
+    'diario': {
+        'cargar': _cargar_registros_diario,
+        'guardar': _guardar_registros_diario,
+        'guardar_registros': _guardar_filas_diario,
+        'version': _version_diario
+    }
+}
+
+
 def contar_registros_completados_por_fecha(df, columna_fecha_programada, columna_fecha_completado):
     """
     Cuenta los registros que tienen una fecha de completado o cuya fecha programada ya pasó.
@@ -438,13 +1244,13 @@ def contar_registros_completados_por_fecha(df, columna_fecha_programada, columna
     count = 0
     for _, row in df.iterrows():
         if columna_fecha_programada in row and row[columna_fecha_programada]:
-            fecha_programada = row[columna_fecha_programada]
+            fecha_programada = obtener_fecha(row, columna_fecha_programada)
 
             # Verificar si hay una fecha de completado
             fecha_completado = None
             if columna_fecha_completado in row and row[columna_fecha_completado]:
                 # Intentar procesar como fecha primero
-                fecha_completado = procesar_fecha(row[columna_fecha_completado])
+                fecha_completado = obtener_fecha(row, columna_fecha_completado)
                 # Si no es una fecha, verificar si es un valor booleano positivo
                 if fecha_completado is None and str(row[columna_fecha_completado]).strip().upper() in ['SI', 'SÍ',
                                                                                                        'S', 'YES',
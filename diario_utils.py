@@ -0,0 +1,126 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Diario de cambios: cada edición se agrega como una línea JSON (posición del registro,
+# Cod, columna, valor anterior, valor nuevo y fecha) junto al CSV base. Al compactar, las
+# entradas pasan al histórico, que conserva la auditoría completa del editor.
+UMBRAL_COMPACTACION_DIARIO = int(os.environ.get('UMBRAL_COMPACTACION_DIARIO', '500'))
+
+COLUMNAS_DIARIO = ['fila', 'Cod', 'columna', 'anterior', 'nuevo', 'fecha']
+
+
+def rutas_diario(ruta_csv):
+    """Devuelve las rutas del diario de cambios y de su histórico para un archivo CSV."""
+    base = os.path.splitext(ruta_csv)[0]
+    return f"{base}.diario.jsonl", f"{base}.diario.historico.jsonl"
+
+
+def anotar_cambios(ruta_diario, entradas):
+    """
+    Agrega entradas al final del diario en una sola escritura y la fuerza a disco.
+    Si el proceso se interrumpe, a lo sumo queda una última línea incompleta, que
+    se ignora al leer.
+    """
+    if not entradas:
+        return
+
+    texto = ''.join(json.dumps(entrada, ensure_ascii=False) + '\n' for entrada in entradas)
+    with open(ruta_diario, 'a', encoding='utf-8') as f:
+        f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def leer_diario(ruta_diario):
+    """Lee las entradas de un diario, omitiendo las líneas incompletas o dañadas."""
+    entradas = []
+    if os.path.exists(ruta_diario):
+        with open(ruta_diario, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    entradas.append(json.loads(linea))
+                except ValueError:
+                    continue
+
+    return pd.DataFrame(entradas, columns=COLUMNAS_DIARIO)
+
+
+def aplicar_diario(df, diario):
+    """
+    Aplica las entradas del diario sobre los registros base, en el orden en que se
+    anotaron. Cada entrada solo se aplica si la celda conserva en ese momento su valor
+    anterior. Así, las entradas de un diario que quedó sin archivar tras reescribir el
+    CSV base no revierten valores más recientes, y las ediciones anotadas después sí
+    se aplican.
+
+    Returns:
+        Index: Etiquetas de las filas modificadas
+    """
+    diario = diario[(diario['fila'] >= 0) & (diario['fila'] < len(df))]
+    if diario.empty:
+        return df.index[:0]
+
+    for columna in diario['columna'].unique():
+        if columna not in df.columns:
+            df[columna] = ''
+
+    # Valor vigente de cada celda tocada por el diario, tomado del base la primera vez
+    valores = {}
+    modificadas = set()
+    for fila, columna, anterior, nuevo in zip(diario['fila'].astype(int), diario['columna'],
+                                              diario['anterior'], diario['nuevo']):
+        celda = (fila, df.columns.get_loc(columna))
+        if celda not in valores:
+            valor = df.iat[celda]
+            valores[celda] = '' if pd.isna(valor) else valor
+        if valores[celda] == anterior:
+            valores[celda] = nuevo
+            modificadas.add(celda)
+
+    if not modificadas:
+        return df.index[:0]
+
+    # Escribir los valores finales columna por columna
+    por_columna = {}
+    for fila, posicion in modificadas:
+        por_columna.setdefault(posicion, []).append(fila)
+    for posicion, filas in por_columna.items():
+        df.iloc[filas, posicion] = [valores[(fila, posicion)] for fila in filas]
+
+    return df.index[np.unique([fila for fila, _ in modificadas])]
+
+
+def archivar_diario(ruta_diario, ruta_historico):
+    """Pasa las entradas del diario al histórico y deja el diario vacío."""
+    if not os.path.exists(ruta_diario):
+        return
+
+    with open(ruta_diario, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+
+    if contenido:
+        with open(ruta_historico, 'a', encoding='utf-8') as f:
+            f.write(contenido if contenido.endswith('\n') else contenido + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.remove(ruta_diario)
+
+
+def historial_cambios(ruta_csv, fila, cod=None):
+    """
+    Retorna los cambios registrados (histórico y diario vigente) de un registro, del
+    más reciente al más antiguo. Se busca por la posición del registro, que es la clave
+    del diario (Cod puede repetirse); si se indica Cod, también debe coincidir, para no
+    mostrar cambios de otro registro que ocupó esa posición.
+    """
+    ruta_diario, ruta_historico = rutas_diario(ruta_csv)
+    cambios = pd.concat([leer_diario(ruta_historico), leer_diario(ruta_diario)], ignore_index=True)
+
+    cambios = cambios[cambios['fila'] == fila]
+    if cod not in (None, ''):
+        cambios = cambios[cambios['Cod'].astype(str) == str(cod)]
+
+    return cambios.iloc[::-1].reset_index(drop=True)
@@ -1,38 +1,26 @@
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import re
+from constants import (DIAS_HABILES_PLAZO_ANALISIS, DIAS_HABILES_PLAZO_CRONOGRAMA,
+                       DIAS_HABILES_PLAZO_OFICIO_CIERRE, COLUMNAS_FECHA, PREFIJO_FECHA_TIPADA)
+from festivos_utils import desplazar_dias_habiles
 
-# Lista de días festivos en Colombia para 2025
-FESTIVOS_2025 = [
-    datetime(2025, 1, 1),  # Año Nuevo
-    datetime(2025, 1, 6),  # Día de los Reyes Magos
-    datetime(2025, 3, 24),  # Día de San José
-    datetime(2025, 4, 17),  # Jueves Santo
-    datetime(2025, 4, 18),  # Viernes Santo
-    datetime(2025, 5, 1),  # Día del Trabajo
-    datetime(2025, 5, 29),  # Ascensión del Señor
-    datetime(2025, 6, 19),  # Corpus Christi
-    datetime(2025, 6, 27),  # Sagrado Corazón
-    datetime(2025, 6, 30),  # San Pedro y San Pablo
-    datetime(2025, 7, 20),  # Día de la Independencia
-    datetime(2025, 8, 7),  # Batalla de Boyacá
-    datetime(2025, 8, 18),  # Asunción de la Virgen
-    datetime(2025, 10, 13),  # Día de la Raza
-    datetime(2025, 11, 3),  # Todos los Santos
-    datetime(2025, 11, 17),  # Independencia de Cartagena
-    datetime(2025, 12, 8),  # Día de la Inmaculada Concepción
-    datetime(2025, 12, 25)  # Navidad
-]
+# Formatos de fecha aceptados, en orden de prioridad
+FORMATOS_FECHA = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y']
+
+# Caracteres que se eliminan de un texto antes de interpretarlo como fecha
+PATRON_CARACTERES_NO_FECHA = re.compile(r'[^\d/\-]')
 
+# Número máximo de textos de fecha distintos que se conservan en caché
+TAMANO_CACHE_FECHAS = 4096
 
-def es_festivo(fecha):
-    """Verifica si una fecha es festivo en Colombia."""
-    for festivo in FESTIVOS_2025:
-        if (fecha.day == festivo.day and
-                fecha.month == festivo.month and
-                fecha.year == festivo.year):
-            return True
-    return False
+# Columnas que determinan los plazos calculados (fechas de origen y plazos materializados)
+COLUMNAS_HUELLA_PLAZOS = [
+    'Fecha de entrega de información', 'Plazo de análisis', 'Publicación',
+    'Plazo de cronograma', 'Plazo de oficio de cierre'
+]
 
 
 def procesar_fecha(fecha_str):
@@ -46,25 +34,49 @@ def procesar_fecha(fecha_str):
             return None
         return fecha_str
 
-    # Si es un string, procesarlo
-    try:
-        # Eliminar espacios y caracteres extraños
-        fecha_str = re.sub(r'[^\d/\-]', '', str(fecha_str).strip())
+    # Si es un string, procesarlo (con caché por texto original)
+    return _procesar_texto_fecha(str(fecha_str))
 
-        # Formatos a intentar
-        formatos = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y']
 
-        for formato in formatos:
-            try:
-                fecha = pd.to_datetime(fecha_str, format=formato)
-                if pd.notna(fecha):  # Verificar que no sea NaT
-                    return fecha
-            except:
-                continue
+@lru_cache(maxsize=TAMANO_CACHE_FECHAS)
+def _procesar_texto_fecha(texto):
+    """Interpreta un texto de fecha probando los formatos en orden de prioridad."""
+    # Eliminar espacios y caracteres extraños
+    texto_limpio = PATRON_CARACTERES_NO_FECHA.sub('', texto.strip())
 
-        return None
-    except Exception:
-        return None
+    for formato in FORMATOS_FECHA:
+        try:
+            return pd.Timestamp(datetime.strptime(texto_limpio, formato))
+        except (ValueError, OverflowError):
+            continue
+
+    return None
+
+
+def estadisticas_cache_fechas():
+    """Retorna los aciertos, fallos y tamaño de la caché de fechas procesadas."""
+    info = _procesar_texto_fecha.cache_info()
+    return {'aciertos': info.hits, 'fallos': info.misses, 'tamano': info.currsize, 'maximo': info.maxsize}
+
+
+def limpiar_cache_fechas():
+    """Vacía la caché de fechas procesadas y reinicia sus contadores."""
+    _procesar_texto_fecha.cache_clear()
+
+
+def inferir_formato_fecha(textos, muestra=500):
+    """
+    Infiere el formato dominante de una columna de textos de fecha ya limpios,
+    probando cada formato sobre una muestra de valores únicos. En caso de empate
+    gana el formato con mayor prioridad.
+    """
+    valores = pd.Series(pd.unique(textos[textos != ''])[:muestra], dtype=object)
+    if valores.empty:
+        return FORMATOS_FECHA[0]
+
+    aciertos = [pd.to_datetime(valores, format=formato, errors='coerce').notna().sum()
+                for formato in FORMATOS_FECHA]
+    return FORMATOS_FECHA[int(np.argmax(aciertos))]
 
 
 def formatear_fecha(fecha_str):
@@ -79,94 +91,164 @@ def formatear_fecha(fecha_str):
         return ""
 
 
-def calcular_plazo_analisis(fecha_entrega):
+def convertir_columna_fecha(fechas):
     """
-    Calcula el plazo de análisis como 5 días hábiles después de la fecha de entrega,
-    sin contar sábados, domingos y festivos en Colombia.
+    Convierte una columna de fechas (strings, datetime o vacíos) a datetime64. Se infiere
+    el formato dominante de la columna y se convierte en bloque con él; solo los valores
+    que no coinciden se procesan individualmente (con caché). Los vacíos o inválidos
+    quedan como NaT.
     """
-    # Convertir la fecha de entrega a objeto datetime
-    fecha = procesar_fecha(fecha_entrega)
-    if fecha is None or pd.isna(fecha):
-        return None
+    serie = fechas if isinstance(fechas, pd.Series) else pd.Series(fechas)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
 
-    # Contador de días hábiles
-    dias_habiles = 0
-    fecha_actual = fecha
+    # Limpiar caracteres extraños igual que procesar_fecha y convertir en bloque
+    texto = serie.astype(object).where(serie.notna(), '').astype(str).str.strip()
+    texto = texto.str.replace(PATRON_CARACTERES_NO_FECHA, '', regex=True)
 
-    # Calcular 5 días hábiles a partir de la fecha de entrega
-    while dias_habiles < 5:
-        # Avanzar un día
-        fecha_actual = fecha_actual + timedelta(days=1)
+    formato = inferir_formato_fecha(texto)
+    resultado = pd.to_datetime(texto, format=formato, errors='coerce')
 
-        # Verificar si es día hábil (no es fin de semana ni festivo)
-        dia_semana = fecha_actual.weekday()  # 0 = lunes, 6 = domingo
+    # Respetar la prioridad de procesar_fecha: los formatos anteriores al dominante prevalecen
+    for formato_previo in FORMATOS_FECHA[:FORMATOS_FECHA.index(formato)]:
+        previo = pd.to_datetime(texto, format=formato_previo, errors='coerce')
+        resultado = previo.where(previo.notna(), resultado)
 
-        # Si no es sábado (5) ni domingo (6) ni festivo, contamos como día hábil
-        if dia_semana < 5 and not es_festivo(fecha_actual):
-            dias_habiles += 1
+    # Procesar individualmente solo los valores que no coinciden con el formato dominante
+    pendientes = resultado.isna() & (texto != '')
+    if pendientes.any():
+        resultado[pendientes] = pd.to_datetime(serie[pendientes].map(procesar_fecha), errors='coerce')
 
-    # Retornar la fecha calculada
-    return fecha_actual
+    return resultado
 
 
-def calcular_plazo_cronograma(fecha_plazo_analisis):
+def columna_tipada(columna):
+    """Nombre de la columna datetime64 que acompaña a una columna de fecha."""
+    return PREFIJO_FECHA_TIPADA + columna
+
+
+def materializar_fechas(df, columnas=None, filas=None):
     """
-    Calcula el plazo de cronograma como 3 días hábiles después del plazo de análisis,
-    sin contar sábados, domingos y festivos en Colombia.
+    Convierte las columnas de fecha a columnas datetime64 compañeras ('_fecha_<columna>'),
+    de modo que el resto de la aplicación lea fechas ya procesadas en lugar de volver a
+    interpretar el texto. Las columnas de texto originales no se modifican.
+
+    Args:
+        df: DataFrame de registros (se modifica directamente)
+        columnas: Columnas de fecha a convertir (por defecto, COLUMNAS_FECHA)
+        filas: Etiquetas de las filas a actualizar (por defecto, todas)
+
+    Returns:
+        DataFrame: El mismo DataFrame con las columnas tipadas actualizadas
     """
-    # Convertir la fecha de plazo de análisis a objeto datetime
-    fecha = procesar_fecha(fecha_plazo_analisis)
-    if fecha is None or pd.isna(fecha):
-        return None
+    for columna in (COLUMNAS_FECHA if columnas is None else columnas):
+        if columna not in df.columns:
+            continue
 
-    # Contador de días hábiles
-    dias_habiles = 0
-    fecha_actual = fecha
+        destino = columna_tipada(columna)
+        if filas is None or destino not in df.columns:
+            df[destino] = convertir_columna_fecha(df[columna])
+        elif len(filas) > 0:
+            df.loc[filas, destino] = convertir_columna_fecha(df.loc[filas, columna])
 
-    # Calcular 3 días hábiles a partir del plazo de análisis
-    while dias_habiles < 3:
-        # Avanzar un día
-        fecha_actual = fecha_actual + timedelta(days=1)
+    return df
 
-        # Verificar si es día hábil (no es fin de semana ni festivo)
-        dia_semana = fecha_actual.weekday()  # 0 = lunes, 6 = domingo
 
-        # Si no es sábado (5) ni domingo (6) ni festivo, contamos como día hábil
-        if dia_semana < 5 and not es_festivo(fecha_actual):
-            dias_habiles += 1
+def quitar_fechas_tipadas(df):
+    """Retorna el DataFrame sin las columnas datetime64 compañeras, para guardar o exportar."""
+    tipadas = [columna for columna in df.columns
+               if isinstance(columna, str) and columna.startswith(PREFIJO_FECHA_TIPADA)]
+    return df.drop(columns=tipadas) if tipadas else df
 
-    # Retornar la fecha calculada
-    return fecha_actual
 
+def obtener_fecha(registro, columna):
+    """
+    Obtiene la fecha de un registro como Timestamp o None. Lee la columna tipada si existe
+    y solo procesa el texto cuando el registro no la tiene.
+    """
+    tipada = columna_tipada(columna)
+    if tipada in registro:
+        fecha = registro[tipada]
+        return fecha if pd.notna(fecha) else None
+    return procesar_fecha(registro.get(columna, ''))
 
-def calcular_plazo_oficio_cierre(fecha_publicacion):
+
+def fechas_columna(df, columna):
     """
-    Calcula el plazo de oficio de cierre como 7 días hábiles después de la fecha de publicación,
-    sin contar sábados, domingos y festivos en Colombia.
+    Obtiene una columna de fecha como Series datetime64: la columna tipada si existe,
+    la conversión del texto si no, o una columna de NaT si el DataFrame no la tiene.
+    """
+    tipada = columna_tipada(columna)
+    if tipada in df.columns:
+        return df[tipada]
+    if columna in df.columns:
+        return convertir_columna_fecha(df[columna])
+    return pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+
+
+def formatear_columna_fecha(df, columna):
+    """Formatea una columna de fecha como texto DD/MM/YYYY (vacío si no es fecha válida)."""
+    return fechas_columna(df, columna).dt.strftime('%d/%m/%Y').fillna('')
+
+
+def sumar_dias_habiles(fechas, dias):
     """
-    # Convertir la fecha de publicación a objeto datetime
-    fecha = procesar_fecha(fecha_publicacion)
+    Calcula, para una columna completa de fechas, la fecha que resulta de avanzar
+    el número indicado de días hábiles, sin contar sábados, domingos y festivos.
+
+    Equivale a avanzar día a día desde cada fecha contando solo los días hábiles:
+    si la fecha de origen no es hábil, se toma el día hábil anterior como base.
+
+    Args:
+        fechas: Serie o lista de fechas (strings, datetime o vacíos)
+        dias: Número de días hábiles a sumar
+
+    Returns:
+        Series: Fechas calculadas (datetime64), NaT donde no hay fecha válida
+    """
+    serie = convertir_columna_fecha(fechas)
+    resultado = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+
+    validas = serie.notna()
+    if validas.any():
+        base = serie[validas].to_numpy(dtype='datetime64[D]')
+        resultado[validas] = desplazar_dias_habiles(base, dias)
+
+    return resultado
+
+
+def _calcular_plazo(fecha_origen, dias):
+    """Calcula el plazo de una sola fecha usando el motor de días hábiles."""
+    fecha = procesar_fecha(fecha_origen)
     if fecha is None or pd.isna(fecha):
         return None
 
-    # Contador de días hábiles
-    dias_habiles = 0
-    fecha_actual = fecha
+    plazo = sumar_dias_habiles(pd.Series([fecha]), dias).iloc[0]
+    return plazo if pd.notna(plazo) else None
+
+
+def calcular_plazo_analisis(fecha_entrega):
+    """
+    Calcula el plazo de análisis como 5 días hábiles después de la fecha de entrega,
+    sin contar sábados, domingos y festivos en Colombia.
+    """
+    return _calcular_plazo(fecha_entrega, DIAS_HABILES_PLAZO_ANALISIS)
 
-    # Calcular 7 días hábiles a partir de la fecha de publicación
-    while dias_habiles < 7:
-        # Avanzar un día
-        fecha_actual = fecha_actual + timedelta(days=1)
 
-        # Verificar si es día hábil (no es fin de semana ni festivo)
-        dia_semana = fecha_actual.weekday()  # 0 = lunes, 6 = domingo
+def calcular_plazo_cronograma(fecha_plazo_analisis):
+    """
+    Calcula el plazo de cronograma como 3 días hábiles después del plazo de análisis,
+    sin contar sábados, domingos y festivos en Colombia.
+    """
+    return _calcular_plazo(fecha_plazo_analisis, DIAS_HABILES_PLAZO_CRONOGRAMA)
 
-        # Si no es sábado (5) ni domingo (6) ni festivo, contamos como día hábil
-        if dia_semana < 5 and not es_festivo(fecha_actual):
-            dias_habiles += 1
 
-    # Retornar la fecha calculada
-    return fecha_actual
+def calcular_plazo_oficio_cierre(fecha_publicacion):
+    """
+    Calcula el plazo de oficio de cierre como 7 días hábiles después de la fecha de publicación,
+    sin contar sábados, domingos y festivos en Colombia.
+    """
+    return _calcular_plazo(fecha_publicacion, DIAS_HABILES_PLAZO_OFICIO_CIERRE)
 
 
 def actualizar_plazo_analisis(df):
@@ -180,18 +262,15 @@ def actualizar_plazo_analisis(df):
     # Crear una copia del DataFrame
     df_actualizado = df.copy()
 
-    # Iterar sobre cada fila
-    for idx, row in df.iterrows():
-        fecha_entrega = row.get('Fecha de entrega de información', None)
-        if fecha_entrega and pd.notna(fecha_entrega) and fecha_entrega != '':
-            plazo = calcular_plazo_analisis(fecha_entrega)
-            if plazo is not None:
-                df_actualizado.at[idx, 'Plazo de análisis'] = formatear_fecha(plazo)
-                
-                # Al actualizar el plazo de análisis, también actualizar el plazo de cronograma
-                plazo_cronograma = calcular_plazo_cronograma(plazo)
-                if plazo_cronograma is not None:
-                    df_actualizado.at[idx, 'Plazo de cronograma'] = formatear_fecha(plazo_cronograma)
+    # Calcular los plazos de toda la columna en una sola operación
+    plazos = sumar_dias_habiles(df['Fecha de entrega de información'], DIAS_HABILES_PLAZO_ANALISIS)
+    validos = plazos.notna()
+    if validos.any():
+        df_actualizado.loc[validos, 'Plazo de análisis'] = plazos[validos].dt.strftime('%d/%m/%Y')
+
+        # Al actualizar el plazo de análisis, también actualizar el plazo de cronograma
+        plazos_cronograma = sumar_dias_habiles(plazos[validos], DIAS_HABILES_PLAZO_CRONOGRAMA)
+        df_actualizado.loc[validos, 'Plazo de cronograma'] = plazos_cronograma.dt.strftime('%d/%m/%Y')
 
     return df_actualizado
 
@@ -211,13 +290,11 @@ def actualizar_plazo_cronograma(df):
     if 'Plazo de cronograma' not in df_actualizado.columns:
         df_actualizado['Plazo de cronograma'] = ''
 
-    # Iterar sobre cada fila
-    for idx, row in df.iterrows():
-        plazo_analisis = row.get('Plazo de análisis', None)
-        if plazo_analisis and pd.notna(plazo_analisis) and plazo_analisis != '':
-            plazo_cronograma = calcular_plazo_cronograma(plazo_analisis)
-            if plazo_cronograma is not None:
-                df_actualizado.at[idx, 'Plazo de cronograma'] = formatear_fecha(plazo_cronograma)
+    # Calcular los plazos de toda la columna en una sola operación
+    plazos = sumar_dias_habiles(df['Plazo de análisis'], DIAS_HABILES_PLAZO_CRONOGRAMA)
+    validos = plazos.notna()
+    if validos.any():
+        df_actualizado.loc[validos, 'Plazo de cronograma'] = plazos[validos].dt.strftime('%d/%m/%Y')
 
     return df_actualizado
 
@@ -237,17 +314,112 @@ def actualizar_plazo_oficio_cierre(df):
     if 'Plazo de oficio de cierre' not in df_actualizado.columns:
         df_actualizado['Plazo de oficio de cierre'] = ''
 
-    # Iterar sobre cada fila
-    for idx, row in df.iterrows():
-        fecha_publicacion = row.get('Publicación', None)
-        if fecha_publicacion and pd.notna(fecha_publicacion) and fecha_publicacion != '':
-            plazo_oficio = calcular_plazo_oficio_cierre(fecha_publicacion)
-            if plazo_oficio is not None:
-                df_actualizado.at[idx, 'Plazo de oficio de cierre'] = formatear_fecha(plazo_oficio)
+    # Calcular los plazos de toda la columna en una sola operación
+    plazos = sumar_dias_habiles(df['Publicación'], DIAS_HABILES_PLAZO_OFICIO_CIERRE)
+    validos = plazos.notna()
+    if validos.any():
+        df_actualizado.loc[validos, 'Plazo de oficio de cierre'] = plazos[validos].dt.strftime('%d/%m/%Y')
 
     return df_actualizado
 
 
+def derivar_plazos(df, filas=None):
+    """
+    Calcula en una sola pasada vectorizada 'Plazo de análisis', 'Plazo de cronograma'
+    y 'Plazo de oficio de cierre' a partir de sus fechas de origen.
+
+    Modifica el DataFrame recibido sin crear copias intermedias y lo retorna.
+    Las filas sin fecha de origen válida conservan el plazo que ya tenían.
+
+    Args:
+        df: DataFrame de registros
+        filas: Etiquetas de las filas a recalcular (por defecto, todas)
+    """
+    for columna in ['Plazo de análisis', 'Plazo de cronograma', 'Plazo de oficio de cierre']:
+        if columna not in df.columns:
+            df[columna] = ''
+
+    indice = df.index if filas is None else pd.Index(filas)
+    if len(indice) == 0:
+        return df
+
+    # Plazo de análisis: días hábiles después de la fecha de entrega de información
+    if 'Fecha de entrega de información' in df.columns:
+        plazo_analisis = sumar_dias_habiles(df.loc[indice, 'Fecha de entrega de información'],
+                                            DIAS_HABILES_PLAZO_ANALISIS)
+    else:
+        plazo_analisis = pd.Series(pd.NaT, index=indice, dtype='datetime64[ns]')
+
+    calculados = plazo_analisis.notna()
+    if calculados.any():
+        _asignar_plazo(df, indice[calculados], 'Plazo de análisis', plazo_analisis[calculados])
+
+    # Para las filas sin fecha de entrega, tomar el plazo de análisis existente
+    if not calculados.all():
+        plazo_analisis[~calculados] = convertir_columna_fecha(df.loc[indice[~calculados], 'Plazo de análisis'])
+
+    # Plazo de cronograma: días hábiles después del plazo de análisis
+    plazo_cronograma = sumar_dias_habiles(plazo_analisis, DIAS_HABILES_PLAZO_CRONOGRAMA)
+    validos = plazo_cronograma.notna()
+    if validos.any():
+        _asignar_plazo(df, indice[validos], 'Plazo de cronograma', plazo_cronograma[validos])
+
+    # Plazo de oficio de cierre: días hábiles después de la fecha de publicación
+    if 'Publicación' in df.columns:
+        plazo_oficio = sumar_dias_habiles(df.loc[indice, 'Publicación'], DIAS_HABILES_PLAZO_OFICIO_CIERRE)
+        validos = plazo_oficio.notna()
+        if validos.any():
+            _asignar_plazo(df, indice[validos], 'Plazo de oficio de cierre', plazo_oficio[validos])
+
+    return df
+
+
+def _asignar_plazo(df, filas, columna, plazos):
+    """Asigna plazos calculados como texto y, si existe, también en su columna tipada."""
+    df.loc[filas, columna] = plazos.dt.strftime('%d/%m/%Y').to_numpy()
+
+    tipada = columna_tipada(columna)
+    if tipada in df.columns:
+        df.loc[filas, tipada] = plazos.to_numpy()
+
+
+def huella_plazos(df, filas=None):
+    """
+    Calcula una huella (hash) por fila de las fechas de origen de los plazos y de los
+    plazos materializados. Si alguna cambia, la fila debe recalcularse.
+    """
+    columnas = [columna for columna in COLUMNAS_HUELLA_PLAZOS if columna in df.columns]
+    datos = df[columnas] if filas is None else df.loc[filas, columnas]
+    return pd.util.hash_pandas_object(datos.fillna('').astype(str), index=False)
+
+
+def derivar_plazos_incremental(df, huellas_previas=None):
+    """
+    Recalcula los plazos solo en las filas cuyas fechas cambiaron desde la última
+    materialización, comparando las huellas actuales con las de la llamada anterior.
+
+    Args:
+        df: DataFrame de registros (se modifica directamente)
+        huellas_previas: Huellas retornadas por la llamada anterior, o None
+
+    Returns:
+        tuple: (df, huellas) - huellas debe conservarse para la siguiente llamada
+    """
+    huellas = huella_plazos(df)
+
+    if huellas_previas is None:
+        cambiadas = df.index
+    else:
+        previas = huellas_previas.reindex(huellas.index, fill_value=0)
+        cambiadas = huellas.index[huellas.to_numpy() != previas.to_numpy()]
+
+    if len(cambiadas) > 0:
+        derivar_plazos(df, filas=cambiadas)
+        huellas.loc[cambiadas] = huella_plazos(df, cambiadas)
+
+    return df, huellas
+
+
 # Función para probar el cálculo del plazo de análisis
 def test_calcular_plazo_analisis():
     fechas_prueba = [
@@ -299,8 +471,27 @@ def test_calcular_plazo_oficio_cierre():
             print(f"Fecha de publicación: {fecha} -> Plazo de oficio de cierre: No se pudo calcular")
 
 
+# Función para probar el cálculo vectorizado de días hábiles sobre una columna
+def test_sumar_dias_habiles():
+    fechas_prueba = pd.Series([
+        "15/01/2025",
+        "27/03/2025",
+        "",
+        "30/04/2025",
+        "20/12/2025"
+    ])
+
+    plazos = sumar_dias_habiles(fechas_prueba, DIAS_HABILES_PLAZO_ANALISIS)
+    for fecha, plazo in zip(fechas_prueba, plazos):
+        if pd.notna(plazo):
+            print(f"Fecha: {fecha} -> +{DIAS_HABILES_PLAZO_ANALISIS} días hábiles: {formatear_fecha(plazo)}")
+        else:
+            print(f"Fecha: '{fecha}' -> No se pudo calcular")
+
+
 if __name__ == "__main__":
     # Ejecutar pruebas
     test_calcular_plazo_analisis()
     test_calcular_plazo_cronograma()
     test_calcular_plazo_oficio_cierre()
+    test_sumar_dias_habiles()
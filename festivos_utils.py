@@ -0,0 +1,161 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Festivos de fecha fija que no se trasladan: (mes, día, nombre)
+FESTIVOS_FIJOS = [
+    (1, 1, 'Año Nuevo'),
+    (5, 1, 'Día del Trabajo'),
+    (7, 20, 'Día de la Independencia'),
+    (8, 7, 'Batalla de Boyacá'),
+    (12, 8, 'Día de la Inmaculada Concepción'),
+    (12, 25, 'Navidad')
+]
+
+# Festivos que se trasladan al lunes siguiente (Ley 51 de 1983): (mes, día, nombre)
+FESTIVOS_TRASLADABLES = [
+    (1, 6, 'Día de los Reyes Magos'),
+    (3, 19, 'Día de San José'),
+    (6, 29, 'San Pedro y San Pablo'),
+    (8, 15, 'Asunción de la Virgen'),
+    (10, 12, 'Día de la Raza'),
+    (11, 1, 'Todos los Santos'),
+    (11, 11, 'Independencia de Cartagena')
+]
+
+# Festivos relativos al Domingo de Pascua: (días desde Pascua, se traslada al lunes, nombre)
+FESTIVOS_PASCUA = [
+    (-3, False, 'Jueves Santo'),
+    (-2, False, 'Viernes Santo'),
+    (39, True, 'Ascensión del Señor'),
+    (60, True, 'Corpus Christi'),
+    (68, True, 'Sagrado Corazón')
+]
+
+# Caché de festivos por año: arreglo ordenado (datetime64[D]) y mapa de bits por día del año
+_FESTIVOS_POR_ANIO = {}
+_MAPA_FESTIVOS_POR_ANIO = {}
+
+
+def calcular_pascua(anio):
+    """Calcula el Domingo de Pascua de un año (algoritmo de Meeus/Jones/Butcher)."""
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+def trasladar_a_lunes(fecha):
+    """Traslada una fecha al lunes siguiente si no cae en lunes."""
+    return fecha + timedelta(days=(7 - fecha.weekday()) % 7)
+
+
+def generar_festivos(anio):
+    """
+    Genera la lista de festivos de Colombia para un año como tuplas (fecha, nombre),
+    ordenadas por fecha.
+    """
+    festivos = [(date(anio, mes, dia), nombre) for mes, dia, nombre in FESTIVOS_FIJOS]
+
+    for mes, dia, nombre in FESTIVOS_TRASLADABLES:
+        festivos.append((trasladar_a_lunes(date(anio, mes, dia)), nombre))
+
+    pascua = calcular_pascua(anio)
+    for desplazamiento, se_traslada, nombre in FESTIVOS_PASCUA:
+        fecha = pascua + timedelta(days=desplazamiento)
+        festivos.append((trasladar_a_lunes(fecha) if se_traslada else fecha, nombre))
+
+    return sorted(festivos)
+
+
+def festivos_colombia(anio):
+    """Devuelve los festivos de un año como arreglo ordenado de datetime64[D] (con caché)."""
+    if anio not in _FESTIVOS_POR_ANIO:
+        fechas = np.unique(np.array([fecha for fecha, _ in generar_festivos(anio)], dtype='datetime64[D]'))
+        mapa = np.zeros(366, dtype=bool)
+        mapa[(fechas - np.datetime64(f'{anio}-01-01', 'D')).astype(int)] = True
+
+        _FESTIVOS_POR_ANIO[anio] = fechas
+        _MAPA_FESTIVOS_POR_ANIO[anio] = mapa
+
+    return _FESTIVOS_POR_ANIO[anio]
+
+
+def festivos_rango(anio_inicio, anio_fin):
+    """Devuelve los festivos de un rango de años (ambos incluidos) como arreglo ordenado."""
+    return np.concatenate([festivos_colombia(anio) for anio in range(anio_inicio, anio_fin + 1)])
+
+
+def es_festivo(fecha):
+    """Verifica si una fecha es festivo en Colombia (consulta O(1) sobre el mapa del año)."""
+    if isinstance(fecha, (pd.Timestamp, datetime)):
+        fecha = fecha.date()
+
+    festivos_colombia(fecha.year)
+    return bool(_MAPA_FESTIVOS_POR_ANIO[fecha.year][fecha.timetuple().tm_yday - 1])
+
+
+@lru_cache(maxsize=32)
+def calendario_habil(anio_inicio, anio_fin):
+    """Calendario hábil de numpy (lunes a viernes sin festivos) para un rango de años."""
+    return np.busdaycalendar(weekmask='1111100', holidays=festivos_rango(anio_inicio, anio_fin))
+
+
+def _calendario_para(fechas, dias=0):
+    """Obtiene un calendario que cubre las fechas dadas y el desplazamiento solicitado."""
+    anios = fechas.astype('datetime64[Y]').astype(int) + 1970
+    margen = 1 + abs(int(dias)) // 250
+    return calendario_habil(int(anios.min()) - margen, int(anios.max()) + margen)
+
+
+def desplazar_dias_habiles(fechas, dias):
+    """
+    Avanza cada fecha el número indicado de días hábiles. Si la fecha de origen no es
+    hábil se toma el día hábil anterior como base, de modo que el resultado es el
+    n-ésimo día hábil posterior a la fecha.
+
+    Args:
+        fechas: Arreglo de fechas datetime64[D] sin valores nulos
+        dias: Número de días hábiles a sumar
+
+    Returns:
+        numpy.ndarray: Fechas resultantes (datetime64[D])
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[D]')
+    if fechas.size == 0:
+        return fechas
+    return np.busday_offset(fechas, dias, roll='backward', busdaycal=_calendario_para(fechas, dias))
+
+
+def contar_dias_habiles(inicio, fin):
+    """
+    Cuenta los días hábiles en el intervalo [inicio, fin) para arreglos de fechas
+    datetime64[D] sin valores nulos. Si fin es anterior a inicio el resultado es negativo.
+    """
+    inicio = np.asarray(inicio, dtype='datetime64[D]')
+    fin = np.asarray(fin, dtype='datetime64[D]')
+    if inicio.size == 0:
+        return np.zeros(inicio.shape, dtype=int)
+    calendario = _calendario_para(np.concatenate([inicio.ravel(), fin.ravel()]))
+    return np.busday_count(inicio, fin, busdaycal=calendario)
+
+
+# Función para probar la generación de festivos
+def test_festivos_colombia():
+    for anio in [2025, 2026]:
+        print(f"Festivos de Colombia {anio}:")
+        for fecha, nombre in generar_festivos(anio):
+            print(f"  {fecha.strftime('%d/%m/%Y')} - {nombre}")
+
+
+if __name__ == "__main__":
+    # Ejecutar pruebas
+    test_festivos_colombia()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from fecha_utils import fechas_columna
+
+# Columnas de fecha que se indexan y la columna de fecha real que marca el hito como
+# completado (None cuando la fecha indexada es ya la fecha real del hito)
+COLUMNAS_INDICE_PLAZOS = {
+    'Entrega acuerdo de compromiso': 'Fecha de entrega de información',
+    'Plazo de cronograma': 'Análisis y cronograma',
+    'Análisis y cronograma (fecha programada)': 'Análisis y cronograma',
+    'Estándares (fecha programada)': 'Estándares',
+    'Fecha de publicación programada': 'Publicación',
+    'Plazo de oficio de cierre': 'Fecha de oficio de cierre',
+    'Análisis y cronograma': None,
+    'Estándares': None,
+    'Publicación': None
+}
+
+
+def a_dia(fecha):
+    """Convierte una fecha (date, datetime, Timestamp o texto ISO) a datetime64[D]."""
+    return np.datetime64(pd.Timestamp(fecha).date(), 'D')
+
+
+def construir_indice_plazos(df, columnas=None):
+    """
+    Construye el índice de vencimientos de un DataFrame de registros.
+
+    Por cada columna de fecha guarda las entradas con fecha válida ordenadas por fecha:
+    la fecha, la posición del registro, su fecha real (NaT si no la tiene) y si el
+    hito está completado. Las consultas por rango usan búsqueda binaria sobre ese orden.
+
+    Args:
+        df: DataFrame de registros
+        columnas: Diccionario {columna de fecha: columna de fecha real o None}
+                  (por defecto, COLUMNAS_INDICE_PLAZOS)
+
+    Returns:
+        dict: {'etiquetas': índice de df, 'columnas': {columna: entradas}}
+    """
+    columnas = COLUMNAS_INDICE_PLAZOS if columnas is None else columnas
+
+    entradas = {}
+    for columna, columna_real in columnas.items():
+        fechas = fechas_columna(df, columna).to_numpy(dtype='datetime64[D]')
+        filas = np.flatnonzero(~np.isnat(fechas))
+        filas = filas[np.argsort(fechas[filas], kind='stable')]
+
+        if columna_real is None:
+            reales = fechas[filas]
+        else:
+            reales = fechas_columna(df, columna_real).to_numpy(dtype='datetime64[D]')[filas]
+
+        entradas[columna] = {
+            'fechas': fechas[filas],
+            'filas': filas,
+            'reales': reales,
+            'completado': ~np.isnat(reales)
+        }
+
+    return {'etiquetas': df.index.copy(), 'columnas': entradas}
+
+
+def indice_vigente(indice, df):
+    """Verifica si un índice de vencimientos fue construido sobre las filas de df."""
+    return indice is not None and indice['etiquetas'].equals(df.index)
+
+
+def consultar_plazos(indice, columna, desde=None, hasta=None, completados=None):
+    """
+    Consulta las entradas de una columna con fecha en el rango [desde, hasta).
+
+    Args:
+        indice: Índice retornado por construir_indice_plazos
+        columna: Columna de fecha indexada
+        desde: Fecha inicial incluida (por defecto, sin límite)
+        hasta: Fecha final excluida (por defecto, sin límite)
+        completados: True o False para filtrar por hito completado (por defecto, todos)
+
+    Returns:
+        tuple: (filas, fechas, reales) - posiciones de los registros, fechas indexadas
+               y fechas reales, en orden de fecha
+    """
+    entrada = indice['columnas'].get(columna)
+    if entrada is None:
+        vacio = np.array([], dtype='datetime64[D]')
+        return np.array([], dtype=int), vacio, vacio
+
+    fechas = entrada['fechas']
+    inicio = 0 if desde is None else np.searchsorted(fechas, a_dia(desde), side='left')
+    fin = len(fechas) if hasta is None else np.searchsorted(fechas, a_dia(hasta), side='left')
+
+    rango = slice(inicio, max(inicio, fin))
+    filas, fechas, reales = entrada['filas'][rango], fechas[rango], entrada['reales'][rango]
+
+    if completados is not None:
+        seleccion = entrada['completado'][rango] == completados
+        filas, fechas, reales = filas[seleccion], fechas[seleccion], reales[seleccion]
+
+    return filas, fechas, reales
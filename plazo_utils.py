@@ -1,6 +1,8 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 import pandas as pd
-from fecha_utils import procesar_fecha, es_festivo, formatear_fecha
+from constants import DIAS_HABILES_PLAZO_OFICIO_CIERRE
+from festivos_utils import desplazar_dias_habiles
+from fecha_utils import procesar_fecha, formatear_fecha, sumar_dias_habiles
 
 def calcular_plazo_oficio_cierre(fecha_publicacion):
     """
@@ -12,24 +14,9 @@ def calcular_plazo_oficio_cierre(fecha_publicacion):
     if fecha is None or pd.isna(fecha):
         return None
 
-    # Contador de días hábiles
-    dias_habiles = 0
-    fecha_actual = fecha
-
-    # Calcular 7 días hábiles a partir de la fecha de publicación
-    while dias_habiles < 7:
-        # Avanzar un día
-        fecha_actual = fecha_actual + timedelta(days=1)
-
-        # Verificar si es día hábil (no es fin de semana ni festivo)
-        dia_semana = fecha_actual.weekday()  # 0 = lunes, 6 = domingo
-
-        # Si no es sábado (5) ni domingo (6) ni festivo, contamos como día hábil
-        if dia_semana < 5 and not es_festivo(fecha_actual):
-            dias_habiles += 1
-
-    # Retornar la fecha calculada
-    return fecha_actual
+    # Avanzar los días hábiles sobre el calendario de festivos compartido
+    plazo = desplazar_dias_habiles([pd.Timestamp(fecha).date()], DIAS_HABILES_PLAZO_OFICIO_CIERRE)[0]
+    return pd.Timestamp(plazo)
 
 def actualizar_plazo_oficio_cierre(df):
     """
@@ -46,13 +33,11 @@ def actualizar_plazo_oficio_cierre(df):
     # Crear una copia del DataFrame
     df_actualizado = df.copy()
 
-    # Iterar sobre cada fila
-    for idx, row in df.iterrows():
-        fecha_publicacion = row.get('Publicación', None)
-        if fecha_publicacion and pd.notna(fecha_publicacion) and fecha_publicacion != '':
-            plazo = calcular_plazo_oficio_cierre(fecha_publicacion)
-            if plazo is not None:
-                df_actualizado.at[idx, 'Plazo de oficio de cierre'] = formatear_fecha(plazo)
+    # Calcular los plazos de toda la columna en una sola operación
+    plazos = sumar_dias_habiles(df['Publicación'], DIAS_HABILES_PLAZO_OFICIO_CIERRE)
+    validos = plazos.notna()
+    if validos.any():
+        df_actualizado.loc[validos, 'Plazo de oficio de cierre'] = plazos[validos].dt.strftime('%d/%m/%Y')
 
     return df_actualizado
 
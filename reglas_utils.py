@@ -0,0 +1,332 @@
+# reglas_utils.py - Reglas de negocio declarativas para los registros
+import pandas as pd
+import numpy as np
+from data_utils import calcular_porcentajes_avance
+from fecha_utils import columna_tipada, convertir_columna_fecha, procesar_fecha
+
+# Campos de cumplimiento de estándares
+CAMPOS_ESTANDARES_COMPLETO = [
+    'Registro (completo)', 'ET (completo)', 'CO (completo)',
+    'DD (completo)', 'REC (completo)', 'SERVICIO (completo)'
+]
+
+# Severidades de las reglas, de menor a mayor
+SEVERIDADES = ['correccion', 'advertencia', 'error']
+
+# Tabla de reglas de negocio. Cada regla define:
+# - condicion: expresión sobre columnas que selecciona los registros a los que aplica
+#     ('con_valor', columna)          la columna tiene un valor no vacío
+#     ('con_fecha', columna)          la columna tiene una fecha válida
+#     ('igual', columna, valor)       la columna es exactamente igual al valor
+#     ('en', columna, valores)        el valor (sin espacios, en mayúsculas) está en la lista
+#     ('vacia', columna)              la columna no existe, es nula o es ''
+#     ('existe', columna)             la columna existe en el DataFrame
+#     ('no', c), ('y', c1, c2, ...), ('o', c1, c2, ...)
+# - acciones: asignaciones sobre los registros seleccionados
+#     ('asignar', columna, valor)
+#     ('asignar_si', columna, valor, condicion)   solo donde además se cumple la condición
+# - severidad: 'correccion', 'advertencia' o 'error'
+# - mensaje: texto que se reporta para cada registro que la regla modifica
+# - recalcula_avance: si el porcentaje de avance debe recalcularse en los registros seleccionados
+# Todas las condiciones se evalúan sobre los valores originales y las acciones se aplican en orden.
+REGLAS_NEGOCIO = [
+    {
+        'nombre': 'Acuerdo de compromiso',
+        'condicion': ('o', ('con_valor', 'Suscripción acuerdo de compromiso'),
+                      ('con_valor', 'Entrega acuerdo de compromiso')),
+        'acciones': [('asignar', 'Acuerdo de compromiso', 'Si')],
+        'severidad': 'correccion',
+        'mensaje': "Se actualizó 'Acuerdo de compromiso' a 'Si' porque hay fecha de suscripción o entrega",
+        'recalcula_avance': True
+    },
+    {
+        'nombre': 'Análisis y cronograma',
+        'condicion': ('y', ('con_valor', 'Análisis y cronograma'), ('con_fecha', 'Análisis y cronograma')),
+        'acciones': [
+            ('asignar_si', 'Análisis de información', 'Si', ('existe', 'Análisis de información')),
+            ('asignar_si', 'Cronograma Concertado', 'Si', ('existe', 'Cronograma Concertado'))
+        ],
+        'severidad': 'correccion',
+        'mensaje': "Se actualizaron 'Análisis de información' y 'Cronograma Concertado' a 'Si'",
+        'recalcula_avance': True
+    },
+    {
+        'nombre': 'Estándares',
+        'condicion': ('y', ('con_valor', 'Estándares'), ('con_fecha', 'Estándares')),
+        'acciones': [
+            ('asignar_si', campo, 'No aplica', ('y', ('existe', campo), ('no', ('en', campo, ('COMPLETO',)))))
+            for campo in CAMPOS_ESTANDARES_COMPLETO
+        ],
+        'severidad': 'correccion',
+        'mensaje': "Los estándares que no estaban 'Completo' se actualizaron a 'No aplica'",
+        'recalcula_avance': True
+    },
+    {
+        'nombre': 'Publicación',
+        'condicion': ('y', ('con_valor', 'Publicación'), ('con_fecha', 'Publicación'),
+                      ('existe', 'Disponer datos temáticos')),
+        'acciones': [('asignar', 'Disponer datos temáticos', 'Si')],
+        'severidad': 'correccion',
+        'mensaje': "Se actualizó automáticamente 'Disponer datos temáticos' a 'Si'",
+        'recalcula_avance': True
+    },
+    {
+        'nombre': 'Oficio de cierre',
+        'condicion': ('y', ('con_valor', 'Fecha de oficio de cierre'), ('con_fecha', 'Fecha de oficio de cierre'),
+                      ('con_valor', 'Publicación')),
+        'acciones': [('asignar_si', 'Estado', 'Completado', ('existe', 'Estado'))],
+        'severidad': 'correccion',
+        'mensaje': "Estado cambiado a 'Completado' y avance al 100% por la fecha de oficio de cierre",
+        'recalcula_avance': True
+    },
+    {
+        'nombre': 'Oficio de cierre sin publicación',
+        'condicion': ('y', ('con_valor', 'Fecha de oficio de cierre'), ('con_fecha', 'Fecha de oficio de cierre'),
+                      ('no', ('con_valor', 'Publicación'))),
+        'acciones': [
+            ('asignar', 'Fecha de oficio de cierre', ''),
+            ('asignar_si', 'Estado', 'En proceso', ('igual', 'Estado', 'Completado'))
+        ],
+        'severidad': 'error',
+        'mensaje': "No es posible diligenciar la Fecha de oficio de cierre. Debe completar primero la etapa de Publicación.",
+        'recalcula_avance': True
+    },
+    {
+        'nombre': 'Completado sin oficio de cierre',
+        'condicion': ('y', ('no', ('con_valor', 'Fecha de oficio de cierre')), ('igual', 'Estado', 'Completado'),
+                      ('vacia', 'Fecha de oficio de cierre')),
+        'acciones': [('asignar', 'Estado', 'En proceso')],
+        'severidad': 'advertencia',
+        'mensaje': "El estado se cambió a 'En proceso' porque no hay fecha de oficio de cierre",
+        'recalcula_avance': True
+    }
+]
+
+
+def _sin_mascara(df):
+    return np.zeros(len(df), dtype=bool)
+
+
+def _primitiva_con_valor(df, columna):
+    if columna not in df.columns:
+        return _sin_mascara(df)
+    serie = df[columna]
+    return (serie.notna() & (serie.astype(str).str.strip() != '')).to_numpy(dtype=bool)
+
+
+def _primitiva_con_fecha(df, columna):
+    if columna not in df.columns:
+        return _sin_mascara(df)
+    tipada = columna_tipada(columna)
+    fechas = df[tipada] if tipada in df.columns else convertir_columna_fecha(df[columna])
+    return fechas.notna().to_numpy(dtype=bool)
+
+
+def _primitiva_igual(df, columna, valor):
+    if columna not in df.columns:
+        return _sin_mascara(df)
+    return (df[columna] == valor).fillna(False).to_numpy(dtype=bool)
+
+
+def _primitiva_en(df, columna, valores):
+    if columna not in df.columns:
+        return _sin_mascara(df)
+    normalizados = df[columna].fillna('').astype(str).str.strip().str.upper()
+    return normalizados.isin(list(valores)).to_numpy(dtype=bool)
+
+
+def _primitiva_vacia(df, columna):
+    if columna not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    serie = df[columna]
+    return (serie.isna() | (serie == '')).to_numpy(dtype=bool)
+
+
+def _primitiva_existe(df, columna):
+    return np.full(len(df), columna in df.columns, dtype=bool)
+
+
+PRIMITIVAS = {
+    'con_valor': _primitiva_con_valor,
+    'con_fecha': _primitiva_con_fecha,
+    'igual': _primitiva_igual,
+    'en': _primitiva_en,
+    'vacia': _primitiva_vacia,
+    'existe': _primitiva_existe
+}
+
+
+def compilar_condicion(condicion):
+    """
+    Compila una condición declarativa en una función (df, cache) -> máscara booleana.
+    Las primitivas se guardan en la caché, de modo que cada una se evalúa una sola vez
+    por DataFrame aunque varias reglas la compartan.
+    """
+    operador = condicion[0]
+
+    if operador in ('y', 'o'):
+        partes = [compilar_condicion(parte) for parte in condicion[1:]]
+        combinar = np.logical_and if operador == 'y' else np.logical_or
+
+        def evaluar_compuesta(df, cache):
+            mascara = partes[0](df, cache)
+            for parte in partes[1:]:
+                mascara = combinar(mascara, parte(df, cache))
+            return mascara
+        return evaluar_compuesta
+
+    if operador == 'no':
+        parte = compilar_condicion(condicion[1])
+        return lambda df, cache: ~parte(df, cache)
+
+    if operador not in PRIMITIVAS:
+        raise ValueError(f"Operador de regla desconocido: {operador}")
+
+    primitiva = PRIMITIVAS[operador]
+    argumentos = condicion[1:]
+
+    def evaluar_primitiva(df, cache):
+        if condicion not in cache:
+            cache[condicion] = primitiva(df, *argumentos)
+        return cache[condicion]
+    return evaluar_primitiva
+
+
+def evaluar_condicion(df, condicion, cache=None):
+    """Evalúa una condición declarativa sobre el DataFrame y retorna su máscara booleana."""
+    return compilar_condicion(condicion)(df, {} if cache is None else cache)
+
+
+def _compilar_accion(accion):
+    """Compila una acción en una tupla (columna, valor, condición compilada o None)."""
+    if accion[0] == 'asignar':
+        return accion[1], accion[2], None
+    if accion[0] == 'asignar_si':
+        return accion[1], accion[2], compilar_condicion(accion[3])
+    raise ValueError(f"Acción de regla desconocida: {accion[0]}")
+
+
+def _cambia_valor(df, columna, valor, mascara):
+    """Máscara de los registros seleccionados en los que la asignación cambia el valor actual."""
+    if columna not in df.columns:
+        return mascara
+    actuales = df[columna].astype(object).to_numpy()
+    return mascara & ~(actuales == valor)
+
+
+def _asignar(df, mascara, columna, valor):
+    """Asigna un valor a los registros seleccionados, manteniendo al día la columna tipada."""
+    df.loc[mascara, columna] = valor
+
+    tipada = columna_tipada(columna)
+    if tipada in df.columns:
+        fecha = procesar_fecha(valor)
+        df.loc[mascara, tipada] = pd.NaT if fecha is None else pd.Timestamp(fecha)
+
+
+def compilar_reglas(reglas):
+    """
+    Compila una tabla de reglas en una función evaluar(df, filas=None, solo_reporte=False).
+
+    La función evaluar calcula todas las máscaras sobre los valores originales y luego
+    aplica las acciones en el orden de la tabla, con asignación por máscara.
+
+    Args (de la función retornada):
+        df: DataFrame de registros (no se modifica)
+        filas: Etiquetas de las filas a evaluar (por defecto, todas)
+        solo_reporte: Si es True no se aplican las acciones, solo se reportan
+
+    Returns:
+        tuple: (resultado, hallazgos)
+            - resultado: copia corregida de las filas evaluadas (None en modo reporte)
+            - hallazgos: DataFrame con 'Fila', 'Cod', 'Regla', 'Severidad' y 'Mensaje'
+              por cada registro que una regla modifica (o modificaría)
+    """
+    compiladas = [
+        {
+            'regla': regla,
+            'condicion': compilar_condicion(regla['condicion']),
+            'acciones': [_compilar_accion(accion) for accion in regla['acciones']]
+        }
+        for regla in reglas
+    ]
+
+    def evaluar(df, filas=None, solo_reporte=False):
+        base = df if filas is None else df.loc[list(filas)]
+        cache = {}
+
+        # Calcular todas las máscaras sobre los valores originales
+        evaluadas = []
+        for compilada in compiladas:
+            mascara = compilada['condicion'](base, cache)
+            asignaciones = []
+            cambios = _sin_mascara(base)
+            for columna, valor, condicion_accion in compilada['acciones']:
+                mascara_accion = mascara if condicion_accion is None else mascara & condicion_accion(base, cache)
+                asignaciones.append((columna, valor, mascara_accion))
+                cambios |= _cambia_valor(base, columna, valor, mascara_accion)
+            evaluadas.append((compilada['regla'], mascara, asignaciones, cambios))
+
+        # Reportar los registros que cada regla modifica
+        hallazgos = []
+        for regla, _, _, cambios in evaluadas:
+            if cambios.any():
+                etiquetas = base.index[cambios]
+                hallazgos.append(pd.DataFrame({
+                    'Fila': etiquetas,
+                    'Cod': base.loc[etiquetas, 'Cod'].to_numpy() if 'Cod' in base.columns else '',
+                    'Regla': regla['nombre'],
+                    'Severidad': regla['severidad'],
+                    'Mensaje': regla['mensaje']
+                }))
+        hallazgos_df = (pd.concat(hallazgos, ignore_index=True) if hallazgos
+                        else pd.DataFrame(columns=['Fila', 'Cod', 'Regla', 'Severidad', 'Mensaje']))
+
+        if solo_reporte:
+            return None, hallazgos_df
+
+        # Aplicar las acciones en el orden de la tabla
+        resultado = base.copy()
+        recalcular = _sin_mascara(base)
+        for regla, mascara, asignaciones, _ in evaluadas:
+            for columna, valor, mascara_accion in asignaciones:
+                if mascara_accion.any():
+                    _asignar(resultado, mascara_accion, columna, valor)
+            if regla.get('recalcula_avance'):
+                recalcular |= mascara
+
+        # Recalcular una sola vez el porcentaje de avance de los registros afectados
+        if 'Porcentaje Avance' in resultado.columns and recalcular.any():
+            if isinstance(resultado['Porcentaje Avance'].dtype, pd.StringDtype):
+                resultado['Porcentaje Avance'] = resultado['Porcentaje Avance'].astype(object)
+            avance = calcular_porcentajes_avance(resultado[recalcular])
+            resultado.loc[recalcular, 'Porcentaje Avance'] = avance.to_numpy()
+
+        return resultado, hallazgos_df
+
+    return evaluar
+
+
+# Evaluador compilado de las reglas de negocio (se compila una sola vez al importar)
+evaluar_reglas = compilar_reglas(REGLAS_NEGOCIO)
+
+
+def aplicar_delta(df, delta):
+    """
+    Escribe en el DataFrame los valores corregidos de un subconjunto de filas
+    (resultado de evaluar_reglas con filas), solo en las celdas que cambiaron.
+    """
+    for columna in delta.columns:
+        nuevos = delta[columna]
+        if columna not in df.columns:
+            df.loc[delta.index, columna] = nuevos
+            continue
+
+        actuales = df.loc[delta.index, columna]
+        iguales = (actuales.astype(object).to_numpy() == nuevos.astype(object).to_numpy()) | \
+                  (actuales.isna().to_numpy() & nuevos.isna().to_numpy())
+        if not iguales.all():
+            if isinstance(df[columna].dtype, pd.StringDtype) and not isinstance(nuevos.dtype, pd.StringDtype):
+                df[columna] = df[columna].astype(object)
+            df.loc[delta.index[~iguales], columna] = nuevos[~iguales].to_numpy()
+    return df
@@ -1,7 +1,9 @@
 # Validaciones_utils.py actualizado
 import pandas as pd
 import numpy as np
-from data_utils import procesar_fecha, calcular_porcentaje_avance
+from constants import VALORES_ACUERDO_POSITIVOS
+from reglas_utils import evaluar_reglas, evaluar_condicion
+from fecha_utils import materializar_fechas, derivar_plazos
 from datetime import datetime
 
 def verificar_condiciones_estandares(row):
@@ -67,195 +69,78 @@ def validar_reglas_negocio(df):
     4. Si introduce fecha en publicación, disponer datos temáticos = SI automáticamente
     5. Si oficio de cierre tiene fecha válida, actualizar estado a "Completado"
     6. Si Estado es "Completado" pero no hay fecha de oficio de cierre, cambiar Estado a "En proceso"
-    """
-    df_actualizado = df.copy()
-
-    # Iterar sobre cada fila
-    for idx, row in df.iterrows():
-        # Regla 1: Si suscripción o entrega acuerdo de compromiso no está vacío, acuerdo de compromiso = SI
-        if 'Suscripción acuerdo de compromiso' in row and pd.notna(row['Suscripción acuerdo de compromiso']) and str(
-                row['Suscripción acuerdo de compromiso']).strip() != '':
-            df_actualizado.at[idx, 'Acuerdo de compromiso'] = 'Si'
-            # Recalcular porcentaje de avance
-            if 'Porcentaje Avance' in df_actualizado.columns:
-                df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-
-        if 'Entrega acuerdo de compromiso' in row and pd.notna(row['Entrega acuerdo de compromiso']) and str(
-                row['Entrega acuerdo de compromiso']).strip() != '':
-            df_actualizado.at[idx, 'Acuerdo de compromiso'] = 'Si'
-            # Recalcular porcentaje de avance
-            if 'Porcentaje Avance' in df_actualizado.columns:
-                df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-
-        # Regla 2: Si análisis y cronograma tiene fecha, análisis de información y cronograma concertado = SI
-        if 'Análisis y cronograma' in row and pd.notna(row['Análisis y cronograma']) and str(
-                row['Análisis y cronograma']).strip() != '':
-            fecha = procesar_fecha(row['Análisis y cronograma'])
-            if fecha is not None:
-                if 'Análisis de información' in df_actualizado.columns:
-                    df_actualizado.at[idx, 'Análisis de información'] = 'Si'
-                if 'Cronograma Concertado' in df_actualizado.columns:
-                    df_actualizado.at[idx, 'Cronograma Concertado'] = 'Si'
-                # Recalcular porcentaje de avance
-                if 'Porcentaje Avance' in df_actualizado.columns:
-                    df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-
-        # Regla 3: MODIFICADA - Al introducir fecha en estándares, actualizar campos no completos a "No aplica"
-        if 'Estándares' in row and pd.notna(row['Estándares']) and str(row['Estándares']).strip() != '':
-            fecha = procesar_fecha(row['Estándares'])
-            if fecha is not None:
-                # Campos de estándares a verificar
-                campos_estandares_completo = [
-                    'Registro (completo)', 'ET (completo)', 'CO (completo)',
-                    'DD (completo)', 'REC (completo)', 'SERVICIO (completo)'
-                ]
-                
-                for campo in campos_estandares_completo:
-                    if campo in df_actualizado.columns:
-                        valor_actual = df_actualizado.at[idx, campo] if pd.notna(df_actualizado.at[idx, campo]) else ""
-                        # Si no está "Completo", actualizar a "No aplica"
-                        if str(valor_actual).strip().upper() != "COMPLETO":
-                            df_actualizado.at[idx, campo] = "No aplica"
-                # Recalcular porcentaje de avance
-                if 'Porcentaje Avance' in df_actualizado.columns:
-                    df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-
-        # Regla 4: MODIFICADA - Si publicación tiene fecha, disponer datos temáticos = SI automáticamente
-        if 'Publicación' in row and pd.notna(row['Publicación']) and str(row['Publicación']).strip() != '':
-            fecha = procesar_fecha(row['Publicación'])
-            if fecha is not None and 'Disponer datos temáticos' in df_actualizado.columns:
-                df_actualizado.at[idx, 'Disponer datos temáticos'] = 'Si'
-                # Recalcular porcentaje de avance
-                if 'Porcentaje Avance' in df_actualizado.columns:
-                    df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-
-        # Regla 5: MODIFICADA - Si oficio de cierre tiene fecha, actualizar estado a "Completado" (validación simple)
-        if 'Fecha de oficio de cierre' in row and pd.notna(row['Fecha de oficio de cierre']) and str(
-                row['Fecha de oficio de cierre']).strip() != '':
-            fecha = procesar_fecha(row['Fecha de oficio de cierre'])
-            if fecha is not None:
-                # Solo verificar que Publicación esté completada
-                tiene_publicacion = ('Publicación' in row and pd.notna(row['Publicación']) and 
-                                   str(row['Publicación']).strip() != '')
-                
-                if tiene_publicacion:
-                    # Actualizar estado a "Completado"
-                    if 'Estado' in df_actualizado.columns:
-                        df_actualizado.at[idx, 'Estado'] = 'Completado'
-                    # Recalcular porcentaje de avance (será 100% automáticamente)
-                    if 'Porcentaje Avance' in df_actualizado.columns:
-                        df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-                else:
-                    # Si no tiene publicación, eliminar la fecha de oficio de cierre
-                    df_actualizado.at[idx, 'Fecha de oficio de cierre'] = ''
-                    # Y cambiar estado a "En proceso" si era "Completado"
-                    if 'Estado' in df_actualizado.columns and df_actualizado.at[idx, 'Estado'] == 'Completado':
-                        df_actualizado.at[idx, 'Estado'] = 'En proceso'
-                    # Recalcular porcentaje de avance
-                    if 'Porcentaje Avance' in df_actualizado.columns:
-                        df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
-        
-        # Regla 6: Si Estado es "Completado" pero no hay fecha de oficio de cierre, cambiar Estado a "En proceso"
-        elif 'Estado' in df_actualizado.columns and df_actualizado.at[idx, 'Estado'] == 'Completado':
-            # Verificar si hay fecha de oficio de cierre válida
-            if 'Fecha de oficio de cierre' not in row or pd.isna(row['Fecha de oficio de cierre']) or row['Fecha de oficio de cierre'] == '':
-                df_actualizado.at[idx, 'Estado'] = 'En proceso'
-                # Recalcular porcentaje de avance
-                if 'Porcentaje Avance' in df_actualizado.columns:
-                    df_actualizado.at[idx, 'Porcentaje Avance'] = calcular_porcentaje_avance(df_actualizado.iloc[idx])
 
+    Las reglas están definidas en reglas_utils.REGLAS_NEGOCIO y se evalúan con máscaras
+    sobre todo el DataFrame; el porcentaje de avance se recalcula una sola vez al final.
+    """
+    df_actualizado, _ = evaluar_reglas(df)
     return df_actualizado
 
 
-def mostrar_estado_validaciones(df, st_obj=None):
+def validar_registro(df, fila):
     """
-    MODIFICADO: Muestra el estado actual de las validaciones simplificadas.
+    Validación incremental de un solo registro: recalcula sus plazos y le aplica las
+    reglas de negocio sin recorrer el resto del DataFrame.
+
+    Args:
+        df: DataFrame de registros (no se modifica)
+        fila: Etiqueta de la fila editada
+
+    Returns:
+        tuple: (registro, hallazgos)
+            - registro: DataFrame de una fila con los valores corregidos
+            - hallazgos: DataFrame con los mensajes de las reglas que modificaron el registro
     """
-    resultados = []
-
-    for idx, row in df.iterrows():
-        resultado = {'Cod': row.get('Cod', ''), 'Entidad': row.get('Entidad', ''),
-                     'Nivel Información ': row.get('Nivel Información ', '')}
-
-        # Validar Acuerdo de compromiso
-        tiene_entrega = ('Entrega acuerdo de compromiso' in row and
-                         pd.notna(row['Entrega acuerdo de compromiso']) and
-                         str(row['Entrega acuerdo de compromiso']).strip() != '')
-
-        tiene_acuerdo = ('Acuerdo de compromiso' in row and
-                         pd.notna(row['Acuerdo de compromiso']) and
-                         str(row['Acuerdo de compromiso']).strip().upper() in ['SI', 'SÍ', 'S', 'YES', 'Y', 'COMPLETO'])
-
-        if tiene_entrega and not tiene_acuerdo:
-            resultado['Estado Acuerdo'] = 'Inconsistente'
-        else:
-            resultado['Estado Acuerdo'] = 'Correcto'
-
-        # Validar Análisis de información
-        tiene_fecha_analisis = ('Análisis y cronograma' in row and
-                                pd.notna(row['Análisis y cronograma']) and
-                                str(row['Análisis y cronograma']).strip() != '')
-
-        tiene_analisis_info = ('Análisis de información' in row and
-                               pd.notna(row['Análisis de información']) and
-                               str(row['Análisis de información']).strip().upper() in ['SI', 'SÍ', 'S', 'YES', 'Y',
-                                                                                       'COMPLETO'])
-
-        if tiene_fecha_analisis and not tiene_analisis_info:
-            resultado['Estado Análisis'] = 'Inconsistente'
-        else:
-            resultado['Estado Análisis'] = 'Correcto'
-
-        # MODIFICADO: Validar Estándares (ahora más permisivo)
-        tiene_fecha_estandares = ('Estándares' in row and
-                                  pd.notna(row['Estándares']) and
-                                  str(row['Estándares']).strip() != '')
-
-        if tiene_fecha_estandares:
-            resultado['Estado Estándares'] = 'Correcto'
-            resultado['Campos Incompletos'] = ''
-        else:
-            resultado['Estado Estándares'] = 'No aplicable'
-            resultado['Campos Incompletos'] = ''
-
-        # MODIFICADO: Validar Publicación (ahora automático)
-        tiene_fecha_publicacion = ('Publicación' in row and
-                                   pd.notna(row['Publicación']) and
-                                   str(row['Publicación']).strip() != '')
-
-        if tiene_fecha_publicacion:
-            resultado['Estado Publicación'] = 'Correcto'
-        else:
-            resultado['Estado Publicación'] = 'No aplicable'
-
-        # MODIFICADO: Validar Oficio de cierre (solo Publicación requerida)
-        tiene_fecha_oficio = ('Fecha de oficio de cierre' in row and
-                              pd.notna(row['Fecha de oficio de cierre']) and
-                              str(row['Fecha de oficio de cierre']).strip() != '')
-
-        if tiene_fecha_oficio:
-            valido, campos_incompletos = verificar_condiciones_oficio_cierre(row)
-            if not valido:
-                resultado['Estado Oficio Cierre'] = 'Inconsistente'
-                resultado['Oficio Incompletos'] = ', '.join(campos_incompletos)
-            else:
-                resultado['Estado Oficio Cierre'] = 'Correcto'
-                resultado['Oficio Incompletos'] = ''
-        else:
-            resultado['Estado Oficio Cierre'] = 'No aplicable'
-            resultado['Oficio Incompletos'] = ''
-            
-        # Validar Estado "Completado" sin fecha de oficio de cierre
-        tiene_estado_completado = ('Estado' in row and pd.notna(row['Estado']) and row['Estado'] == 'Completado')
-        if tiene_estado_completado and not tiene_fecha_oficio:
-            resultado['Estado Inconsistente'] = 'Sí (Completado sin fecha oficio)'
-        else:
-            resultado['Estado Inconsistente'] = 'No'
+    registro = materializar_fechas(df.loc[[fila]].copy())
+    derivar_plazos(registro)
+    return evaluar_reglas(registro)
 
-        resultados.append(resultado)
 
-    # Crear DataFrame con los resultados
-    resultados_df = pd.DataFrame(resultados)
+def mostrar_estado_validaciones(df, st_obj=None):
+    """
+    MODIFICADO: Muestra el estado actual de las validaciones simplificadas.
+    El reporte se construye por columnas: cada estado es un np.select sobre máscaras
+    calculadas con las condiciones de reglas_utils.
+    """
+    cache = {}
+
+    def mascara(condicion):
+        return evaluar_condicion(df, condicion, cache)
+
+    tiene_entrega = mascara(('con_valor', 'Entrega acuerdo de compromiso'))
+    tiene_acuerdo = mascara(('en', 'Acuerdo de compromiso', tuple(VALORES_ACUERDO_POSITIVOS)))
+    tiene_fecha_analisis = mascara(('con_valor', 'Análisis y cronograma'))
+    tiene_analisis_info = mascara(('en', 'Análisis de información', tuple(VALORES_ACUERDO_POSITIVOS)))
+    tiene_fecha_estandares = mascara(('con_valor', 'Estándares'))
+    tiene_fecha_publicacion = mascara(('con_valor', 'Publicación'))
+    tiene_fecha_oficio = mascara(('con_valor', 'Fecha de oficio de cierre'))
+    tiene_estado_completado = mascara(('igual', 'Estado', 'Completado'))
+
+    # MODIFICADO: Validar Oficio de cierre (solo Publicación requerida)
+    oficio_inconsistente = tiene_fecha_oficio & ~tiene_fecha_publicacion
+    if 'Publicación' in df.columns:
+        mensaje_oficio = "Debe completar la etapa de Publicación (tener fecha)"
+    else:
+        mensaje_oficio = "El campo Publicación no existe"
+
+    def columna(nombre):
+        return df[nombre].to_numpy() if nombre in df.columns else np.full(len(df), '', dtype=object)
+
+    resultados_df = pd.DataFrame({
+        'Cod': columna('Cod'),
+        'Entidad': columna('Entidad'),
+        'Nivel Información ': columna('Nivel Información '),
+        'Estado Acuerdo': np.select([tiene_entrega & ~tiene_acuerdo], ['Inconsistente'], 'Correcto'),
+        'Estado Análisis': np.select([tiene_fecha_analisis & ~tiene_analisis_info], ['Inconsistente'], 'Correcto'),
+        'Estado Estándares': np.select([tiene_fecha_estandares], ['Correcto'], 'No aplicable'),
+        'Campos Incompletos': '',
+        'Estado Publicación': np.select([tiene_fecha_publicacion], ['Correcto'], 'No aplicable'),
+        'Estado Oficio Cierre': np.select([oficio_inconsistente, tiene_fecha_oficio],
+                                          ['Inconsistente', 'Correcto'], 'No aplicable'),
+        'Oficio Incompletos': np.select([oficio_inconsistente], [mensaje_oficio], ''),
+        'Estado Inconsistente': np.select([tiene_estado_completado & ~tiene_fecha_oficio],
+                                          ['Sí (Completado sin fecha oficio)'], 'No')
+    })
 
     # Si hay un objeto Streamlit, mostrar advertencias
     if st_obj is not None:
@@ -5,11 +5,27 @@ import plotly.figure_factory as ff
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import streamlit as st
-from data_utils import procesar_fecha, verificar_completado_por_fecha
+from data_utils import verificar_completado_por_fecha
+from fecha_utils import obtener_fecha
+from indice_utils import construir_indice_plazos, consultar_plazos
 
+# Hitos del diagrama de Gantt: (columna de fecha, nombre del hito)
+HITOS_GANTT = [
+    ('Entrega acuerdo de compromiso', 'Acuerdo de compromiso'),
+    ('Análisis y cronograma', 'Análisis y cronograma'),
+    ('Estándares', 'Estándares'),
+    ('Publicación', 'Publicación'),
+    ('Plazo de oficio de cierre', 'Cierre')
+]
 
-def crear_gantt(df):
-    """Crea un diagrama de Gantt con los hitos y fechas."""
+
+def crear_gantt(df, indice_plazos=None):
+    """
+    Crea un diagrama de Gantt con los hitos y fechas.
+
+    Las tareas se toman del índice de vencimientos (construido sobre todos los registros
+    o sobre df), quedándose con las entradas de los registros presentes en df.
+    """
     import streamlit as st
     from datetime import datetime, timedelta
 
@@ -17,10 +33,7 @@ def crear_gantt(df):
         return None
 
     # Verificar si hay al menos una fecha válida
-    columnas_fecha = [
-        'Entrega acuerdo de compromiso', 'Análisis y cronograma',
-        'Estándares', 'Publicación', 'Plazo de oficio de cierre'
-    ]
+    columnas_fecha = [columna for columna, _ in HITOS_GANTT]
 
     tiene_fechas = False
     for col in columnas_fecha:
@@ -28,7 +41,7 @@ def crear_gantt(df):
             tiene_fechas = True
             break
 
-    if not tiene_fechas:
+    if not tiene_fechas or 'Cod' not in df.columns or 'Entidad' not in df.columns:
         return None
 
     # Definir los porcentajes por hito
@@ -40,98 +53,44 @@ def crear_gantt(df):
         'Cierre': '5%'
     }
 
-    # Crear lista de tareas para el diagrama
-    tareas = []
-
-    # Para cada registro, crear las tareas correspondientes a cada hito
-    for idx, row in df.iterrows():
-        try:
-            entidad = row['Entidad']
-            nivel_info = row['Nivel Información '] if 'Nivel Información ' in row else 'Sin nivel'
-            task_id = f"{row['Cod']} - {nivel_info}"
-
-            # Hito 1: Acuerdo de compromiso
-            if 'Entrega acuerdo de compromiso' in row and pd.notna(row['Entrega acuerdo de compromiso']) and row[
-                'Entrega acuerdo de compromiso'] != "":
-                fecha = procesar_fecha(row['Entrega acuerdo de compromiso'])
-                if fecha and isinstance(fecha, datetime):  # Verificación adicional de tipo
-                    # Modificar la fecha para que comience 7 días antes
-                    fecha_inicio = fecha - timedelta(days=7)
-                    tareas.append({
-                        'Task': task_id,
-                        'Start': fecha_inicio,
-                        'Finish': fecha,  # La fecha de finalización es la fecha original
-                        'Resource': f"Acuerdo de compromiso ({porcentajes_hitos['Acuerdo de compromiso']})",
-                        'Entidad': entidad
-                    })
-
-            # Hito 2: Análisis y cronograma
-            if 'Análisis y cronograma' in row and pd.notna(row['Análisis y cronograma']) and row[
-                'Análisis y cronograma'] != "":
-                fecha = procesar_fecha(row['Análisis y cronograma'])
-                if fecha and isinstance(fecha, datetime):  # Verificación adicional de tipo
-                    # Modificar la fecha para que comience 7 días antes
-                    fecha_inicio = fecha - timedelta(days=7)
-                    tareas.append({
-                        'Task': task_id,
-                        'Start': fecha_inicio,
-                        'Finish': fecha,
-                        'Resource': f"Análisis y cronograma ({porcentajes_hitos['Análisis y cronograma']})",
-                        'Entidad': entidad
-                    })
-
-            # Hito 3: Estándares
-            if 'Estándares' in row and pd.notna(row['Estándares']) and row['Estándares'] != "":
-                fecha = procesar_fecha(row['Estándares'])
-                if fecha and isinstance(fecha, datetime):  # Verificación adicional de tipo
-                    # Modificar la fecha para que comience 7 días antes
-                    fecha_inicio = fecha - timedelta(days=7)
-                    tareas.append({
-                        'Task': task_id,
-                        'Start': fecha_inicio,
-                        'Finish': fecha,
-                        'Resource': f"Estándares ({porcentajes_hitos['Estándares']})",
-                        'Entidad': entidad
-                    })
-
-            # Hito 4: Publicación
-            if 'Publicación' in row and pd.notna(row['Publicación']) and row['Publicación'] != "":
-                fecha = procesar_fecha(row['Publicación'])
-                if fecha and isinstance(fecha, datetime):  # Verificación adicional de tipo
-                    # Modificar la fecha para que comience 7 días antes
-                    fecha_inicio = fecha - timedelta(days=7)
-                    tareas.append({
-                        'Task': task_id,
-                        'Start': fecha_inicio,
-                        'Finish': fecha,
-                        'Resource': f"Publicación ({porcentajes_hitos['Publicación']})",
-                        'Entidad': entidad
-                    })
-
-            # Hito 5: Cierre (Plazo de oficio de cierre)
-            if 'Plazo de oficio de cierre' in row and pd.notna(row['Plazo de oficio de cierre']) and row[
-                'Plazo de oficio de cierre'] != "":
-                fecha = procesar_fecha(row['Plazo de oficio de cierre'])
-                if fecha and isinstance(fecha, datetime):  # Verificación adicional de tipo
-                    # Modificar la fecha para que comience 7 días antes
-                    fecha_inicio = fecha - timedelta(days=7)
-                    tareas.append({
-                        'Task': task_id,
-                        'Start': fecha_inicio,
-                        'Finish': fecha,
-                        'Resource': f"Cierre ({porcentajes_hitos['Cierre']})",
-                        'Entidad': entidad
-                    })
-        except Exception as e:
-            # Si hay un error procesando un registro, simplemente lo omitimos y continuamos
-            print(f"Error procesando registro {idx}: {e}")
-            continue
-
-    if not tareas:
+    if indice_plazos is None or not df.index.is_unique:
+        indice_plazos = construir_indice_plazos(df, dict.fromkeys(columnas_fecha))
+
+    # Posición en df de cada registro del índice (-1 si los filtros lo excluyen)
+    posicion_en_df = df.index.get_indexer(indice_plazos['etiquetas'])
+
+    # Entradas del índice de cada hito que pertenecen a los registros de df
+    posiciones, ordenes, fechas = [], [], []
+    for orden, (columna, _) in enumerate(HITOS_GANTT):
+        filas, fechas_hito, _ = consultar_plazos(indice_plazos, columna)
+        en_df = posicion_en_df[filas]
+        visibles = en_df >= 0
+        posiciones.append(en_df[visibles])
+        ordenes.append(np.full(visibles.sum(), orden))
+        fechas.append(fechas_hito[visibles])
+
+    posiciones = np.concatenate(posiciones)
+    if len(posiciones) == 0:
         return None
 
-    # Crear DataFrame de tareas
-    df_tareas = pd.DataFrame(tareas)
+    # Mismo orden que el recorrido registro por registro: posición en df y luego hito
+    orden_tareas = np.lexsort((np.concatenate(ordenes), posiciones))
+    posiciones = posiciones[orden_tareas]
+    ordenes = np.concatenate(ordenes)[orden_tareas]
+    fechas = pd.to_datetime(np.concatenate(fechas)[orden_tareas])
+
+    nivel_info = df['Nivel Información '].astype(str) if 'Nivel Información ' in df.columns else 'Sin nivel'
+    tareas = (df['Cod'].astype(str) + ' - ' + nivel_info).to_numpy(dtype=object)
+    recursos = np.array([f"{hito} ({porcentajes_hitos[hito]})" for _, hito in HITOS_GANTT], dtype=object)
+
+    # Crear DataFrame de tareas (cada hito comienza 7 días antes de su fecha)
+    df_tareas = pd.DataFrame({
+        'Task': tareas[posiciones],
+        'Start': fechas - timedelta(days=7),
+        'Finish': fechas,
+        'Resource': recursos[ordenes],
+        'Entidad': df['Entidad'].to_numpy(dtype=object)[posiciones]
+    })
 
     # Definir colores para cada tipo de hito
     colors = {
@@ -333,13 +292,13 @@ def contar_registros_completados_por_fecha(df, columna_fecha_programada, columna
     count = 0
     for _, row in df.iterrows():
         if columna_fecha_programada in row and row[columna_fecha_programada]:
-            fecha_programada = row[columna_fecha_programada]
+            fecha_programada = obtener_fecha(row, columna_fecha_programada)
 
             # Verificar si hay una fecha de completado
             fecha_completado = None
             if columna_fecha_completado in row and row[columna_fecha_completado]:
                 # Intentar procesar como fecha primero
-                fecha_completado = procesar_fecha(row[columna_fecha_completado])
+                fecha_completado = obtener_fecha(row, columna_fecha_completado)
                 # Si no es una fecha, verificar si es un valor booleano positivo
                 if fecha_completado is None and str(row[columna_fecha_completado]).strip().upper() in ['SI', 'SÍ',
                                                                                                        'S', 'YES',